@@ -1,10 +1,15 @@
 """SEC Filings retrieval agent."""
 
+import os
 import time
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from agents.filings.tools.tools import search_filings, FilingSearchResult
-from data.util.vector_store import collection_exists, get_collection_stats
+import numpy as np
+
+from agents.filings.tools.selection import mmr_select
+from agents.filings.tools.tools import search_filings_batch, FilingSearchResult
+from agents.shared.tokenization import estimate_tokens
+from data.util.vector_store import get_collection_stats
 from util.logger import get_logger
 from models.metrics import AgentMetrics, TokenUsage
 
@@ -12,6 +17,12 @@ logger = get_logger(__name__)
 
 AGENT_NAME = "filings_retrieval"
 
+# Chunks passed on to synthesis
+MAX_CONTEXT_CHUNKS = 15
+
+# Candidates retrieved per topic, from which the diverse context is selected
+CANDIDATES_PER_TOPIC = int(os.getenv("FILINGS_CANDIDATES_PER_TOPIC", "6"))
+
 
 DEFAULT_SEARCH_TOPICS = [
     "risk factors material risks",
@@ -22,58 +33,105 @@ DEFAULT_SEARCH_TOPICS = [
 ]
 
 
+def _select_diverse(
+    candidates: list[FilingSearchResult],
+) -> Tuple[list[FilingSearchResult], int]:
+    """
+    Select the context chunks by maximal marginal relevance over stored embeddings.
+
+    Args:
+        candidates: Merged search results, sorted by relevance
+
+    Returns:
+        Tuple of (selected results sorted by relevance, tokens saved compared to
+        the top chunks by relevance alone)
+    """
+    if any(c.embedding is None for c in candidates):
+        return candidates[:MAX_CONTEXT_CHUNKS], 0
+
+    indices = mmr_select(
+        [c.relevance_score for c in candidates],
+        np.stack([c.embedding for c in candidates]),
+        MAX_CONTEXT_CHUNKS,
+    )
+    selected = sorted(
+        (candidates[i] for i in indices), key=lambda x: x.relevance_score, reverse=True
+    )
+
+    # only chunks that differ between the two selections change the token count
+    by_relevance = set(range(min(MAX_CONTEXT_CHUNKS, len(candidates))))
+    chosen = set(indices)
+    tokens_saved = sum(
+        estimate_tokens(candidates[i].text) for i in by_relevance - chosen
+    ) - sum(estimate_tokens(candidates[i].text) for i in chosen - by_relevance)
+    return selected, tokens_saved
+
+
 def _gather_filing_context(
     ticker: str,
     search_queries: Optional[List[str]] = None,
-    top_k_per_topic: int = 3,
-) -> list[FilingSearchResult]:
+    top_k_per_topic: int = CANDIDATES_PER_TOPIC,
+) -> Tuple[list[FilingSearchResult], Dict[str, float], int]:
     """
     Search filings for multiple topics to gather comprehensive context.
 
+    All topics are embedded in one pass and searched in one query; a chunk found
+    by several topics is kept once, with its best relevance score. The context is
+    then selected for diversity, dropping near-duplicate chunks.
+
     Args:
         ticker: Stock ticker symbol
         search_queries: List of search queries to use (uses defaults if None)
-        top_k_per_topic: Number of results per search topic
+        top_k_per_topic: Number of candidates per search topic
 
     Returns:
-        Deduplicated list of search results
+        Tuple of (selected search results, stage latencies in ms, tokens saved by
+        the diversity selection)
     """
     topics = search_queries if search_queries else DEFAULT_SEARCH_TOPICS
-    all_results = []
-    seen_texts = set()
-
-    for topic in topics:
-        results = search_filings(
-            ticker=ticker,
-            query=topic,
-            top_k=top_k_per_topic,
-        )
+    results_per_topic, stage_latency_ms = search_filings_batch(
+        ticker=ticker,
+        queries=topics,
+        top_k=top_k_per_topic,
+        include_embeddings=True,
+    )
+
+    start = time.perf_counter()
+    merged: Dict[str, FilingSearchResult] = {}
+    for results in results_per_topic:
         for result in results:
-            # Deduplicate by text content (first 100 chars)
-            text_key = result.text[:100]
-            if text_key not in seen_texts:
-                seen_texts.add(text_key)
-                all_results.append(result)
+            key = result.chunk_id or result.text[:100]
+            best = merged.get(key)
+            if best is None or result.relevance_score > best.relevance_score:
+                merged[key] = result
 
     # Sort by relevance score
-    all_results.sort(key=lambda x: x.relevance_score, reverse=True)
+    all_results = sorted(merged.values(), key=lambda x: x.relevance_score, reverse=True)
+    stage_latency_ms["merge"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    selected, tokens_saved = _select_diverse(all_results)
+    stage_latency_ms["select"] = (time.perf_counter() - start) * 1000
 
-    return all_results[:15]  # Limit total context
+    return selected, stage_latency_ms, tokens_saved
 
 
 def get_filings_context(
     ticker: str,
     search_queries: Optional[List[str]] = None,
-) -> Tuple[Optional[str], AgentMetrics]:
+) -> Tuple[Optional[List[FilingSearchResult]], AgentMetrics]:
     """
-    Retrieve and format context from SEC filings for a ticker.
+    Retrieve context from SEC filings for a ticker.
+
+    The chunks are returned unformatted: synthesis packs them into the token budget
+    of the request's preset (see agents/filings/tools/packing.py).
 
     Args:
         ticker: Stock ticker symbol
         search_queries: Optional list of search queries (uses defaults if None)
 
     Returns:
-        Tuple of (Formatted context string or None, AgentMetrics)
+        Tuple of (Selected search results sorted by relevance or None, AgentMetrics)
     """
     start_time = time.perf_counter()
     # Retrieval uses embedding model implicitly via search_filings,
@@ -81,8 +139,9 @@ def get_filings_context(
     model = "retrieval"
     token_usage = TokenUsage()
 
-    # Check if we have any filings
-    if not collection_exists(ticker):
+    # Check if we have any filings (opens the collection once for every search below)
+    stats = get_collection_stats(ticker)
+    if not stats["exists"]:
         logger.warning(f"No filings available for {ticker}")
         latency_ms = (time.perf_counter() - start_time) * 1000
         metrics = AgentMetrics(
@@ -93,7 +152,6 @@ def get_filings_context(
         )
         return None, metrics
 
-    stats = get_collection_stats(ticker)
     if stats.get("document_count", 0) == 0:
         logger.warning(f"Empty filings collection for {ticker}")
         latency_ms = (time.perf_counter() - start_time) * 1000
@@ -105,7 +163,10 @@ def get_filings_context(
         )
         return None, metrics
 
-    filing_results = _gather_filing_context(ticker, search_queries)
+    filing_results, stage_latency_ms, tokens_saved = _gather_filing_context(
+        ticker, search_queries
+    )
+    stage_latency_ms = {k: round(v, 2) for k, v in stage_latency_ms.items()}
 
     if not filing_results:
         logger.warning(f"No relevant filing excerpts found for {ticker}")
@@ -115,22 +176,19 @@ def get_filings_context(
             latency_ms=latency_ms,
             token_usage=token_usage,
             model=model,
+            stage_latency_ms=stage_latency_ms,
         )
         return None, metrics
 
-    context_parts = [f"SEC Filing excerpts for {ticker}:\n"]
-    for result in filing_results:
-        context_parts.append(
-            f"\n[{result.filing_type} | {result.section} | {result.filing_date}]\n"
-            f"{result.text}\n"
-        )
-    context = "".join(context_parts)
-
     latency_ms = (time.perf_counter() - start_time) * 1000
     metrics = AgentMetrics(
         agent_name=AGENT_NAME,
         latency_ms=latency_ms,
         token_usage=token_usage,
         model=model,
+        stage_latency_ms=stage_latency_ms,
+        tokens_saved=tokens_saved,
     )
-    return context, metrics
+    if tokens_saved:
+        logger.info(f"Diverse filings context for {ticker} saved {tokens_saved} tokens")
+    return filing_results, metrics
@@ -1,12 +1,16 @@
 """SEC Filings synthesis agent."""
 
+import json
 import time
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 from agents.filings.prompts.synthesis_prompt import filings_synthesis_prompt
+from agents.filings.tools.packing import pack_context
+from agents.filings.tools.tools import FilingSearchResult
 from agents.shared.llm_models import LLM_MODELS, get_openai_llm
 from agents.shared.agent_utils import invoke_llm_with_metrics
 from agents.shared.token_config import DEFAULT_TOKEN_CONFIG, AgentTokenConfig
+from agents.shared.tokenization import estimate_tokens
 from util.logger import get_logger
 from models.agent import FilingsSentimentOutput
 from models.metrics import AgentMetrics, TokenUsage
@@ -16,17 +20,37 @@ logger = get_logger(__name__)
 AGENT_NAME = "filings_synthesis"
 
 
+def context_token_budget(config: AgentTokenConfig, model: str) -> Optional[int]:
+    """
+    Tokens left for filings context once the synthesis prompt, the output schema
+    sent with structured output, and the reserved output tokens are accounted for.
+
+    Returns:
+        Available context tokens (None when the budget is unlimited)
+    """
+    if config.token_budget is None:
+        return None
+    fixed_tokens = estimate_tokens(f"{filings_synthesis_prompt}\n\n", model)
+    fixed_tokens += estimate_tokens(
+        json.dumps(FilingsSentimentOutput.model_json_schema()), model
+    )
+    return max(config.token_budget - (config.max_output_tokens or 0) - fixed_tokens, 0)
+
+
 def generate_filings_sentiment(
     ticker: str,
-    context: str,
+    context: Optional[List[FilingSearchResult]],
     token_config: Optional[AgentTokenConfig] = None,
 ) -> Tuple[Optional[FilingsSentimentOutput], AgentMetrics]:
     """
     Generate sentiment analysis from SEC filings context.
 
+    The retrieved chunks are packed, most relevant first, into the tokens the
+    budget leaves after the prompt and the reserved output.
+
     Args:
         ticker: Stock ticker symbol
-        context: Retrieved context from SEC filings
+        context: Retrieved search results from SEC filings
         token_config: Optional token configuration for this agent
 
     Returns:
@@ -49,7 +73,18 @@ def generate_filings_sentiment(
         )
         return None, metrics
 
-    prompt = f"{filings_synthesis_prompt}\n\n{context}"
+    pack_start = time.perf_counter()
+    packed = pack_context(
+        ticker, context, context_token_budget(config, model), model=model
+    )
+    stage_latency_ms = {"pack": round((time.perf_counter() - pack_start) * 1000, 2)}
+    logger.info(
+        f"Packed {packed.chunks_packed}/{len(context)} filing chunks for {ticker} "
+        f"({packed.chunks_trimmed} trimmed): "
+        f"{packed.packed_tokens}/{packed.available_tokens or 'unlimited'} tokens"
+    )
+
+    prompt = f"{filings_synthesis_prompt}\n\n{packed.context}"
 
     # Get LLM and generate structured output
     llm = get_openai_llm(
@@ -74,6 +109,9 @@ def generate_filings_sentiment(
             token_usage=token_usage,
             model=model,
             budget_exceeded=budget_exceeded,
+            stage_latency_ms=stage_latency_ms,
+            context_tokens=packed.packed_tokens,
+            context_token_budget=packed.available_tokens,
         )
         return result, metrics
     except Exception as e:
@@ -85,5 +123,8 @@ def generate_filings_sentiment(
             token_usage=token_usage,
             model=model,
             budget_exceeded=budget_exceeded,
+            stage_latency_ms=stage_latency_ms,
+            context_tokens=packed.packed_tokens,
+            context_token_budget=packed.available_tokens,
         )
         return None, metrics
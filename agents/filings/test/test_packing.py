@@ -0,0 +1,58 @@
+from agents.filings.agents.synthesis import context_token_budget
+from agents.filings.tools.packing import pack_context
+from agents.filings.tools.tools import FilingSearchResult
+from agents.shared.token_config import get_token_config
+from agents.shared.tokenization import estimate_tokens
+
+
+def _result(text: str, score: float) -> FilingSearchResult:
+    return FilingSearchResult(
+        text=text,
+        ticker="AAPL",
+        filing_type="10-K",
+        filing_date="2024-11-01",
+        section="risk_factors",
+        relevance_score=score,
+    )
+
+
+SENTENCES = " ".join(
+    f"Sentence number {i} describes a material risk." for i in range(40)
+)
+
+
+def test_pack_fills_budget_by_relevance_and_trims_at_sentences():
+    results = [_result("Low relevance. " * 50, 0.2), _result(SENTENCES, 0.9)]
+
+    packed = pack_context("AAPL", results, available_tokens=120)
+
+    assert packed.packed_tokens <= 120
+    assert packed.chunks_trimmed == 1 and packed.chunks_dropped == 1
+    # the most relevant chunk is cut after a whole sentence
+    body = packed.context.split("]\n", 1)[1].strip()
+    assert SENTENCES.startswith(body) and body.endswith("risk.")
+    assert estimate_tokens(packed.context) <= 120
+
+
+def test_unlimited_budget_packs_every_chunk():
+    results = [_result(SENTENCES, 0.9), _result("Short note.", 0.5)]
+
+    packed = pack_context("AAPL", results, available_tokens=None)
+
+    assert packed.chunks_packed == 2 and packed.chunks_trimmed == 0
+    assert packed.available_tokens is None
+
+
+def test_context_budget_shrinks_with_the_preset():
+    economy = get_token_config("economy").filings_synthesis
+    premium = get_token_config("premium").filings_synthesis
+
+    assert (
+        0
+        < context_token_budget(economy, "gpt-4o")
+        < context_token_budget(premium, "gpt-4o")
+    )
+    assert (
+        context_token_budget(get_token_config("unlimited").filings_synthesis, "gpt-4o")
+        is None
+    )
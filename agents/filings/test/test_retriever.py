@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from agents.filings.agents import retriever
+from agents.filings.tools.selection import mmr_select
+from data.util import vector_store
+
+VOCABULARY = ["risk", "revenue", "debt", "guidance"]
+
+
+def keyword_vector(text: str) -> list[float]:
+    """One dimension per vocabulary word."""
+    vector = np.array([float(word in text) + 0.01 for word in VOCABULARY])
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+@pytest.fixture
+def engine(install_stub_engine, stub_store):
+    engine = install_stub_engine(model_name="keywords", embed=keyword_vector)
+    texts = ["risk and debt", "revenue growth", "guidance raised", "debt maturities"]
+    collection = vector_store.get_or_create_collection("AAPL")
+    collection.upsert(
+        ids=[f"0001_{i}" for i in range(len(texts))],
+        embeddings=engine.encode(texts),
+        documents=texts,
+        metadatas=[{"ticker": "AAPL", "filing_type": "10-K", "section": "risk_factors"}]
+        * len(texts),
+    )
+    vector_store.invalidate_collection("AAPL")
+    return engine
+
+
+def test_topics_are_embedded_and_searched_in_one_batch(engine):
+    calls_before = engine.encode_calls
+
+    results, stage_latency_ms, _ = retriever._gather_filing_context(
+        "AAPL", ["risk", "risk debt", "revenue"], top_k_per_topic=1
+    )
+
+    assert engine.encode_calls == calls_before + 1
+    assert set(stage_latency_ms) == {"embed", "search", "merge", "select"}
+    # "risk and debt" is the best match of two topics but is returned once
+    assert sorted(r.chunk_id for r in results) == ["0001_0", "0001_1"]
+    scores = [r.relevance_score for r in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_filings_context_reports_retrieval_stages(engine):
+    results, metrics = retriever.get_filings_context("AAPL", ["revenue"])
+
+    assert results[0].text == "revenue growth"
+    assert set(metrics.stage_latency_ms) == {"embed", "search", "merge", "select"}
+
+
+def test_mmr_skips_near_duplicates_for_diverse_chunks():
+    embeddings = np.array(
+        [
+            [1.0, 0.0, 0.0],
+            [0.999, 0.04, 0.0],  # overlapping chunk, near-copy of the first
+            [0.6, 0.8, 0.0],
+            [0.0, 0.0, 1.0],
+        ]
+    )
+    relevance = [0.9, 0.89, 0.7, 0.5]
+
+    # the orthogonal chunk outranks the partly redundant one
+    assert mmr_select(relevance, embeddings, k=3) == [0, 3, 2]
+    assert mmr_select(relevance, embeddings, k=3, lambda_mult=1.0) == [0, 2, 3]
+    # without duplicate removal, pure relevance keeps the near-copy
+    assert mmr_select(
+        relevance, embeddings, k=3, lambda_mult=1.0, duplicate_threshold=1.01
+    ) == [0, 1, 2]
@@ -0,0 +1,108 @@
+"""
+Packing of retrieved filing chunks into the synthesis prompt's token budget.
+
+Chunks are added by relevance while they fit. A chunk that does not fit whole is cut
+at the last sentence boundary that does, so the synthesis call stays within its
+budget without truncating mid-sentence.
+"""
+
+import re
+from typing import Optional
+
+from pydantic import BaseModel
+
+from agents.filings.tools.tools import FilingSearchResult
+from agents.shared.tokenization import estimate_tokens
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+# A chunk trimmed below this many tokens is dropped instead
+MIN_TRIMMED_TOKENS = 32
+
+
+class PackedContext(BaseModel):
+    """Filings context packed into a token budget."""
+
+    context: str
+    packed_tokens: int
+    available_tokens: Optional[int] = None  # None = unlimited
+    chunks_packed: int = 0
+    chunks_trimmed: int = 0
+    chunks_dropped: int = 0
+
+
+def _chunk_header(result: FilingSearchResult) -> str:
+    return f"\n[{result.filing_type} | {result.section} | {result.filing_date}]\n"
+
+
+def _trim_to_sentences(text: str, budget: int, model: Optional[str]) -> str:
+    """Longest prefix of whole sentences of text that fits in budget tokens."""
+    kept: list[str] = []
+    used = 0
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        # separators are counted with the sentence; a token either way at the joins
+        tokens = estimate_tokens(sentence + " ", model)
+        if used + tokens > budget:
+            break
+        kept.append(sentence)
+        used += tokens
+    return " ".join(kept)
+
+
+def pack_context(
+    ticker: str,
+    results: list[FilingSearchResult],
+    available_tokens: Optional[int],
+    model: Optional[str] = None,
+) -> PackedContext:
+    """
+    Pack filing chunks, most relevant first, into a token budget.
+
+    Args:
+        ticker: Stock ticker symbol
+        results: Selected search results
+        available_tokens: Tokens the context may use (None = unlimited)
+        model: Model whose tokenizer is used for counting
+
+    Returns:
+        The packed context with its token count and packing statistics
+    """
+    header = f"SEC Filing excerpts for {ticker}:\n"
+    parts = [header]
+    used = estimate_tokens(header, model)
+    packed = trimmed = dropped = 0
+
+    for result in sorted(results, key=lambda x: x.relevance_score, reverse=True):
+        chunk_header = _chunk_header(result)
+        block = f"{chunk_header}{result.text}\n"
+        tokens = estimate_tokens(block, model)
+        if available_tokens is None or used + tokens <= available_tokens:
+            parts.append(block)
+            used += tokens
+            packed += 1
+            continue
+
+        overhead = estimate_tokens(chunk_header, model) + 1
+        remaining = available_tokens - used - overhead
+        text = (
+            _trim_to_sentences(result.text, remaining, model)
+            if remaining >= MIN_TRIMMED_TOKENS
+            else ""
+        )
+        if not text:
+            dropped += 1
+            continue
+        block = f"{chunk_header}{text}\n"
+        parts.append(block)
+        used += estimate_tokens(block, model)
+        packed += 1
+        trimmed += 1
+
+    return PackedContext(
+        context="".join(parts),
+        packed_tokens=used,
+        available_tokens=available_tokens,
+        chunks_packed=packed,
+        chunks_trimmed=trimmed,
+        chunks_dropped=dropped,
+    )
@@ -0,0 +1,72 @@
+"""
+Diversity-aware selection of retrieved filing chunks.
+
+Neighbouring chunks overlap (chunk_overlap=200) and 10-Q boilerplate repeats from
+quarter to quarter, so the most similar chunks are often near-copies of each other.
+Maximal marginal relevance trades relevance against similarity to the chunks
+already picked, using the embeddings stored in Chroma.
+"""
+
+import os
+from typing import Sequence
+
+import numpy as np
+
+# Relevance weight: 1.0 ranks by similarity alone, lower values favour diversity
+MMR_LAMBDA = float(os.getenv("FILINGS_MMR_LAMBDA", "0.7"))
+
+# Chunks at least this similar to an already selected one are dropped as duplicates
+DUPLICATE_THRESHOLD = float(os.getenv("FILINGS_DUPLICATE_THRESHOLD", "0.95"))
+
+
+def mmr_select(
+    relevance: Sequence[float],
+    embeddings: np.ndarray,
+    k: int,
+    lambda_mult: float = MMR_LAMBDA,
+    duplicate_threshold: float = DUPLICATE_THRESHOLD,
+) -> list[int]:
+    """
+    Pick up to k diverse candidates by maximal marginal relevance.
+
+    Args:
+        relevance: Relevance score of each candidate to the queries
+        embeddings: Candidate embeddings, one row per candidate
+        k: Maximum number of candidates to select
+        lambda_mult: Relevance weight against redundancy
+        duplicate_threshold: Cosine similarity above which a candidate is a duplicate
+
+    Returns:
+        Indices of the selected candidates, in selection order (fewer than k when
+        the remaining candidates are all duplicates)
+    """
+    n = len(relevance)
+    if n == 0 or k <= 0:
+        return []
+
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1, norms)
+    # candidate-by-candidate cosine similarity, computed once
+    similarity = vectors @ vectors.T
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected: list[int] = []
+
+    while len(selected) < k and available.any():
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+
+        # similarity of every candidate to its closest selected chunk
+        redundancy = np.maximum(redundancy, similarity[best])
+        available &= redundancy < duplicate_threshold
+
+    return selected
@@ -1,10 +1,13 @@
-from typing import Optional
+import time
+from typing import Optional, Sequence
 
+import numpy as np
 from langchain_core.tools import Tool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_core.core_schema import arguments_schema
 
-from data.util.vector_store import get_or_create_collection, collection_exists
+from agents.shared.embedding_models import get_embedding_engine
+from data.util.vector_store import get_collection
 from util.logger import get_logger
 
 logger = get_logger(__name__)
@@ -25,28 +28,22 @@ class FilingSearchInput(BaseModel):
 
 
 class FilingSearchResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    chunk_id: Optional[str] = None
     text: str
     ticker: str
     filing_type: str
     section: str
     filing_date: str
     relevance_score: float
+    # stored chunk embedding, when requested from the search
+    embedding: Optional[np.ndarray] = Field(default=None, exclude=True, repr=False)
 
 
-def search_filings(
-    ticker: str,
-    query: str,
-    filing_types: list[str] = ["10-K", "10-Q", "8-K"],
-    sections: Optional[list[str]] = None,
-    top_k: int = 5,
-) -> list[FilingSearchResult]:
-    if not collection_exists(ticker):
-        logger.warning(f"No filings collection for {ticker}")
-        return []
-
-    collection = get_or_create_collection(ticker)
-
-    where_filter = None
+def _build_where_filter(
+    filing_types: list[str], sections: Optional[list[str]]
+) -> Optional[dict]:
     where_conditions = []
 
     if filing_types and len(filing_types) < 3:
@@ -56,44 +53,129 @@ def search_filings(
         where_conditions.append({"section": {"$in": sections}})
 
     if len(where_conditions) == 1:
-        where_filter = where_conditions[0]
-    elif len(where_conditions) > 1:
-        where_filter = {"$and": where_conditions}
-
-    try:
-        results = collection.query(
-            query_texts=[query],
-            n_results=top_k,
-            where=where_filter,
-            include=["documents", "metadatas", "distances"],
-        )
-    except Exception as e:
-        logger.error(f"Error querying filings: {e}")
-        return []
+        return where_conditions[0]
+    if len(where_conditions) > 1:
+        return {"$and": where_conditions}
+    return None
 
-    search_results = []
 
-    documents = results.get("documents", [[]])[0]
-    metadatas = results.get("metadatas", [[]])[0]
-    distances = results.get("distances", [[]])[0]
+def _to_search_results(
+    ticker: str, results: dict, query_index: int = 0
+) -> list[FilingSearchResult]:
+    ids = results.get("ids", [[]])[query_index]
+    documents = results.get("documents", [[]])[query_index]
+    metadatas = results.get("metadatas", [[]])[query_index]
+    distances = results.get("distances", [[]])[query_index]
+    embeddings = results.get("embeddings")
+    embeddings = (
+        embeddings[query_index] if embeddings is not None else [None] * len(ids)
+    )
 
-    for doc, meta, dist in zip(documents, metadatas, distances):
+    search_results = []
+    for chunk_id, doc, meta, dist, embedding in zip(
+        ids, documents, metadatas, distances, embeddings
+    ):
         similarity = 1 - dist
 
         search_results.append(
             FilingSearchResult(
+                chunk_id=chunk_id,
                 text=doc,
                 ticker=meta.get("ticker", ticker),
                 filing_type=meta.get("filing_type", "unknown"),
                 section=meta.get("section", "unknown"),
                 filing_date=meta.get("filing_date", "unknown"),
                 relevance_score=round(similarity, 4),
+                embedding=embedding,
             )
         )
 
     return search_results
 
 
+def search_filings(
+    ticker: str,
+    query: str,
+    filing_types: list[str] = ["10-K", "10-Q", "8-K"],
+    sections: Optional[list[str]] = None,
+    top_k: int = 5,
+) -> list[FilingSearchResult]:
+    collection = get_collection(ticker)
+    if collection is None:
+        logger.warning(f"No filings collection for {ticker}")
+        return []
+
+    try:
+        results = collection.query(
+            query_texts=[query],
+            n_results=top_k,
+            where=_build_where_filter(filing_types, sections),
+            include=["documents", "metadatas", "distances"],
+        )
+    except Exception as e:
+        logger.error(f"Error querying filings: {e}")
+        return []
+
+    return _to_search_results(ticker, results)
+
+
+def search_filings_batch(
+    ticker: str,
+    queries: Sequence[str],
+    filing_types: list[str] = ["10-K", "10-Q", "8-K"],
+    sections: Optional[list[str]] = None,
+    top_k: int = 5,
+    include_embeddings: bool = False,
+) -> tuple[list[list[FilingSearchResult]], dict[str, float]]:
+    """
+    Search filings for several queries with one embedding pass and one vector search.
+
+    Args:
+        ticker: Stock ticker symbol
+        queries: Search queries
+        filing_types: Types of filings to search
+        sections: Specific sections to search
+        top_k: Number of results per query
+        include_embeddings: Also return each chunk's stored embedding
+
+    Returns:
+        Tuple of (results per query, in query order; stage latencies in ms)
+    """
+    stage_latency_ms: dict[str, float] = {}
+    empty: list[list[FilingSearchResult]] = [[] for _ in queries]
+    if not queries:
+        return empty, stage_latency_ms
+
+    collection = get_collection(ticker)
+    if collection is None:
+        logger.warning(f"No filings collection for {ticker}")
+        return empty, stage_latency_ms
+
+    start = time.perf_counter()
+    # repeated queries are served from the query embedding cache
+    query_embeddings = get_embedding_engine().encode_queries(queries)
+    stage_latency_ms["embed"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    try:
+        results = collection.query(
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+            where=_build_where_filter(filing_types, sections),
+            include=["documents", "metadatas", "distances"]
+            + (["embeddings"] if include_embeddings else []),
+        )
+    except Exception as e:
+        logger.error(f"Error querying filings: {e}")
+        return empty, stage_latency_ms
+    finally:
+        stage_latency_ms["search"] = (time.perf_counter() - start) * 1000
+
+    return [
+        _to_search_results(ticker, results, i) for i in range(len(queries))
+    ], stage_latency_ms
+
+
 def search_filings_tool_func(
     ticker: str,
     query: str,
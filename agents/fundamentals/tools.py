@@ -3,10 +3,12 @@ from typing import Dict, Any, List, Optional
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
 from langchain_core.tools import Tool
 
 from models.tools import FundamentalsData, FundamentalsInput
+from util.lazy_imports import lazy_import
+
+yf = lazy_import("yfinance")
 
 
 # Financial metrics configuration
@@ -2,7 +2,6 @@ from datetime import datetime, timedelta
 from typing import Dict, Tuple, Optional
 
 import pandas as pd
-import pandas_datareader as pdr
 import requests
 from langchain_core.tools import Tool
 
@@ -12,6 +11,9 @@ from models.tools import (
     MacroDataResponse,
     MacroDataInput,
 )
+from util.lazy_imports import lazy_import
+
+pdr = lazy_import("pandas_datareader")
 
 # Default timeout for FRED API calls (in seconds)
 DEFAULT_FRED_TIMEOUT = 30
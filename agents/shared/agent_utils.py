@@ -1,11 +1,14 @@
-from typing import Optional, Tuple, Type, Union
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import TYPE_CHECKING, Optional, Tuple, Type, Union
 from pydantic import BaseModel
 
+from agents.shared.tokenization import count_tokens
 from util.logger import get_logger
 from models.metrics import TokenUsage
 
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from langchain_openai import ChatOpenAI
+
 logger = get_logger(__name__)
 
 
@@ -68,6 +71,24 @@ def _extract_token_usage(response) -> TokenUsage:
     return TokenUsage()
 
 
+def estimate_input_tokens(llm, prompt: str) -> int:
+    """
+    Estimate prompt tokens locally, falling back to the model's own counter.
+
+    Args:
+        llm: The LLM the prompt will be sent to
+        prompt: The prompt text
+
+    Returns:
+        Estimated number of input tokens
+    """
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+    tokens = count_tokens(prompt, model)
+    if tokens is None:
+        return llm.get_num_tokens(prompt)
+    return tokens
+
+
 def _aggregate_token_usage(*usages: TokenUsage) -> TokenUsage:
     """Aggregate multiple token usages into one."""
     return TokenUsage(
@@ -78,7 +99,7 @@ def _aggregate_token_usage(*usages: TokenUsage) -> TokenUsage:
 
 
 def run_agent_with_tools(
-    llm: Union[ChatOpenAI, ChatGoogleGenerativeAI],
+    llm: Union["ChatOpenAI", "ChatGoogleGenerativeAI"],
     prompt: str,
     tools: list = None,
     output_schema: Optional[Type[BaseModel]] = None,
@@ -117,7 +138,7 @@ def run_agent_with_tools(
         if token_budget:
             try:
                 # Estimate input tokens
-                input_tokens = llm.get_num_tokens(prompt)
+                input_tokens = estimate_input_tokens(llm, prompt)
                 if not check_token_budget(input_tokens, token_budget):
                     logger.warning(
                         f"Token budget would be exceeded by input: {input_tokens}/{token_budget}"
@@ -229,7 +250,7 @@ def run_agent_with_tools(
 
 
 def invoke_llm_with_metrics(
-    llm: Union[ChatOpenAI, ChatGoogleGenerativeAI],
+    llm: Union["ChatOpenAI", "ChatGoogleGenerativeAI"],
     prompt: str,
     output_schema: Optional[Type[BaseModel]] = None,
     token_budget: Optional[int] = None,
@@ -261,7 +282,7 @@ def invoke_llm_with_metrics(
     # Check if input tokens would exceed budget
     if token_budget:
         try:
-            input_tokens = llm.get_num_tokens(prompt)
+            input_tokens = estimate_input_tokens(llm, prompt)
             if not check_token_budget(current_usage + input_tokens, token_budget):
                 logger.warning(
                     f"Token budget would be exceeded by input: {current_usage + input_tokens}/{token_budget}"
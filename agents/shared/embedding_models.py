@@ -1,5 +1,28 @@
-from functools import lru_cache
-from langchain_huggingface import HuggingFaceEmbeddings
+"""
+Process-wide sentence-transformer used for both ingestion and query embedding.
+
+Chunks are embedded at ingestion through the LangChain Embeddings interface and
+queries through Chroma's embedding-function interface (see
+data/util/embedding_function.py); both resolve to the same EmbeddingEngine, so the
+model is loaded once per process and held in memory once.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from util.logger import get_logger
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = get_logger(__name__)
 
 EMBEDDING_MODELS = {
     "hf_embed_fast": "all-MiniLM-L6-v2",
@@ -7,16 +30,396 @@ EMBEDDING_MODELS = {
     "hf_embed_high_dims": "bge-base-en-v1.5",
 }
 
+DEFAULT_EMBEDDING_MODEL = EMBEDDING_MODELS["hf_embed_fast"]
+DEFAULT_BATCH_SIZE = 32
+
+# Padded tokens per forward pass: texts are sorted by length and batched so that
+# rows x longest text stays within the budget, so short texts go in large batches
+# and long ones in small ones; 0 uses fixed batches of batch_size texts
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "16384"))
+# Rough peak activation memory per padded token of a MiniLM/BERT-base sized model
+# at inference (one layer's attention scores and feed-forward activations), used to
+# keep a batch within free memory
+ACTIVATION_BYTES_PER_TOKEN = 32 * 1024
+
+# "torch" runs the sentence-transformers model as is; "onnx" runs an ONNX Runtime
+# export (needs `pip install optimum[onnxruntime]`)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# int8 dynamic quantization of the ONNX model for this instruction set (arm64, avx2,
+# avx512, avx512_vnni); empty runs the float32 export
+EMBEDDING_ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")
+# ONNX Runtime intra-op threads; 0 uses torch's thread count, which forked workers
+# split between them (see util/prefork.py)
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+# Directory of local exports (scripts/export_onnx_embeddings.py), one subdirectory
+# per model; models without one load the ONNX files published with the model
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "data/onnx")
+
+# File names sentence-transformers gives quantized exports
+ONNX_QUANTIZED_FILES = {
+    "arm64": "onnx/model_qint8_arm64.onnx",
+    "avx2": "onnx/model_quint8_avx2.onnx",
+    "avx512": "onnx/model_qint8_avx512.onnx",
+    "avx512_vnni": "onnx/model_qint8_avx512_vnni.onnx",
+}
+
+# Search queries repeat across tickers and requests (default topics, common LLM
+# queries), so their embeddings are cached; 0 disables the cache
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "4096"))
+# Optional .npz file the cache is loaded from on first use and saved to on shutdown
+QUERY_EMBEDDING_CACHE_PATH = os.getenv("QUERY_EMBEDDING_CACHE_PATH")
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU cache of query text -> embedding, optionally persisted to disk.
+
+    Args:
+        model_name: Model the embeddings come from; a persisted cache of another
+            model is ignored
+        maxsize: Maximum number of cached queries
+        path: .npz file to load from and save to (None keeps the cache in memory)
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        maxsize: int = QUERY_EMBEDDING_CACHE_SIZE,
+        path: Optional[str] = QUERY_EMBEDDING_CACHE_PATH,
+    ):
+        self.model_name = model_name
+        self.maxsize = maxsize
+        self.path = Path(path) if path else None
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = self.path is None
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, texts: Sequence[str]) -> list[Optional[np.ndarray]]:
+        """Look up texts, returning None for every miss."""
+        self._load()
+        with self._lock:
+            vectors = []
+            for text in texts:
+                vector = self._entries.get(text)
+                if vector is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(text)
+                    self.hits += 1
+                vectors.append(vector)
+            return vectors
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                # read-only rows: the same array is handed to every caller
+                vector = np.array(vector, dtype=np.float32)
+                vector.setflags(write=False)
+                self._entries[text] = vector
+                self._entries.move_to_end(text)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.path.exists():
+                return
+            try:
+                with np.load(self.path, allow_pickle=False) as data:
+                    if str(data["model_name"]) != self.model_name:
+                        logger.info(f"Ignoring {self.path}: cached for another model")
+                        return
+                    texts, vectors = data["texts"], data["vectors"]
+            except Exception as e:
+                logger.warning(f"Could not load query embedding cache: {e}")
+                return
+        self.put_many(
+            [str(t) for t in texts[-self.maxsize :]], vectors[-self.maxsize :]
+        )
+        logger.info(f"Loaded {len(self)} cached query embeddings from {self.path}")
+
+    def save(self) -> None:
+        """Write the cache to its path (no-op for an in-memory cache)."""
+        if self.path is None or not self._loaded:
+            return
+        with self._lock:
+            if not self._entries:
+                return
+            texts = np.array(list(self._entries))
+            vectors = np.stack(list(self._entries.values()))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # written under a temporary name so a concurrent reader never sees a partial file
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, model_name=self.model_name, texts=texts, vectors=vectors)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class EmbeddingEngine(Embeddings):
+    """
+    Lazily loaded sentence-transformer with batched, thread-safe encoding.
+
+    Encoding is serialized: the fast tokenizer is not safe for concurrent use, and
+    torch (or ONNX Runtime) already spreads a single batch across its intra-op
+    threads.
+
+    Args:
+        model_name: Sentence-transformers model name or local path
+        device: Torch device
+        normalize: Normalize vectors to unit length (cosine == dot product)
+        batch_size: Texts per forward pass
+        backend: "torch" or "onnx"
+        quantization: Instruction set of the ONNX model's int8 quantization, or
+            None for the float32 export
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        device: str = "cpu",
+        normalize: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        backend: str = EMBEDDING_BACKEND,
+        quantization: Optional[str] = EMBEDDING_ONNX_QUANTIZATION or None,
+    ):
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unknown embedding backend: {backend}")
+        if quantization is not None and quantization not in ONNX_QUANTIZED_FILES:
+            raise ValueError(f"Unknown ONNX quantization: {quantization}")
+        self.model_name = model_name
+        self.device = device
+        self.normalize = normalize
+        self.batch_size = batch_size
+        self.backend = backend
+        self.quantization = quantization if backend == "onnx" else None
+        self._model: Optional["SentenceTransformer"] = None
+        self._load_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self.load_ms: Optional[float] = None
+        self.encode_calls = 0
+        self.texts_encoded = 0
+        self.encode_ms = 0.0
+        self.query_cache = QueryEmbeddingCache(self.model_id)
+
+    @property
+    def model_id(self) -> str:
+        """Model name plus the backend variant, which changes the vectors slightly."""
+        if self.backend == "torch":
+            return self.model_name
+        return f"{self.model_name}@onnx-{self.quantization or 'fp32'}"
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        """The underlying model, loaded on first access."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+
+    def _load(self) -> "SentenceTransformer":
+        from util.startup import startup_report
+
+        with startup_report.phase("embedding_model.load"):
+            start = time.perf_counter()
+            # imports torch and sentence-transformers, so deferred to first use
+            from sentence_transformers import SentenceTransformer
+
+            if self.backend == "onnx":
+                model = self._load_onnx(SentenceTransformer)
+            else:
+                model = SentenceTransformer(self.model_name, device=self.device)
+            self.load_ms = round((time.perf_counter() - start) * 1000, 2)
+        logger.info(f"Loaded embedding model {self.model_id} in {self.load_ms}ms")
+        return model
+
+    def _load_onnx(self, model_cls: type) -> "SentenceTransformer":
+        import onnxruntime as ort
+
+        threads = EMBEDDING_ONNX_THREADS
+        if threads <= 0:
+            import torch
+
+            threads = torch.get_num_threads()
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        # one forward pass runs at a time (see _encode_lock)
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        local = Path(EMBEDDING_ONNX_DIR) / Path(self.model_name).name
+        model_kwargs = {"provider": "CPUExecutionProvider", "session_options": options}
+        if self.quantization:
+            model_kwargs["file_name"] = ONNX_QUANTIZED_FILES[self.quantization]
+        return model_cls(
+            str(local) if local.exists() else self.model_name,
+            device=self.device,
+            backend="onnx",
+            model_kwargs=model_kwargs,
+        )
+
+    @property
+    def dimensions(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def token_batches(self, texts: Sequence[str]) -> list[list[int]]:
+        """
+        Split texts into length-bucketed batches within the token budget.
+
+        Token counts are estimated at 4 characters per token, capped at the
+        model's maximum sequence length (longer texts are truncated).
+
+        Returns:
+            Batches of indices into texts, longest texts first
+        """
+        max_tokens = getattr(self.model, "max_seq_length", None) or 512
+        lengths = [min(max_tokens, len(text) // 4 + 2) for text in texts]
+        budget = max(max_tokens, min(EMBEDDING_BATCH_TOKENS, _memory_token_budget()))
+        batches: list[list[int]] = []
+        longest = 0
+        for i in sorted(range(len(texts)), key=lambda i: -lengths[i]):
+            # sorted longest first, so a batch's first text sets its padded length
+            if batches and (len(batches[-1]) + 1) * longest <= budget:
+                batches[-1].append(i)
+            else:
+                batches.append([i])
+                longest = lengths[i]
+        return batches
+
+    def encode(
+        self, texts: Sequence[str], batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Embed texts in batches.
+
+        Args:
+            texts: Texts to embed
+            batch_size: Texts per forward pass; by default texts are batched by
+                EMBEDDING_BATCH_TOKENS (or the engine's batch size if that is 0)
+
+        Returns:
+            float32 array of shape (len(texts), dimensions)
+        """
+        if not texts:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+
+        self.model  # loaded outside the encode lock
+        with self._encode_lock:
+            start = time.perf_counter()
+            if batch_size or EMBEDDING_BATCH_TOKENS <= 0:
+                embeddings = self._encode_batch(texts, batch_size or self.batch_size)
+            else:
+                embeddings = np.empty((len(texts), self.dimensions), dtype=np.float32)
+                for batch in self.token_batches(texts):
+                    embeddings[batch] = self._encode_batch(
+                        [texts[i] for i in batch], len(batch)
+                    )
+            self.encode_calls += 1
+            self.texts_encoded += len(texts)
+            self.encode_ms += (time.perf_counter() - start) * 1000
+        return embeddings.astype(np.float32, copy=False)
+
+    def _encode_batch(self, texts: Sequence[str], batch_size: int) -> np.ndarray:
+        return self.model.encode(
+            list(texts),
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize,
+            show_progress_bar=False,
+        )
+
+    def encode_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """
+        Embed search queries through the query cache; only misses are encoded.
+
+        Returns:
+            float32 array of shape (len(queries), dimensions)
+        """
+        vectors = self.query_cache.get_many(queries)
+        missing = list(dict.fromkeys(q for q, v in zip(queries, vectors) if v is None))
+        if missing:
+            encoded = self.encode(missing)
+            self.query_cache.put_many(missing, encoded)
+            by_query = dict(zip(missing, encoded))
+            vectors = [
+                by_query[q] if v is None else v for q, v in zip(queries, vectors)
+            ]
+        if not vectors:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return np.stack(vectors)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.encode_queries([text])[0].tolist()
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "quantization": self.quantization,
+            "loaded": self.loaded,
+            "load_ms": self.load_ms,
+            "encode_calls": self.encode_calls,
+            "texts_encoded": self.texts_encoded,
+            "encode_ms": round(self.encode_ms, 2),
+            "query_cache": self.query_cache.stats(),
+        }
+
+
+def _memory_token_budget() -> int:
+    """Padded tokens whose activations fit in half of the free memory."""
+    try:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return EMBEDDING_BATCH_TOKENS
+    return available // 2 // ACTIVATION_BYTES_PER_TOKEN
+
+
+_engine: Optional[EmbeddingEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_embedding_engine() -> EmbeddingEngine:
+    """Get the process-wide embedding engine (the model itself loads on first use)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = EmbeddingEngine()
+    return _engine
+
 
-@lru_cache(maxsize=1)
-def get_embeddings() -> HuggingFaceEmbeddings:
+def get_embeddings() -> EmbeddingEngine:
     """
-    get cached hf embeddings instance
+    get the shared embeddings instance (LangChain Embeddings interface)
     first call downloads model (~130MB)
     """
-    return HuggingFaceEmbeddings(
-        model=EMBEDDING_MODELS["hf_embed_fast"],
-        model_kwargs={"device": "cpu"},
-        # remove vector length bias from similarity search
-        encode_kwargs={"normalize_embeddings": True},
-    )
+    return get_embedding_engine()
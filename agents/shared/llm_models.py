@@ -1,8 +1,12 @@
 from functools import lru_cache
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
+# provider SDKs take over a second to import, so they are loaded on first use
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from langchain_openai import ChatOpenAI
+
+    from agents.shared.token_config import TokenBudgetConfig
 
 
 LLM_MODELS = {
@@ -12,6 +16,22 @@ LLM_MODELS = {
     "google_smart": "gemini-2.5-flash",
 }
 
+# Chat model of each agent, keyed by its TokenBudgetConfig field, as
+# (provider, LLM_MODELS key, temperature). Used to pre-create the cached clients at
+# startup, so keep in sync with the agents' get_*_llm calls.
+AGENT_LLM_SETTINGS = {
+    "fundamental": ("openai", "open_ai_smart", 0.0),
+    "technical": ("openai", "open_ai_smart", 0.0),
+    "macro": ("openai", "open_ai_smart", 0.0),
+    "industry": ("google", "google_fast", 0.0),
+    "peer": ("google", "google_fast", 0.0),
+    "headline": ("google", "google_fast", 0.0),
+    "filings_query_builder": ("openai", "open_ai_fast", 0.3),
+    "filings_synthesis": ("openai", "open_ai_smart", 0.1),
+    "aggregation": ("openai", "open_ai_smart", 0.2),
+    "evaluation": ("openai", "open_ai_smart", 0.0),
+}
+
 # Default timeout for LLM API calls (in seconds)
 DEFAULT_LLM_TIMEOUT = 60
 
@@ -25,7 +45,7 @@ def get_openai_llm(
     temperature: float = 0.0,
     timeout: int = DEFAULT_LLM_TIMEOUT,
     max_tokens: Optional[int] = DEFAULT_MAX_TOKENS,
-) -> ChatOpenAI:
+) -> "ChatOpenAI":
     """
     Get a cached ChatOpenAI instance.
 
@@ -38,6 +58,8 @@ def get_openai_llm(
     Returns:
         Cached ChatOpenAI instance
     """
+    from langchain_openai import ChatOpenAI
+
     return ChatOpenAI(
         model=model,
         temperature=temperature,
@@ -53,7 +75,7 @@ def get_google_llm(
     with_search_grounding: bool = False,
     timeout: int = DEFAULT_LLM_TIMEOUT,
     max_tokens: Optional[int] = DEFAULT_MAX_TOKENS,
-) -> ChatGoogleGenerativeAI:
+) -> "ChatGoogleGenerativeAI":
     """
     Get a cached ChatGoogleGenerativeAI instance.
 
@@ -67,6 +89,8 @@ def get_google_llm(
     Returns:
         Cached ChatGoogleGenerativeAI instance
     """
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     model_kwargs = {}
     if with_search_grounding:
         model_kwargs["tools"] = [{"google_search_retrieval": {}}]
@@ -78,3 +102,36 @@ def get_google_llm(
         max_output_tokens=max_tokens,
         model_kwargs=model_kwargs if model_kwargs else None,
     )
+
+
+def prewarm_llm_clients(token_config: "TokenBudgetConfig") -> int:
+    """
+    Create the cached LLM clients every agent will ask for under a token config.
+
+    Arguments are passed exactly as the agents pass them, so the lru_cache entries
+    created here are the ones hit by requests.
+
+    Args:
+        token_config: Token configuration whose max_output_tokens the agents use
+
+    Returns:
+        Number of distinct clients created
+    """
+    clients = set()
+    for agent, (provider, model_key, temperature) in AGENT_LLM_SETTINGS.items():
+        max_tokens = getattr(token_config, agent).max_output_tokens
+        if provider == "google":
+            llm = get_google_llm(
+                model=LLM_MODELS[model_key],
+                temperature=temperature,
+                with_search_grounding=True,
+                max_tokens=max_tokens,
+            )
+        else:
+            llm = get_openai_llm(
+                model=LLM_MODELS[model_key],
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+        clients.add(id(llm))
+    return len(clients)
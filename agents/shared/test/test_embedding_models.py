@@ -0,0 +1,103 @@
+import threading
+
+import numpy as np
+
+from agents.shared import embedding_models
+from agents.shared.embedding_models import EmbeddingEngine, QueryEmbeddingCache
+
+
+def test_engine_loads_once_across_threads(stub_engine):
+    engine = stub_engine
+    threads = [threading.Thread(target=engine.encode, args=(["x"],)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert engine.loads == 1
+    assert engine.stats()["texts_encoded"] == 8
+    assert engine.encode([]).shape == (0, 2)
+
+
+def test_token_batches_bucket_texts_by_length_within_budget(stub_engine, monkeypatch):
+    monkeypatch.setattr(embedding_models, "EMBEDDING_BATCH_TOKENS", 2048)
+    engine = stub_engine
+    texts = ["x" * 2000] * 3 + ["short"] * 100 + ["y" * 400] * 10
+    batches = engine.token_batches(texts)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(texts)))
+    # each batch pads to its first (longest) text and stays within the budget
+    lengths = [len(text) // 4 + 2 for text in texts]
+    for batch in batches:
+        assert len(batch) * lengths[batch[0]] <= 2048
+    assert [len(batch) for batch in batches] == [4, 20, 89]
+    # the vectors come back in the input order
+    assert engine.encode(texts)[:, 0].tolist() == [len(text) for text in texts]
+
+
+def test_chroma_embedding_function_uses_shared_engine(stub_engine):
+    from data.util.embedding_function import EngineEmbeddingFunction
+
+    engine = stub_engine
+
+    embedding_fn = EngineEmbeddingFunction()
+    vectors = embedding_fn(["ab", "abcd"])
+
+    assert [v.tolist() for v in vectors] == [[2.0, 1.0], [4.0, 1.0]]
+    assert vectors[0].dtype == np.float32
+    assert embedding_fn.get_config()["model_name"] == "stub"
+    assert isinstance(
+        EngineEmbeddingFunction.build_from_config(embedding_fn.get_config()),
+        EngineEmbeddingFunction,
+    )
+    assert embedding_models.get_embeddings() is engine
+
+
+def test_query_cache_serves_repeats_and_persists(stub_engine, tmp_path):
+    engine = stub_engine
+    engine.query_cache = QueryEmbeddingCache("stub", maxsize=2, path=tmp_path / "q.npz")
+
+    first = engine.encode_queries(["risk", "debt", "risk"])
+    assert first.tolist() == [[4.0, 1.0], [4.0, 1.0], [4.0, 1.0]]
+    assert engine.texts_encoded == 2  # "risk" is encoded once
+    engine.encode_queries(["debt"])
+    assert engine.texts_encoded == 2
+    assert engine.query_cache.stats()["hits"] == 1
+
+    engine.encode_queries(["growth"])  # evicts "risk", the least recently used
+    assert len(engine.query_cache) == 2
+    engine.query_cache.save()
+
+    reloaded = QueryEmbeddingCache("stub", path=tmp_path / "q.npz")
+    assert [v is not None for v in reloaded.get_many(["risk", "debt", "growth"])] == [
+        False,
+        True,
+        True,
+    ]
+    other_model = QueryEmbeddingCache("other", path=tmp_path / "q.npz")
+    assert other_model.get_many(["debt"]) == [None]
+
+
+def test_onnx_backend_loads_quantized_export_with_tuned_threads(tmp_path, monkeypatch):
+    loaded = {}
+
+    def model_cls(name_or_path, **kwargs):
+        loaded.update(kwargs, name_or_path=name_or_path)
+        return object()
+
+    monkeypatch.setattr(embedding_models, "EMBEDDING_ONNX_DIR", str(tmp_path))
+    monkeypatch.setattr(embedding_models, "EMBEDDING_ONNX_THREADS", 3)
+    (tmp_path / "all-MiniLM-L6-v2").mkdir()
+    engine = EmbeddingEngine(
+        "sentence-transformers/all-MiniLM-L6-v2", backend="onnx", quantization="avx2"
+    )
+    engine._load_onnx(model_cls)
+
+    # a local export is preferred over the files published with the model
+    assert loaded["name_or_path"] == str(tmp_path / "all-MiniLM-L6-v2")
+    assert loaded["backend"] == "onnx"
+    assert loaded["model_kwargs"]["file_name"] == "onnx/model_quint8_avx2.onnx"
+    assert loaded["model_kwargs"]["session_options"].intra_op_num_threads == 3
+    # int8 vectors differ slightly, so caches keep them apart from torch's
+    assert engine.model_id == "sentence-transformers/all-MiniLM-L6-v2@onnx-avx2"
+    assert EmbeddingEngine("m", backend="torch", quantization="avx2").model_id == "m"
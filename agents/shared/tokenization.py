@@ -0,0 +1,147 @@
+"""Local token counting for budget checks.
+
+Counting tokens through the chat model (`llm.get_num_tokens`) re-encodes the whole
+prompt on every call and, for Gemini, is a remote API call. Token counts are instead
+estimated locally with tiktoken, and the static part of every agent prompt is
+tokenized once (at warmup) so only the request-specific tail is encoded per call.
+"""
+
+import importlib
+import threading
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Encoding used for models tiktoken does not know (e.g. Gemini)
+DEFAULT_ENCODING = "o200k_base"
+
+# Static agent prompts as (module, attribute)
+STATIC_PROMPTS = [
+    ("agents.aggregation.prompt", "research_aggregation_prompt"),
+    ("agents.evaluation.prompt", "sentiment_evaluator_prompt"),
+    ("agents.fundamentals.prompt", "fundamentals_research_prompt"),
+    ("agents.headline.prompt", "headline_research_prompt"),
+    ("agents.industry.prompt", "industry_research_prompt"),
+    ("agents.macro.prompt", "macro_research_prompt"),
+    ("agents.peer.prompt", "peer_research_prompt"),
+    ("agents.technical.prompt", "technical_research_prompt"),
+    ("agents.filings.prompts.query_builder_prompt", "query_builder_prompt"),
+    ("agents.filings.prompts.synthesis_prompt", "filings_synthesis_prompt"),
+]
+
+# encoding name -> {static prompt prefix: token count}
+_prefix_tokens: dict[str, dict[str, int]] = {}
+_prefix_lock = threading.Lock()
+
+# parallel agents must not all attempt the (possibly downloading) first load
+_encoding_lock = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _encoding_name(model: Optional[str]) -> str:
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_name_for_model(model or "")
+    except KeyError:
+        return DEFAULT_ENCODING
+
+
+@lru_cache(maxsize=4)
+def _load_encoding(name: str):
+    import tiktoken
+
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        # tiktoken downloads its BPE files on first use; remember the failure
+        logger.warning(f"Tokenizer {name} unavailable, using model token counts: {e}")
+        return None
+
+
+def get_encoding(model: Optional[str] = None):
+    """
+    Get the (cached) tiktoken encoding for a model.
+
+    Returns:
+        The encoding, or None if it cannot be loaded
+    """
+    name = _encoding_name(model)
+    with _encoding_lock:
+        return _load_encoding(name)
+
+
+def static_prompt_prefix(prompt: str) -> str:
+    """Literal text of a prompt template up to its first format placeholder."""
+    return prompt.split("{", 1)[0]
+
+
+def load_static_prompts() -> list[str]:
+    """Import and return the static agent prompts."""
+    return [
+        getattr(importlib.import_module(module), attribute)
+        for module, attribute in STATIC_PROMPTS
+    ]
+
+
+def pretokenize_prompts(prompts: Iterable[str], model: Optional[str] = None) -> int:
+    """
+    Tokenize static prompt prefixes once so count_tokens only encodes the rest.
+
+    Args:
+        prompts: Prompt templates or fixed prompts
+        model: Model whose encoding is used
+
+    Returns:
+        Number of prefixes registered (0 if the tokenizer is unavailable)
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        return 0
+    counts = {}
+    for prompt in prompts:
+        prefix = static_prompt_prefix(prompt)
+        if prefix:
+            counts[prefix] = len(encoding.encode(prefix, disallowed_special=()))
+    with _prefix_lock:
+        # published as a new dict, so readers never see one being mutated
+        _prefix_tokens[encoding.name] = {
+            **_prefix_tokens.get(encoding.name, {}),
+            **counts,
+        }
+    return len(counts)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> Optional[int]:
+    """
+    Estimate the number of tokens in text.
+
+    A registered static prefix is counted from its cached tokenization, so the
+    estimate can differ by a token from a full encode at the prefix boundary.
+
+    Returns:
+        Token count, or None if no local tokenizer is available
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        return None
+
+    prefixes = _prefix_tokens.get(encoding.name, {})
+    best = ""
+    for prefix in prefixes:
+        if len(prefix) > len(best) and text.startswith(prefix):
+            best = prefix
+    tokens = prefixes[best] if best else 0
+    return tokens + len(encoding.encode(text[len(best) :], disallowed_special=()))
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count tokens locally, or estimate them at 4 characters per token when no
+    tokenizer is available.
+    """
+    tokens = count_tokens(text, model)
+    return tokens if tokens is not None else len(text) // 4
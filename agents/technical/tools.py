@@ -2,10 +2,12 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 
 import pandas as pd
-import yfinance as yf
 from langchain_core.tools import Tool
 
 from models.tools import TechnicalAnalysis, TechnicalAnalysisInput
+from util.lazy_imports import lazy_import
+
+yf = lazy_import("yfinance")
 
 
 # Default configuration for technical indicators
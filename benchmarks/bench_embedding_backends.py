@@ -0,0 +1,149 @@
+"""
+Benchmark of the embedding backends: sentence-transformers on torch against ONNX
+Runtime (float32 and int8 dynamically quantized exports).
+
+Chunks the filings like ingestion does, embeds them with every backend, and reports
+throughput in chunks per second, the load time, and retrieval agreement with the
+torch backend: for each query, the overlap of the top-k chunks by cosine similarity
+(1.0 means the same k chunks). Defaults to the test fixtures plus the synthetic 10-K
+of util/offline.py; pass cached filings (data/filings/<TICKER>/*.html, kept
+with keep_html=True) for real numbers. Needs the models (and, for the ONNX
+backends, `pip install optimum[onnxruntime]`).
+
+Usage:
+    python benchmarks/bench_embedding_backends.py [--files data/filings/AAPL/*.html]
+        [--model all-MiniLM-L6-v2] [--quantization avx2 avx512_vnni]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.filings.agents.query_builder import _get_default_queries
+from agents.filings.agents.retriever import DEFAULT_SEARCH_TOPICS
+from agents.shared.embedding_models import DEFAULT_EMBEDDING_MODEL, EmbeddingEngine
+from benchmarks.bench_html_extraction import FIXTURES, synthetic_filing
+from data.util.filing_chunker import chunk_filing
+from data.util.parse_sec_filing import parse_filing
+from models.agent import FilingMetadata
+from models.state import TradeDirection
+
+
+def filing_chunks(filings: dict[str, str]) -> list[str]:
+    texts = []
+    for name, html in filings.items():
+        filing_type = "10-Q" if "10q" in name.lower() else "10-K"
+        metadata = FilingMetadata(
+            ticker="BENCH",
+            filing_type=filing_type,
+            filing_date="2024-01-01",
+            accession_number=name,
+            url="",
+        )
+        sections = parse_filing(html, filing_type)
+        texts.extend(chunk.text for chunk in chunk_filing(sections, metadata))
+    return texts
+
+
+def top_k(queries: np.ndarray, chunks: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-(queries @ chunks.T), axis=1)[:, :k]
+
+
+def run_backend(engine: EmbeddingEngine, texts: list[str], queries: list[str]):
+    engine.model
+    engine.encode(texts[: engine.batch_size])  # warm up the session
+    start = time.perf_counter()
+    chunks = engine.encode(texts)
+    seconds = time.perf_counter() - start
+    return chunks, engine.encode(queries), seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=Path, nargs="+")
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument(
+        "--quantization",
+        nargs="*",
+        default=["avx2"],
+        help="Instruction sets of the int8 ONNX exports to compare",
+    )
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--k", type=int, default=6)
+    args = parser.parse_args()
+
+    if args.files:
+        filings = {path.name: path.read_text(encoding="utf-8") for path in args.files}
+    else:
+        filings = {
+            path.name: path.read_text(encoding="utf-8")
+            for path in sorted(FIXTURES.glob("*.htm"))
+        }
+        filings["synthetic-10-K"] = synthetic_filing(args.paragraphs)
+    texts = filing_chunks(filings)
+    queries = DEFAULT_SEARCH_TOPICS + [
+        query
+        for direction in TradeDirection
+        for query in _get_default_queries(direction)
+    ]
+
+    variants = {"torch": EmbeddingEngine(args.model, backend="torch")}
+    variants["onnx-fp32"] = EmbeddingEngine(
+        args.model, backend="onnx", quantization=None
+    )
+    for quantization in args.quantization:
+        variants[f"onnx-int8-{quantization}"] = EmbeddingEngine(
+            args.model, backend="onnx", quantization=quantization
+        )
+
+    results = []
+    baseline = None
+    for name, engine in variants.items():
+        try:
+            chunks, query_vectors, seconds = run_backend(engine, texts, queries)
+        except Exception as e:
+            results.append({"backend": name, "error": str(e)})
+            continue
+        result = {
+            "backend": name,
+            "load_ms": engine.load_ms,
+            "chunks_per_s": round(len(texts) / seconds, 1),
+        }
+        ranking = top_k(query_vectors, chunks, args.k)
+        if name == "torch":
+            baseline = (chunks, ranking, result["chunks_per_s"])
+        elif baseline is not None:
+            overlap = [
+                len(set(ours) & set(theirs)) / args.k
+                for ours, theirs in zip(ranking, baseline[1])
+            ]
+            result["top_k_overlap"] = round(float(np.mean(overlap)), 3)
+            result["min_top_k_overlap"] = round(float(np.min(overlap)), 3)
+            result["mean_cosine_to_torch"] = round(
+                float(np.mean(np.sum(chunks * baseline[0], axis=1))), 4
+            )
+            result["speedup"] = round(result["chunks_per_s"] / baseline[2], 2)
+        results.append(result)
+
+    print(
+        json.dumps(
+            {
+                "model": args.model,
+                "chunks": len(texts),
+                "queries": len(queries),
+                "k": args.k,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
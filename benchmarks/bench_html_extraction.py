@@ -0,0 +1,104 @@
+"""
+Micro-benchmark of the HTML-to-text backends of parse_sec_filing.
+
+Extracts the text of each filing with every backend, checks that the backends
+agree, and reports throughput in MB of HTML per second. Defaults to the test
+fixtures plus two large synthetic filings: the text-heavy filing of
+util/offline.py, and the inline XBRL fixture with its pages repeated, whose
+tag density (a styled span per phrase) is typical of real 10-Ks. Pass cached
+filings (data/filings/<TICKER>/*.html, kept with keep_html=True) for real numbers.
+
+Usage:
+    python benchmarks/bench_html_extraction.py [--files data/filings/AAPL/*.html]
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from util.offline import FakeSECFetcher, LatencyModel
+from data.util.parse_sec_filing import HTML_BACKENDS, extract_text_from_html
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = ROOT / "data" / "util" / "test" / "fixtures"
+
+
+def synthetic_filing(paragraphs: int) -> str:
+    fetcher = FakeSECFetcher(LatencyModel(), paragraphs_per_section=paragraphs)
+    filing = next(
+        f for f in fetcher.fetch_filing_list("AAPL") if f.filing_type == "10-K"
+    )
+    return fetcher.download_filing(filing)
+
+
+def repeated_fixture(pages: int) -> str:
+    """The inline XBRL fixture with its body repeated."""
+    html = (FIXTURES / "10k_inline_xbrl.htm").read_text(encoding="utf-8")
+    head, body = html.split("<body>", 1)
+    body, tail = body.rsplit("</body>", 1)
+    return f"{head}<body>{body * pages}</body>{tail}"
+
+
+def measure(fn, repeat: int) -> float:
+    """Best-of-repeat seconds per call."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=Path, nargs="+")
+    parser.add_argument(
+        "--paragraphs",
+        type=int,
+        default=2000,
+        help="Paragraphs per section of the text-heavy synthetic filing",
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=1000,
+        help="Repetitions of the inline XBRL fixture's body",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.files:
+        filings = {path.name: path.read_text(encoding="utf-8") for path in args.files}
+    else:
+        filings = {
+            path.name: path.read_text(encoding="utf-8")
+            for path in sorted(FIXTURES.glob("*.htm"))
+        }
+        filings["synthetic-10-K"] = synthetic_filing(args.paragraphs)
+        filings[f"10k_inline_xbrl.htm x{args.pages}"] = repeated_fixture(args.pages)
+
+    results = []
+    for name, html in filings.items():
+        megabytes = len(html.encode("utf-8")) / 1e6
+        texts = {
+            backend: extract_text_from_html(html, backend) for backend in HTML_BACKENDS
+        }
+        result = {
+            "filing": name,
+            "mb": round(megabytes, 3),
+            "equivalent": len(set(texts.values())) == 1,
+        }
+        for backend in HTML_BACKENDS:
+            seconds = measure(
+                lambda: extract_text_from_html(html, backend), args.repeat
+            )
+            result[f"{backend}_mb_per_s"] = round(megabytes / seconds, 2)
+        result["speedup"] = round(result["lxml_mb_per_s"] / result["bs4_mb_per_s"], 2)
+        results.append(result)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Micro-benchmark of the graph's metrics reducer.
+
+Folds N per-node RequestMetrics deltas (one agent metric and one node timing each,
+as timed_node produces them) the way LangGraph's reducer channel does, once with the
+previous RequestMetrics.merge and once with MetricsAccumulator, and reports the
+reducer cost per node plus the one-off cost of materializing the response.
+
+Usage:
+    python benchmarks/bench_metrics_reducer.py --nodes 8 16 64 256
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from functools import reduce
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.metrics import (
+    AgentMetrics,
+    MetricsAccumulator,
+    NodeTiming,
+    RequestMetrics,
+    TokenUsage,
+    merge_metrics,
+)
+
+REQUEST_ID = "bench"
+
+
+def node_deltas(count: int) -> list[RequestMetrics]:
+    deltas = []
+    for i in range(count):
+        delta = RequestMetrics()
+        delta.add_agent_metrics(
+            AgentMetrics(
+                agent_name=f"agent_{i}",
+                latency_ms=10.0,
+                token_usage=TokenUsage(
+                    input_tokens=100, output_tokens=50, total_tokens=150
+                ),
+            )
+        )
+        delta.add_node_timing(
+            NodeTiming(
+                node=f"node_{i}",
+                request_id=REQUEST_ID,
+                start_ms=float(i),
+                end_ms=float(i + 1),
+            )
+        )
+        deltas.append(delta)
+    return deltas
+
+
+def fold_request_metrics(deltas: list[RequestMetrics]) -> RequestMetrics:
+    initial = RequestMetrics(request_id=REQUEST_ID, started_at=0.0)
+    return reduce(lambda left, right: left.merge(right), deltas, initial)
+
+
+def fold_accumulator(deltas: list[RequestMetrics]) -> MetricsAccumulator:
+    initial = MetricsAccumulator(request_id=REQUEST_ID, started_at=0.0)
+    return reduce(merge_metrics, deltas, initial)
+
+
+def measure(fn, repeat: int) -> float:
+    """Best-of-repeat seconds per call."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[8, 16, 64, 256])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for count in args.nodes:
+        deltas = node_deltas(count)
+        accumulated = fold_accumulator(deltas)
+        # both reducers must agree before their timings mean anything
+        assert (
+            fold_request_metrics(deltas).to_response_dict()
+            == accumulated.to_response_dict()
+        )
+
+        merge_s = measure(lambda: fold_request_metrics(deltas), args.repeat)
+        accumulate_s = measure(lambda: fold_accumulator(deltas), args.repeat)
+        materialize_s = measure(
+            lambda: fold_accumulator(deltas).to_response_dict(), args.repeat
+        )
+        results.append(
+            {
+                "nodes": count,
+                "merge_us_per_node": round(merge_s / count * 1e6, 2),
+                "accumulator_us_per_node": round(accumulate_s / count * 1e6, 2),
+                "materialize_us": round((materialize_s - accumulate_s) * 1e6, 2),
+                "speedup": round(merge_s / accumulate_s, 2),
+            }
+        )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Micro-benchmark of section boundary detection in parse_sec_filing.
+
+Compares the previous detection (one re.finditer per pattern, every match
+materialized) with the current one (precompiled patterns, first match only) on
+10-K sized text, after checking that both find the same boundaries. A combined
+alternation of all patterns, which scans the text once, is measured too. Two
+synthetic documents are used: a 10-K whose headings all appear early (in its
+table of contents), and a 10-Q without a risk factors section, for which one
+pattern has to scan to the end. Pass cached filings (data/filings/<TICKER>/*.html) to measure real ones.
+
+Usage:
+    python benchmarks/bench_section_scan.py [--files data/filings/AAPL/*.html]
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data.util.parse_sec_filing import (
+    SECTION_PATTERNS,
+    extract_text_from_html,
+    find_section_boundaries,
+)
+
+FILLER = (
+    "The Company's operations and performance depend significantly on global and "
+    "regional economic conditions. Net sales increased during the year, driven by "
+    "higher sales of services, partially offset by lower product sales.\n"
+)
+
+
+def legacy_find_section_boundaries(
+    text: str, patterns: dict[str, str]
+) -> dict[str, tuple[int, int]]:
+    """find_section_boundaries as it was before the single-pass scanner."""
+    section_starts = []
+    for section_name, pattern in patterns.items():
+        matches = list(re.finditer(pattern, text, re.IGNORECASE))
+        if matches:
+            section_starts.append((matches[0].start(), section_name))
+    section_starts.sort(key=lambda x: x[0])
+
+    boundaries = {}
+    for i, (start, name) in enumerate(section_starts):
+        end = section_starts[i + 1][0] if i + 1 < len(section_starts) else len(text)
+        boundaries[name] = (start, end)
+    return boundaries
+
+
+def alternation_find_section_starts(text: str, patterns: dict[str, str]) -> dict:
+    """Section starts from one pass of a named-group alternation of the patterns."""
+    scanner = re.compile(
+        "|".join(f"(?P<{name}>{pattern})" for name, pattern in patterns.items()),
+        re.IGNORECASE,
+    )
+    starts: dict[str, int] = {}
+    for match in scanner.finditer(text):
+        starts.setdefault(match.lastgroup, match.start())
+        if len(starts) == len(patterns):
+            break
+    return starts
+
+
+def synthetic_text(headings: list[str], size: int, toc: bool) -> str:
+    """Headings separated by filler, about size characters in total."""
+    filler = FILLER * max(1, size // (len(FILLER) * len(headings)))
+    parts = ["TABLE OF CONTENTS\n" + "\n".join(headings) + "\n"] if toc else []
+    for heading in headings:
+        parts.append(f"{heading}\n{filler}")
+    return "".join(parts)
+
+
+def measure(fn, repeat: int) -> float:
+    """Best-of-repeat seconds per call."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=Path, nargs="+")
+    parser.add_argument(
+        "--size", type=int, default=600_000, help="Characters of synthetic text"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.files:
+        # file names do not carry the filing type: measure them as 10-Ks
+        documents = {
+            path.name: ("10-K", extract_text_from_html(path.read_text("utf-8")))
+            for path in args.files
+        }
+    else:
+        documents = {
+            "10-K with table of contents": (
+                "10-K",
+                synthetic_text(
+                    [
+                        "Item 1. Business",
+                        "Item 1A. Risk Factors",
+                        "Item 7. Management's Discussion and Analysis",
+                        "Item 8. Financial Statements and Supplementary Data",
+                    ],
+                    args.size,
+                    toc=True,
+                ),
+            ),
+            "10-Q without risk factors": (
+                "10-Q",
+                synthetic_text(
+                    [
+                        "PART I. FINANCIAL INFORMATION",
+                        "Item 2. Management's Discussion and Analysis",
+                    ],
+                    args.size,
+                    toc=False,
+                ),
+            ),
+        }
+
+    results = []
+    for name, (filing_type, text) in documents.items():
+        patterns = SECTION_PATTERNS[filing_type]
+        # both detections must agree before their timings mean anything
+        assert find_section_boundaries(
+            text, patterns
+        ) == legacy_find_section_boundaries(text, patterns)
+
+        legacy_s = measure(
+            lambda: legacy_find_section_boundaries(text, patterns), args.repeat
+        )
+        current_s = measure(
+            lambda: find_section_boundaries(text, patterns), args.repeat
+        )
+        alternation_s = measure(
+            lambda: alternation_find_section_starts(text, patterns), args.repeat
+        )
+        results.append(
+            {
+                "document": name,
+                "chars": len(text),
+                "legacy_ms": round(legacy_s * 1000, 3),
+                "current_ms": round(current_s * 1000, 3),
+                "alternation_ms": round(alternation_s * 1000, 3),
+                "speedup": round(legacy_s / current_s, 2),
+            }
+        )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
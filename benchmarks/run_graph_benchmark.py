@@ -0,0 +1,334 @@
+"""
+Offline end-to-end benchmark of research_chain.
+
+LLMs, yfinance, FRED, EDGAR and the embedding model are replaced by the fakes in
+util.offline, so the numbers reflect graph overhead, concurrency behaviour and
+cache effectiveness rather than provider latency or token spend.
+
+Usage:
+    python benchmarks/run_graph_benchmark.py --requests 50 --concurrency 8
+    python benchmarks/run_graph_benchmark.py --output bench.json --baseline main.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+import numpy as np
+
+from util.offline import DISTRIBUTIONS, OfflineSettings, offline_environment
+
+# Metrics compared against a baseline report, all "lower is better"
+REGRESSION_METRICS = ("latency_ms.p50", "latency_ms.p95", "peak_rss_mb")
+
+
+def _rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+
+        # ru_maxrss is the peak (KB on Linux, bytes on macOS), the best we can do here
+        scale = 2**20 if sys.platform == "darwin" else 2**10
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+class ResourceMonitor(threading.Thread):
+    """Samples thread count and RSS in the background while the benchmark runs."""
+
+    def __init__(self, interval: float = 0.05):
+        super().__init__(name="benchmark-monitor", daemon=True)
+        self.interval = interval
+        self.peak_threads = threading.active_count()
+        self.peak_rss_mb = _rss_mb()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_rss_mb = max(self.peak_rss_mb, _rss_mb())
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def offline_settings(args: argparse.Namespace) -> OfflineSettings:
+    return OfflineSettings(
+        **{name: getattr(args, name) for name in OfflineSettings.model_fields}
+    )
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    data = np.asarray(values)
+    return {
+        "mean": round(float(data.mean()), 2),
+        "p50": round(float(np.percentile(data, 50)), 2),
+        "p95": round(float(np.percentile(data, 95)), 2),
+        "p99": round(float(np.percentile(data, 99)), 2),
+        "max": round(float(data.max()), 2),
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    """Drive research_chain with the configured workload and summarize the run."""
+    from graph import NESTED_NODES, NODE_DEPENDENCIES, cache, research_chain
+    from util.critical_path import CriticalPathReport, analyze_critical_path
+
+    report = CriticalPathReport()
+    node_runs: Counter = Counter()
+    node_cached: Counter = Counter()
+    latencies: list[float] = []
+    errors: Counter = Counter()
+
+    def request_input(i: int) -> dict:
+        return {
+            "ticker": args.tickers[i % len(args.tickers)],
+            "trade_duration": args.trade_duration,
+            "trade_direction": args.trade_direction,
+        }
+
+    async def one_request(i: int, semaphore: asyncio.Semaphore, record: bool):
+        async with semaphore:
+            if args.cold:
+                cache.clear()
+            start = time.perf_counter()
+            try:
+                res = await research_chain.ainvoke(request_input(i))
+            except Exception as e:
+                if record:
+                    errors[type(e).__name__] += 1
+                return
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if not record:
+                return
+
+            latencies.append(elapsed_ms)
+            res.metrics.total_latency_ms = elapsed_ms
+            analysis = analyze_critical_path(
+                res.metrics, NODE_DEPENDENCIES, nested=NESTED_NODES
+            )
+            report.record(analysis)
+            cached = set(analysis.cached_nodes)
+            for key in res.metrics.node_timings:
+                node = key.split("#")[0]
+                node_runs[node] += 1
+                node_cached[node] += key in cached
+
+    with offline_environment(offline_settings(args)) as (models, cassettes):
+        semaphore = asyncio.Semaphore(args.concurrency)
+        await asyncio.gather(
+            *(one_request(i, semaphore, False) for i in range(args.warmup))
+        )
+        if args.clear_cache_after_warmup:
+            cache.clear()
+
+        threads_before = threading.active_count()
+        rss_before = _rss_mb()
+        llm_calls_before = sum(m.calls for m in models.values())
+        monitor = ResourceMonitor()
+        monitor.start()
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                one_request(args.warmup + i, semaphore, True)
+                for i in range(args.requests)
+            )
+        )
+        wall_s = time.perf_counter() - started
+        monitor.stop()
+        llm_calls = sum(m.calls for m in models.values()) - llm_calls_before
+
+    total_runs = sum(node_runs.values())
+    return {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "tickers": args.tickers,
+            "cold": args.cold,
+            "distribution": args.distribution,
+            "llm_latency_ms": args.llm_latency_ms,
+            "data_latency_ms": args.data_latency_ms,
+            "embed_latency_ms": args.embed_latency_ms,
+            "revision_rate": args.revision_rate,
+            "real_embeddings": args.real_embeddings,
+            "cassettes": str(args.cassettes) if args.cassettes else None,
+            "seed": args.seed,
+        },
+        "completed": len(latencies),
+        "errors": dict(errors),
+        "wall_s": round(wall_s, 3),
+        "throughput_rps": round(len(latencies) / wall_s, 3) if wall_s else 0.0,
+        "latency_ms": percentiles(latencies),
+        "llm_calls": llm_calls,
+        "threads": {"before": threads_before, "peak": monitor.peak_threads},
+        "rss_before_mb": round(rss_before, 1),
+        "peak_rss_mb": round(monitor.peak_rss_mb, 1),
+        "cache": {
+            "hit_rate": (
+                round(sum(node_cached.values()) / total_runs, 4) if total_runs else 0.0
+            ),
+            "nodes": {
+                node: {
+                    "runs": runs,
+                    "hit_rate": round(node_cached[node] / runs, 4),
+                }
+                for node, runs in sorted(node_runs.items())
+            },
+        },
+        "cassettes": cassettes.stats() if cassettes else None,
+        "critical_path": report.summary(),
+    }
+
+
+def _lookup(report: dict, dotted: str) -> Optional[float]:
+    value = report
+    for part in dotted.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Find metrics that regressed by more than tolerance relative to a baseline report.
+
+    Returns:
+        Human readable descriptions of each regression (empty if none)
+    """
+    regressions = []
+    for metric in REGRESSION_METRICS:
+        current, previous = _lookup(report, metric), _lookup(baseline, metric)
+        if current is None or not previous:
+            continue
+        change = (current - previous) / previous
+        if change > tolerance:
+            regressions.append(
+                f"{metric}: {previous} -> {current} (+{change:.1%}, tolerance {tolerance:.0%})"
+            )
+    if report.get("errors"):
+        regressions.append(f"errors: {report['errors']}")
+    return regressions
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument(
+        "--tickers",
+        type=lambda s: [t.strip().upper() for t in s.split(",") if t.strip()],
+        default=["AAPL", "MSFT", "NVDA", "AMZN"],
+        help="Comma separated tickers, cycled across requests",
+    )
+    parser.add_argument(
+        "--trade-duration",
+        default="swing_trade",
+        choices=["day_trade", "swing_trade", "position_trade"],
+    )
+    parser.add_argument("--trade-direction", default="long", choices=["long", "short"])
+    parser.add_argument(
+        "--cold",
+        action="store_true",
+        help="Clear the node cache before every request",
+    )
+    parser.add_argument(
+        "--clear-cache-after-warmup",
+        action="store_true",
+        help="Start the measured run with an empty node cache",
+    )
+    parser.add_argument("--distribution", default="lognormal", choices=DISTRIBUTIONS)
+    parser.add_argument("--sigma", type=float, default=0.4)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--data-latency-ms", type=float, default=50.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=5.0)
+    parser.add_argument(
+        "--revision-rate",
+        type=float,
+        default=0.0,
+        help="Probability the evaluator rejects a draft, exercising the revision loop",
+    )
+    parser.add_argument(
+        "--filing-paragraphs",
+        type=int,
+        default=40,
+        help="Paragraphs per section in synthetic filings",
+    )
+    parser.add_argument(
+        "--real-embeddings",
+        action="store_true",
+        help="Use the sentence-transformers model instead of hashed embeddings",
+    )
+    parser.add_argument(
+        "--cassettes",
+        type=Path,
+        help="Replay yfinance/FRED/EDGAR from this cassette directory instead of fakes",
+    )
+    parser.add_argument(
+        "--cassette-latency",
+        default="0",
+        help='Replay delay: 0, "recorded" or a fixed number of ms',
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Keep INFO logs (they go to stdout alongside the report)",
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="Baseline JSON report")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="Allowed relative regression against the baseline",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    # replayed EDGAR cassettes still build a real SECFetcher, which needs a user agent
+    os.environ.setdefault("SEC_EDGAR_AGENT_KEY", "benchmark@example.com")
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    report = asyncio.run(run_benchmark(args))
+
+    rendered = json.dumps(report, indent=2)
+    print(rendered)
+    if args.output:
+        args.output.write_text(rendered + "\n", encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
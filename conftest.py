@@ -0,0 +1,102 @@
+"""Shared test doubles: a stub embedding engine and an isolated vector store."""
+
+from typing import Callable
+
+import numpy as np
+import pytest
+
+from agents.shared import embedding_models
+from agents.shared.embedding_models import EmbeddingEngine
+
+
+def length_vector(text: str) -> list[float]:
+    return [float(len(text)), 1.0]
+
+
+class StubModel:
+    """Stands in for a sentence-transformer, embedding each text with a function."""
+
+    def __init__(self, embed: Callable[[str], list[float]] = length_vector):
+        self.embed = embed
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return len(self.embed(""))
+
+    def encode(self, sentences, **kwargs):
+        return np.array([self.embed(s) for s in sentences], dtype=np.float32)
+
+
+class StubEngine(EmbeddingEngine):
+    """
+    Embedding engine over a StubModel, so no weights are downloaded or loaded.
+
+    Args:
+        model_name: Name reported to caches and the manifest
+        embed: Vector of one text (default: its length, then 1.0)
+    """
+
+    def __init__(
+        self,
+        model_name: str = "stub",
+        embed: Callable[[str], list[float]] = length_vector,
+        **kwargs,
+    ):
+        super().__init__(model_name=model_name, **kwargs)
+        self.embed = embed
+        self.loads = 0
+
+    def _load(self):
+        self.loads += 1
+        return StubModel(self.embed)
+
+
+@pytest.fixture
+def install_stub_engine(monkeypatch) -> Callable[..., StubEngine]:
+    """Returns a function installing a StubEngine(**kwargs) as the shared engine."""
+
+    def install(**kwargs) -> StubEngine:
+        engine = StubEngine(**kwargs)
+        monkeypatch.setattr(embedding_models, "_engine", engine)
+        return engine
+
+    return install
+
+
+@pytest.fixture
+def stub_engine(install_stub_engine) -> StubEngine:
+    """A default StubEngine installed as the shared engine."""
+    return install_stub_engine()
+
+
+@pytest.fixture
+def stub_store(tmp_path, monkeypatch):
+    """
+    Chroma client, collection registry, manifests and embedding cache under tmp_path.
+
+    Returns:
+        The fresh collection registry
+    """
+    import chromadb
+
+    from data.util import (
+        embedding_cache,
+        filing_manifest,
+        ingest_sec_filings,
+        vector_store,
+    )
+
+    monkeypatch.setattr(
+        vector_store,
+        "_client",
+        chromadb.PersistentClient(path=str(tmp_path / "chroma")),
+    )
+    registry = vector_store.CollectionRegistry()
+    monkeypatch.setattr(vector_store, "_registry", registry)
+    monkeypatch.setattr(filing_manifest, "MANIFEST_DIR", tmp_path / "manifests")
+    monkeypatch.setattr(
+        embedding_cache, "EMBEDDING_CACHE_DIR", str(tmp_path / "embeddings")
+    )
+    monkeypatch.setattr(embedding_cache, "_caches", {})
+    # no background refresh from EDGAR of the collections a test fills
+    monkeypatch.setattr(ingest_sec_filings, "FILINGS_REFRESH_INTERVAL_S", 0)
+    return registry
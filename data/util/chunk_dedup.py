@@ -0,0 +1,163 @@
+"""
+Content fingerprints of filing chunks, for deduplication before embedding.
+
+Successive 10-Qs repeat risk factors, accounting policies and forward-looking
+statement disclaimers nearly word for word. Each chunk is fingerprinted by a hash of
+its normalized text (and, optionally, a 64-bit SimHash of its word shingles for
+near-duplicates); a chunk whose fingerprint matches an already stored chunk of the
+ticker is not embedded again.
+"""
+
+import os
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from hashlib import blake2b
+from typing import Iterable, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+# skip: duplicates are not stored; reuse: stored with the existing chunk's vector;
+# off: every chunk is embedded and stored
+CHUNK_DEDUP = os.getenv("CHUNK_DEDUP", "skip")
+
+# Maximum SimHash Hamming distance of a near-duplicate (out of 64 bits); 0 matches
+# exact duplicates only. A one-word edit of a ~1000 character chunk moves about 3
+# bits, unrelated chunks are 20+ bits apart.
+CHUNK_NEAR_DUPLICATE_BITS = int(os.getenv("CHUNK_NEAR_DUPLICATE_BITS", "0"))
+
+SHINGLE_WORDS = 3
+
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"\w+")
+
+
+class ChunkRecord(BaseModel):
+    """Fingerprint of a chunk and where its vector is stored."""
+
+    chunk_id: str
+    accession_number: str
+    content_hash: str
+    simhash: Optional[int] = None
+    stored_id: str  # id of the stored chunk holding this text's vector
+    duplicate: bool = False
+
+    @property
+    def stored(self) -> bool:
+        return self.stored_id == self.chunk_id
+
+
+def normalize_text(text: str) -> str:
+    """Fold case, compatibility characters (curly quotes, nbsp) and whitespace."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text).casefold()).strip()
+
+
+def content_hash(text: str) -> str:
+    return blake2b(normalize_text(text).encode(), digest_size=16).hexdigest()
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the text's word shingles, as a signed integer (for SQLite)."""
+    words = _WORD.findall(normalize_text(text))
+    shingles = [
+        " ".join(words[i : i + SHINGLE_WORDS])
+        for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+    ]
+    hashes = np.frombuffer(
+        b"".join(blake2b(s.encode(), digest_size=8).digest() for s in shingles),
+        dtype=np.uint8,
+    ).reshape(-1, 8)
+    # each bit is set when most shingle hashes have it set
+    votes = np.unpackbits(hashes, axis=1, bitorder="little").sum(axis=0)
+    bits = np.packbits(votes * 2 > len(shingles), bitorder="little")
+    return int(bits.view("<i8")[0])
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return ((a ^ b) & 0xFFFFFFFFFFFFFFFF).bit_count()
+
+
+class ChunkIndex:
+    """
+    Fingerprints of a ticker's stored chunks, mapping to their chunk ids.
+
+    Near-duplicate candidates are found by banding: the SimHash bits are split into
+    max_distance + 1 bands, and two hashes at most max_distance bits apart agree on
+    at least one band.
+
+    Safe to share between the pipeline's embed and upsert threads.
+
+    Args:
+        max_distance: Maximum SimHash Hamming distance of a near-duplicate (0 for
+            exact duplicates only)
+    """
+
+    def __init__(self, max_distance: int = CHUNK_NEAR_DUPLICATE_BITS):
+        self.max_distance = max_distance
+        self._by_hash: dict[str, str] = {}
+        bands = min(max_distance + 1, 64)
+        self._band_bits = 64 // bands
+        self._bands: list[dict[int, list[tuple[int, str]]]] = [
+            defaultdict(list) for _ in range(bands)
+        ]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_entries(
+        cls,
+        entries: Iterable[tuple[str, Optional[int], str]],
+        max_distance: int = CHUNK_NEAR_DUPLICATE_BITS,
+    ) -> "ChunkIndex":
+        """Build an index from (content hash, simhash, stored chunk id) entries."""
+        index = cls(max_distance)
+        for hash_, simhash_, stored_id in entries:
+            index.add(hash_, simhash_, stored_id)
+        return index
+
+    @property
+    def near_duplicates(self) -> bool:
+        return self.max_distance > 0
+
+    def add(self, hash_: str, simhash_: Optional[int], stored_id: str) -> None:
+        with self._lock:
+            self._by_hash.setdefault(hash_, stored_id)
+            if simhash_ is not None and self.near_duplicates:
+                for band, buckets in zip(self._split(simhash_), self._bands):
+                    buckets[band].append((simhash_, stored_id))
+
+    def discard(self, records: Iterable[ChunkRecord]) -> None:
+        """Forget the stored chunks of records whose upsert failed."""
+        with self._lock:
+            for record in records:
+                if not record.stored:
+                    continue
+                if self._by_hash.get(record.content_hash) == record.stored_id:
+                    del self._by_hash[record.content_hash]
+                if record.simhash is not None and self.near_duplicates:
+                    entry = (record.simhash, record.stored_id)
+                    for band, buckets in zip(self._split(record.simhash), self._bands):
+                        if entry in buckets.get(band, ()):
+                            buckets[band].remove(entry)
+
+    def match(self, hash_: str, simhash_: Optional[int] = None) -> Optional[str]:
+        """Stored chunk id with the same (or a near-duplicate) text, if any."""
+        with self._lock:
+            stored_id = self._by_hash.get(hash_)
+            if stored_id is not None or simhash_ is None or not self.near_duplicates:
+                return stored_id
+            for band, buckets in zip(self._split(simhash_), self._bands):
+                for candidate, candidate_id in buckets.get(band, ()):
+                    if hamming_distance(simhash_, candidate) <= self.max_distance:
+                        return candidate_id
+            return None
+
+    def _split(self, value: int) -> list[int]:
+        mask = (1 << self._band_bits) - 1
+        return [
+            (value >> (i * self._band_bits)) & mask for i in range(len(self._bands))
+        ]
+
+    def __len__(self) -> int:
+        return len(self._by_hash)
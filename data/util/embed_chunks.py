@@ -1,21 +1,172 @@
-from chromadb import Collection
-from agents.shared.embedding_models import get_embeddings
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from data.util.chunk_dedup import (
+    CHUNK_DEDUP,
+    ChunkIndex,
+    ChunkRecord,
+    content_hash,
+    simhash,
+)
+from data.util.embedding_cache import encode_cached
 from models.agent import FilingChunk
 
+if TYPE_CHECKING:
+    from chromadb import Collection
 
-def embed_chunks(chunks: list[FilingChunk], collection: Collection) -> None:
-    embeddings_model = get_embeddings()
-    batch_size = 32
+# Chunks per upsert call; Chroma caps a call at a few thousand rows (SQLite's
+# variable limit), and fewer, larger writes amortize its per-call overhead
+UPSERT_BATCH_SIZE = 2048
+
+
+def _chunk_id(chunk: FilingChunk) -> str:
+    return f"{chunk.accession_number}_{chunk.chunk_index}"
 
-    for i in range(0, len(chunks), batch_size):
-        batch = chunks[i : i + batch_size]
 
-        texts = [chunk.text for chunk in batch]
-        ids = [f"{chunk.accession_number}_{chunk.chunk_index}" for chunk in batch]
-        metadatas = [chunk.model_dump(exclude={"text"}) for chunk in batch]
+class EmbeddedChunks:
+    """
+    Fingerprinted and embedded chunks, ready to be upserted.
 
-        embeddings = embeddings_model.embed_documents(texts)
+    Args:
+        records: A record per input chunk, saying whether it was a duplicate and
+            where it is stored
+        chunks: Chunks to store
+        embeddings: Their vectors, one row per chunk
+    """
 
+    def __init__(
+        self,
+        records: list[ChunkRecord],
+        chunks: list[FilingChunk],
+        embeddings: np.ndarray,
+    ):
+        self.records = records
+        self.chunks = chunks
+        self.embeddings = embeddings
+
+
+def encode_chunks(
+    chunks: list[FilingChunk],
+    collection: "Collection",
+    index: Optional[ChunkIndex] = None,
+    dedup: str = CHUNK_DEDUP,
+) -> EmbeddedChunks:
+    """
+    Fingerprint chunks and embed the ones to store, skipping duplicates.
+
+    Args:
+        chunks: Chunks to embed
+        collection: Ticker's collection (read for the vectors of reused chunks)
+        index: Fingerprints of the collection's stored chunks (None disables
+            deduplication); the chunks to store are added to it
+        dedup: "skip" leaves duplicates out of the collection, "reuse" stores them
+            with the matching chunk's vector, "off" embeds every chunk
+
+    Returns:
+        The chunk records, and the chunks to store with their vectors
+    """
+    if index is None:
+        dedup = "off"
+
+    records = []
+    matches: dict[str, str] = {}  # duplicate chunk id -> matching stored chunk id
+    # chunks of this call are matched against each other too, but only added to
+    # the caller's index once embedded
+    batch_index = ChunkIndex(index.max_distance if index else 0)
+    for chunk in chunks:
+        chunk_id = _chunk_id(chunk)
+        record = ChunkRecord(
+            chunk_id=chunk_id,
+            accession_number=chunk.accession_number,
+            content_hash=content_hash(chunk.text),
+            simhash=simhash(chunk.text) if index and index.near_duplicates else None,
+            stored_id=chunk_id,
+        )
+        if dedup != "off":
+            match = index.match(record.content_hash, record.simhash) or (
+                batch_index.match(record.content_hash, record.simhash)
+            )
+            if match is not None:
+                record.duplicate = True
+                matches[chunk_id] = match
+                if dedup == "skip":
+                    record.stored_id = match
+            else:
+                batch_index.add(record.content_hash, record.simhash, chunk_id)
+        records.append(record)
+
+    # one call: the engine batches the texts by length within its token budget
+    new = [chunk for chunk in chunks if _chunk_id(chunk) not in matches]
+    embeddings = encode_cached([chunk.text for chunk in new])
+    to_store = new
+
+    if dedup == "reuse" and matches:
+        vectors = dict(zip((_chunk_id(chunk) for chunk in new), embeddings))
+        duplicates = [chunk for chunk in chunks if _chunk_id(chunk) in matches]
+        stored = [m for m in dict.fromkeys(matches.values()) if m not in vectors]
+        if stored:
+            result = collection.get(ids=stored, include=["embeddings"])
+            vectors.update(zip(result["ids"], result["embeddings"]))
+        # a match missing from the collection is embedded after all
+        missing = [c for c in duplicates if matches[_chunk_id(c)] not in vectors]
+        if missing:
+            encoded = encode_cached([chunk.text for chunk in missing])
+            vectors.update(zip((matches[_chunk_id(c)] for c in missing), encoded))
+        to_store = new + duplicates
+        reused = np.stack([vectors[matches[_chunk_id(c)]] for c in duplicates])
+        embeddings = np.concatenate([embeddings, reused.astype(np.float32)])
+
+    if index is not None:
+        for record in records:
+            if not record.duplicate or dedup == "reuse":
+                index.add(record.content_hash, record.simhash, record.stored_id)
+    return EmbeddedChunks(records, to_store, embeddings)
+
+
+def upsert_chunks(
+    collection: "Collection",
+    chunks: list[FilingChunk],
+    embeddings: np.ndarray,
+    batch_size: int = UPSERT_BATCH_SIZE,
+) -> None:
+    """Write chunks and their vectors to a collection, batch_size chunks per call."""
+    for i in range(0, len(chunks), batch_size):
+        batch = chunks[i : i + batch_size]
         collection.upsert(
-            ids=ids, embeddings=embeddings, documents=texts, metadatas=metadatas
+            ids=[_chunk_id(chunk) for chunk in batch],
+            embeddings=embeddings[i : i + batch_size],
+            documents=[chunk.text for chunk in batch],
+            metadatas=[chunk.model_dump(exclude={"text"}) for chunk in batch],
         )
+
+
+def embed_chunks(
+    chunks: list[FilingChunk],
+    collection: "Collection",
+    batch_size: int = UPSERT_BATCH_SIZE,
+    index: Optional[ChunkIndex] = None,
+    dedup: str = CHUNK_DEDUP,
+) -> list[ChunkRecord]:
+    """
+    Embed chunks and upsert them into a collection, skipping duplicates.
+
+    Args:
+        chunks: Chunks to embed
+        collection: Ticker's collection
+        batch_size: Chunks per upsert call
+        index: Fingerprints of the collection's stored chunks (None disables
+            deduplication); chunks stored here are added to it
+        dedup: "skip", "reuse" or "off" (see encode_chunks)
+
+    Returns:
+        A record per chunk, saying whether it was a duplicate and where it is stored
+    """
+    embedded = encode_chunks(chunks, collection, index=index, dedup=dedup)
+    try:
+        upsert_chunks(collection, embedded.chunks, embedded.embeddings, batch_size)
+    except Exception:
+        if index is not None:
+            index.discard(embedded.records)
+        raise
+    return embedded.records
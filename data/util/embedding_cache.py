@@ -0,0 +1,182 @@
+"""
+On-disk cache of chunk embeddings, keyed by model and text hash.
+
+A forced re-ingestion, a rebuilt collection or a fresh host would otherwise embed
+every chunk again on CPU. Vectors are appended as float16 rows to a flat file that
+is memory-mapped for lookups, with a key file of (text hash, row) records beside
+it, one pair of files per model:
+
+    <EMBEDDING_CACHE_DIR>/<model>/vectors.f16
+    <EMBEDDING_CACHE_DIR>/<model>/keys.bin
+
+Appends take an exclusive file lock, so worker processes can share the cache; each
+process picks up the others' rows on its next miss.
+"""
+
+import fcntl
+import os
+import re
+import threading
+from hashlib import blake2b
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Directory of the cache; empty disables it
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "data/embedding_cache")
+
+_DTYPE = np.float16
+_KEY_BYTES = 16
+_KEY_RECORD = np.dtype([("key", f"S{_KEY_BYTES}"), ("row", "<u8")])
+
+
+def text_key(text: str) -> bytes:
+    return blake2b(text.encode(), digest_size=_KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    """
+    Append-only float16 embedding store of one model.
+
+    Args:
+        path: Directory of the model's cache files
+        dimensions: Embedding dimensions of the model
+    """
+
+    def __init__(self, path: Path, dimensions: int):
+        self.path = path
+        self.dimensions = dimensions
+        self._vectors_path = path / "vectors.f16"
+        self._keys_path = path / "keys.bin"
+        self._rows: dict[bytes, int] = {}
+        self._keys_read = 0  # bytes of the key file already indexed
+        self._vectors: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _read_keys(self) -> None:
+        """Index key records appended since the last read (by any process)."""
+        if not self._keys_path.exists():
+            return
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_read)
+            data = f.read()
+        # a record being appended by another process is read next time
+        data = data[: len(data) - len(data) % _KEY_RECORD.itemsize]
+        records = np.frombuffer(data, dtype=_KEY_RECORD)
+        self._rows.update(zip(records["key"].tolist(), records["row"].tolist()))
+        self._keys_read += len(data)
+
+    def _vector_rows(self, rows: list[int]) -> np.ndarray:
+        if self._vectors is None or max(rows) >= len(self._vectors):
+            # remapped as the file grows
+            count = self._vectors_path.stat().st_size // (
+                self.dimensions * np.dtype(_DTYPE).itemsize
+            )
+            self._vectors = np.memmap(
+                self._vectors_path,
+                dtype=_DTYPE,
+                mode="r",
+                shape=(count, self.dimensions),
+            )
+        return np.asarray(self._vectors[rows], dtype=np.float32)
+
+    def get_many(self, texts: Sequence[str]) -> list[Optional[np.ndarray]]:
+        """Look up texts, returning None for every miss."""
+        keys = [text_key(text) for text in texts]
+        with self._lock:
+            if any(key not in self._rows for key in keys):
+                self._read_keys()
+            found = [
+                (i, self._rows[key]) for i, key in enumerate(keys) if key in self._rows
+            ]
+            vectors: list[Optional[np.ndarray]] = [None] * len(texts)
+            if found:
+                rows = self._vector_rows([row for _, row in found])
+                for (i, _), vector in zip(found, rows):
+                    vectors[i] = vector
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return vectors
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        keys = [text_key(text) for text in texts]
+        vectors = np.asarray(vectors, dtype=_DTYPE).reshape(-1, self.dimensions)
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self._keys_path, "ab") as keys_file:
+            fcntl.flock(keys_file, fcntl.LOCK_EX)
+            try:
+                with open(self._vectors_path, "ab") as vectors_file:
+                    row_bytes = self.dimensions * np.dtype(_DTYPE).itemsize
+                    start = vectors_file.seek(0, os.SEEK_END) // row_bytes
+                    # drops a torn row (its key was never written)
+                    vectors_file.truncate(start * row_bytes)
+                    vectors_file.write(vectors.tobytes())
+                records = np.empty(len(keys), dtype=_KEY_RECORD)
+                records["key"] = keys
+                records["row"] = np.arange(start, start + len(keys))
+                # keys are written last: a key only ever points at a complete row
+                keys_file.write(records.tobytes())
+            finally:
+                fcntl.flock(keys_file, fcntl.LOCK_UN)
+
+    def stats(self) -> dict:
+        return {"size": len(self._rows), "hits": self.hits, "misses": self.misses}
+
+
+_caches: dict[Path, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def _model_dir(model_name: str) -> Path:
+    return Path(EMBEDDING_CACHE_DIR) / re.sub(r"[^\w.-]", "_", model_name)
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the cache of the shared engine's model and backend (None when disabled)."""
+    from agents.shared.embedding_models import get_embedding_engine
+
+    if not EMBEDDING_CACHE_DIR:
+        return None
+    engine = get_embedding_engine()
+    path = _model_dir(engine.model_id)
+    cache = _caches.get(path)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(path)
+            if cache is None:
+                cache = _caches[path] = EmbeddingCache(path, engine.dimensions)
+    return cache
+
+
+def encode_cached(texts: Sequence[str]) -> np.ndarray:
+    """
+    Embed texts with the shared engine, reading and filling the on-disk cache.
+
+    Returns:
+        float32 array of shape (len(texts), dimensions)
+    """
+    from agents.shared.embedding_models import get_embedding_engine
+
+    engine = get_embedding_engine()
+    cache = get_embedding_cache()
+    if cache is None or not texts:
+        return engine.encode(texts)
+
+    vectors = cache.get_many(texts)
+    missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+    if missing:
+        encoded = engine.encode(missing)
+        try:
+            cache.put_many(missing, encoded)
+        except OSError as e:
+            logger.warning(f"Could not write to the embedding cache: {e}")
+        by_text = dict(zip(missing, encoded))
+        vectors = [by_text[t] if v is None else v for t, v in zip(texts, vectors)]
+    return np.stack(vectors)
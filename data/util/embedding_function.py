@@ -0,0 +1,43 @@
+"""
+Chroma embedding function backed by the shared EmbeddingEngine.
+
+Imports chromadb at module level, so it is only imported from vector_store on first
+use. It keeps the name and config of Chroma's SentenceTransformerEmbeddingFunction,
+so collections created with that function open with this one (and vice versa)
+without an embedding function conflict.
+"""
+
+from typing import Any, Dict
+
+from chromadb.api.types import Documents, Embeddings
+from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+from agents.shared.embedding_models import get_embedding_engine
+
+
+class EngineEmbeddingFunction(SentenceTransformerEmbeddingFunction):
+    """
+    Embeds Chroma query texts with the process-wide engine (and its query cache)
+    instead of a second model.
+    """
+
+    def __init__(self):
+        # the engine is resolved per call and the model loaded on first use, so the
+        # base class (which loads its own SentenceTransformer) is not initialized
+        engine = get_embedding_engine()
+        self.model_name = engine.model_name
+        self.device = engine.device
+        self.normalize_embeddings = engine.normalize
+        self.kwargs = {}
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return list(get_embedding_engine().encode_queries(input))
+
+    @staticmethod
+    def build_from_config(
+        config: Dict[str, Any],
+    ) -> SentenceTransformerEmbeddingFunction:
+        engine = get_embedding_engine()
+        if config.get("model_name") == engine.model_name:
+            return EngineEmbeddingFunction()
+        return SentenceTransformerEmbeddingFunction.build_from_config(config)
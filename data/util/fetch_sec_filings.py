@@ -1,12 +1,12 @@
 """SEC EDGAR filing fetcher with rate limiting."""
 
 import os
+import threading
 import time
 from functools import lru_cache
 from typing import Optional
 
 import requests
-from sec_edgar_api import EdgarClient
 
 from util.logger import get_logger
 from models.agent import FilingMetadata
@@ -14,14 +14,23 @@ from models.agent import FilingMetadata
 logger = get_logger(__name__)
 
 
-USER_AGENT = os.getenv("SEC_EDGAR_AGENT_KEY")
-if not USER_AGENT:
-    raise ValueError(
-        "SEC_EDGAR_AGENT_KEY environment variable must be set (format: 'youremail@domain.extension')"
-    )
+def get_user_agent() -> str:
+    """
+    SEC EDGAR user agent, checked when a request is made rather than at import.
+
+    Raises:
+        ValueError: If SEC_EDGAR_AGENT_KEY is not set
+    """
+    user_agent = os.getenv("SEC_EDGAR_AGENT_KEY")
+    if not user_agent:
+        raise ValueError(
+            "SEC_EDGAR_AGENT_KEY environment variable must be set (format: 'youremail@domain.extension')"
+        )
+    return user_agent
+
 
 # Rate limiting: SEC allows max 10 requests/second
-REQUEST_DELAY = 0.15  # 150ms between requests
+REQUEST_DELAY = 0.15  # 150ms between request starts, across all threads
 
 # SEC ticker-to-CIK mapping URL
 TICKER_CIK_URL = "https://www.sec.gov/files/company_tickers.json"
@@ -35,8 +44,8 @@ def _get_ticker_cik_map() -> dict[str, str]:
     Returns:
         Dict mapping uppercase ticker symbols to CIK strings
     """
+    headers = {"User-Agent": get_user_agent()}
     try:
-        headers = {"User-Agent": USER_AGENT}
         response = requests.get(TICKER_CIK_URL, headers=headers, timeout=30)
         response.raise_for_status()
         data = response.json()
@@ -73,15 +82,26 @@ class SECFetcher:
     """Fetches SEC filings from EDGAR."""
 
     def __init__(self):
-        self.client = EdgarClient(user_agent=USER_AGENT)
-        self._last_request_time = 0
+        from sec_edgar_api import EdgarClient
+
+        self.user_agent = get_user_agent()
+        self.client = EdgarClient(user_agent=self.user_agent)
+        self._next_request_time = 0.0
+        self._rate_lock = threading.Lock()
 
     def _rate_limit(self):
-        """Enforce rate limiting between requests."""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < REQUEST_DELAY:
-            time.sleep(REQUEST_DELAY - elapsed)
-        self._last_request_time = time.time()
+        """
+        Enforce rate limiting between requests.
+
+        Each caller reserves the next free slot and sleeps outside the lock, so
+        concurrent downloads share one limit while their responses overlap.
+        """
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + REQUEST_DELAY
+        if wait > 0:
+            time.sleep(wait)
 
     def fetch_filing_list(
         self,
@@ -158,7 +178,7 @@ class SECFetcher:
         """
         self._rate_limit()
 
-        headers = {"User-Agent": USER_AGENT}
+        headers = {"User-Agent": self.user_agent}
 
         try:
             response = requests.get(metadata.url, headers=headers, timeout=30)
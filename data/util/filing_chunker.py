@@ -1,18 +1,24 @@
 """Chunk parsed filings into embeddable segments."""
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from functools import lru_cache
 
 from util.logger import get_logger
 from models.agent import FilingChunk, FilingMetadata
 
 logger = get_logger(__name__)
 
-splitter = RecursiveCharacterTextSplitter(
-    separators=["\n\n", "\n", ". ", " "],
-    chunk_size=1500,
-    chunk_overlap=200,
-    length_function=len,
-)
+
+@lru_cache(maxsize=1)
+def get_splitter():
+    """Text splitter shared by all filings (built on first use)."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        separators=["\n\n", "\n", ". ", " "],
+        chunk_size=1500,
+        chunk_overlap=200,
+        length_function=len,
+    )
 
 
 def chunk_filing(
@@ -36,7 +42,7 @@ def chunk_filing(
         if not section_text or len(section_text.strip()) < 50:
             continue
 
-        text_chunks = splitter.split_text(section_text)
+        text_chunks = get_splitter().split_text(section_text)
 
         for text in text_chunks:
             chunks.append(
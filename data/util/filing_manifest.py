@@ -0,0 +1,365 @@
+"""
+Manifest of ingested filings, in SQLite.
+
+Records which filings are in each ticker's collection (accession number, form,
+filing date, chunk count, embedding model, ingest time), the fingerprints of their
+chunks (see data/util/chunk_dedup.py) and when EDGAR was last checked for new ones. Skip checks, freshness checks and collection stats are
+indexed lookups instead of scans of the vector store's metadata.
+
+Rows are written in one transaction after the filings' chunks are upserted, so a
+filing in the manifest is always in the collection; a filing whose rows were not
+written is ingested again, and its chunk ids make that upsert idempotent.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional
+
+from pydantic import BaseModel, Field
+
+from models.agent import FilingMetadata
+from util.logger import get_logger
+
+if TYPE_CHECKING:
+    from data.util.chunk_dedup import ChunkRecord
+
+logger = get_logger(__name__)
+
+MANIFEST_DIR = Path("data/manifests")
+MANIFEST_FILE = "filings.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    ticker TEXT NOT NULL,
+    accession_number TEXT NOT NULL,
+    filing_type TEXT NOT NULL,
+    filing_date TEXT NOT NULL,
+    chunks INTEGER NOT NULL,
+    duplicate_chunks INTEGER NOT NULL DEFAULT 0,
+    embedding_model TEXT,
+    ingested_at REAL NOT NULL,
+    PRIMARY KEY (ticker, accession_number)
+);
+CREATE INDEX IF NOT EXISTS filings_by_date ON filings (ticker, filing_date);
+-- stored_id is the chunk holding the text's vector (another filing's chunk for a
+-- skipped duplicate); owner marks the one row answering for each stored chunk
+CREATE TABLE IF NOT EXISTS chunks (
+    ticker TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    accession_number TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    simhash INTEGER,
+    stored_id TEXT NOT NULL,
+    owner INTEGER NOT NULL,
+    PRIMARY KEY (ticker, chunk_id)
+);
+CREATE INDEX IF NOT EXISTS chunks_by_filing ON chunks (ticker, accession_number);
+CREATE INDEX IF NOT EXISTS chunks_by_stored_id ON chunks (ticker, stored_id);
+CREATE TABLE IF NOT EXISTS tickers (
+    ticker TEXT PRIMARY KEY,
+    checked_at REAL
+);
+"""
+
+
+class ManifestEntry(BaseModel):
+    """An ingested filing."""
+
+    filing_type: str
+    filing_date: str
+    chunks: int  # stored in the collection
+    duplicate_chunks: int = 0  # duplicates of other stored chunks
+    embedding_model: Optional[str] = None
+    ingested_at: float
+
+
+class FilingManifest(BaseModel):
+    """Ingested filings of a ticker, keyed by accession number."""
+
+    ticker: str
+    checked_at: Optional[float] = None  # last check of EDGAR for new filings
+    filings: Dict[str, ManifestEntry] = Field(default_factory=dict)
+
+    def is_stale(self, interval_s: float) -> bool:
+        """Whether EDGAR was last checked more than interval_s seconds ago."""
+        return self.checked_at is None or time.time() - self.checked_at > interval_s
+
+
+# One connection per database path, shared by the process's threads. WAL lets the
+# workers of a multi-process deployment read while one of them writes.
+_connections: dict[Path, sqlite3.Connection] = {}
+_lock = threading.Lock()
+
+
+def _connection() -> sqlite3.Connection:
+    path = MANIFEST_DIR / MANIFEST_FILE
+    connection = _connections.get(path)
+    if connection is None:
+        with _lock:
+            connection = _connections.get(path)
+            if connection is None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                connection = sqlite3.connect(
+                    path, check_same_thread=False, isolation_level=None, timeout=30
+                )
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(_SCHEMA)
+                _connections[path] = connection
+    return connection
+
+
+def _execute(sql: str, params: tuple = ()) -> list[tuple]:
+    connection = _connection()
+    with _lock:
+        return connection.execute(sql, params).fetchall()
+
+
+@contextmanager
+def _transaction() -> Iterator[sqlite3.Connection]:
+    """A write transaction, committed unless the block raises."""
+    connection = _connection()
+    with _lock:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+
+def close_connections() -> None:
+    """Drop cached connections, e.g. in a forked worker (they must not be shared)."""
+    with _lock:
+        _connections.clear()
+
+
+def ingested_accession_numbers(ticker: str) -> set[str]:
+    rows = _execute(
+        "SELECT accession_number FROM filings WHERE ticker = ?", (ticker.upper(),)
+    )
+    return {accession_number for (accession_number,) in rows}
+
+
+def filings_before(ticker: str, filing_date: str) -> list[str]:
+    """Accession numbers of a ticker's filings filed before filing_date."""
+    rows = _execute(
+        "SELECT accession_number FROM filings WHERE ticker = ? AND filing_date < ?",
+        (ticker.upper(), filing_date),
+    )
+    return [accession_number for (accession_number,) in rows]
+
+
+def is_stale(ticker: str, interval_s: float) -> bool:
+    """Whether EDGAR was last checked for the ticker more than interval_s ago."""
+    rows = _execute(
+        "SELECT checked_at FROM tickers WHERE ticker = ?", (ticker.upper(),)
+    )
+    return not rows or rows[0][0] is None or time.time() - rows[0][0] > interval_s
+
+
+def manifest_stats(ticker: str) -> dict:
+    """Number of filings and chunks of a ticker, and its latest filing date."""
+    ((filings, chunks, latest_filing_date),) = _execute(
+        "SELECT COUNT(*), COALESCE(SUM(chunks), 0), MAX(filing_date) "
+        "FROM filings WHERE ticker = ?",
+        (ticker.upper(),),
+    )
+    return {
+        "filings": filings,
+        "chunks": chunks,
+        "latest_filing_date": latest_filing_date,
+    }
+
+
+def load_manifest(ticker: str) -> FilingManifest:
+    """Load a ticker's whole manifest."""
+    ticker = ticker.upper()
+    rows = _execute(
+        "SELECT accession_number, filing_type, filing_date, chunks, "
+        "duplicate_chunks, embedding_model, ingested_at FROM filings WHERE ticker = ?",
+        (ticker,),
+    )
+    checked = _execute("SELECT checked_at FROM tickers WHERE ticker = ?", (ticker,))
+    return FilingManifest(
+        ticker=ticker,
+        checked_at=checked[0][0] if checked else None,
+        filings={
+            accession_number: ManifestEntry(
+                filing_type=filing_type,
+                filing_date=filing_date,
+                chunks=chunks,
+                duplicate_chunks=duplicate_chunks,
+                embedding_model=embedding_model,
+                ingested_at=ingested_at,
+            )
+            for (
+                accession_number,
+                filing_type,
+                filing_date,
+                chunks,
+                duplicate_chunks,
+                embedding_model,
+                ingested_at,
+            ) in rows
+        },
+    )
+
+
+def chunk_index_entries(ticker: str) -> list[tuple[str, Optional[int], str]]:
+    """(content hash, simhash, stored chunk id) of a ticker's stored chunks."""
+    return _execute(
+        "SELECT content_hash, simhash, stored_id FROM chunks "
+        "WHERE ticker = ? AND owner = 1",
+        (ticker.upper(),),
+    )
+
+
+def record_filings(
+    ticker: str,
+    filings: Iterable[tuple[FilingMetadata, int]],
+    embedding_model: Optional[str] = None,
+    chunks: Iterable["ChunkRecord"] = (),
+) -> None:
+    """
+    Add ingested filings to a ticker's manifest, in one transaction.
+
+    Args:
+        ticker: Stock ticker symbol
+        filings: (filing metadata, number of chunks stored) pairs
+        embedding_model: Model the chunks were embedded with
+        chunks: Fingerprints of the filings' chunks
+    """
+    ticker = ticker.upper()
+    now = time.time()
+    chunks = list(chunks)
+    duplicates: dict[str, int] = {}
+    for record in chunks:
+        if record.duplicate:
+            duplicates[record.accession_number] = (
+                duplicates.get(record.accession_number, 0) + 1
+            )
+    with _transaction() as connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO filings VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    ticker,
+                    filing.accession_number,
+                    filing.filing_type,
+                    filing.filing_date,
+                    stored,
+                    duplicates.get(filing.accession_number, 0),
+                    embedding_model,
+                    now,
+                )
+                for filing, stored in filings
+            ],
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    ticker,
+                    record.chunk_id,
+                    record.accession_number,
+                    record.content_hash,
+                    record.simhash,
+                    record.stored_id,
+                    int(record.stored),
+                )
+                for record in chunks
+            ],
+        )
+
+
+_SHARED_CHUNKS = """
+SELECT MIN(d.rowid), d.accession_number, d.stored_id
+FROM chunks s JOIN chunks d ON d.ticker = s.ticker AND d.stored_id = s.stored_id
+WHERE s.ticker = ? AND s.owner = 1
+    AND s.accession_number IN (SELECT value FROM json_each(?))
+    AND d.accession_number NOT IN (SELECT value FROM json_each(?))
+GROUP BY d.stored_id
+"""
+
+
+def _shared_chunks(
+    connection: sqlite3.Connection, ticker: str, accession_numbers: list[str]
+) -> list[tuple[int, str, str]]:
+    numbers = json.dumps(accession_numbers)
+    return connection.execute(
+        _SHARED_CHUNKS, (ticker.upper(), numbers, numbers)
+    ).fetchall()
+
+
+def shared_chunk_ids(ticker: str, accession_numbers: Iterable[str]) -> set[str]:
+    """
+    Stored chunks of the given filings that other filings' skipped duplicates
+    point at, and which must stay in the collection when the filings are removed.
+    """
+    connection = _connection()
+    with _lock:
+        rows = _shared_chunks(connection, ticker, list(accession_numbers))
+    return {stored_id for _, _, stored_id in rows}
+
+
+def stored_chunk_ids(ticker: str, accession_numbers: Iterable[str]) -> set[str]:
+    """
+    Stored chunks the given filings answer for, including those handed over to them
+    by removed filings (whose collection metadata still names the removed filing).
+    """
+    return {
+        stored_id
+        for (stored_id,) in _execute(
+            "SELECT stored_id FROM chunks WHERE ticker = ? AND owner = 1 "
+            "AND accession_number IN (SELECT value FROM json_each(?))",
+            (ticker.upper(), json.dumps(list(accession_numbers))),
+        )
+    }
+
+
+def remove_filings(ticker: str, accession_numbers: Iterable[str]) -> None:
+    """
+    Remove filings from a ticker's manifest. Their stored chunks that other
+    filings duplicate are handed over to one of those filings.
+    """
+    ticker = ticker.upper()
+    accession_numbers = list(accession_numbers)
+    with _transaction() as connection:
+        shared = _shared_chunks(connection, ticker, accession_numbers)
+        connection.executemany(
+            "UPDATE chunks SET owner = 1 WHERE rowid = ?",
+            [(rowid,) for rowid, _, _ in shared],
+        )
+        connection.executemany(
+            "UPDATE filings SET chunks = chunks + 1, "
+            "duplicate_chunks = duplicate_chunks - 1 "
+            "WHERE ticker = ? AND accession_number = ?",
+            [(ticker, accession_number) for _, accession_number, _ in shared],
+        )
+        for table in ("chunks", "filings"):
+            connection.executemany(
+                f"DELETE FROM {table} WHERE ticker = ? AND accession_number = ?",
+                [(ticker, number) for number in accession_numbers],
+            )
+
+
+def mark_checked(ticker: str) -> None:
+    """Record that EDGAR was just checked for new filings of the ticker."""
+    with _transaction() as connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO tickers VALUES (?, ?)",
+            (ticker.upper(), time.time()),
+        )
+
+
+def reset_manifest(ticker: str) -> None:
+    """Forget a ticker's filings, e.g. when its collection is empty or re-ingested."""
+    ticker = ticker.upper()
+    with _transaction() as connection:
+        for table in ("filings", "chunks", "tickers"):
+            connection.execute(f"DELETE FROM {table} WHERE ticker = ?", (ticker,))
@@ -1,26 +1,103 @@
-"""Ingestion pipeline for SEC filings."""
+"""
+Ingestion pipeline for SEC filings.
+
+Filings flow through four stages connected by bounded queues, so network waits,
+parsing, embedding and writes overlap:
+
+    download to the filing cache (INGEST_DOWNLOAD_WORKERS threads, shared EDGAR
+    rate limit)
+      -> parse + chunk (FILING_PARSE_WORKERS processes, reading the cached file)
+      -> embed (one worker, chunks of several filings per call, batched by length)
+      -> upsert (one worker, several embedded batches per write)
+
+A full queue blocks the stage feeding it, which bounds the chunks held in memory.
+An unexpected error in a stage aborts the others and is raised to the caller.
+
+Ingested filings are recorded in a SQLite manifest (data/util/filing_manifest.py).
+Once a ticker is ingested, requests for it trigger a background refresh every
+FILINGS_REFRESH_INTERVAL_S, which ingests only filings missing from the manifest.
+"""
 
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
 
 from data.util.fetch_sec_filings import download_filing, fetch_filing_list
-from data.util.filing_chunker import chunk_filing
-from data.util.parse_sec_filing import parse_filing
+from data.util.chunk_dedup import CHUNK_DEDUP, ChunkIndex
+from data.util.filing_manifest import (
+    chunk_index_entries,
+    filings_before,
+    ingested_accession_numbers,
+    is_stale,
+    mark_checked,
+    record_filings,
+    remove_filings,
+    reset_manifest,
+    shared_chunk_ids,
+    stored_chunk_ids,
+)
+from data.util.parse_pool import FILING_PARSE_WORKERS, parse_filing_in_pool
 from data.util.vector_store import (
+    get_collection,
     get_collection_stats,
     get_or_create_collection,
-    collection_exists,
+    invalidate_collection,
 )
-from data.util.embed_chunks import embed_chunks
+from data.util.embed_chunks import EmbeddedChunks, encode_chunks, upsert_chunks
+from agents.shared.embedding_models import get_embedding_engine
 from util.logger import get_logger
-from models.agent import FilingMetadata
+from models.agent import FilingChunk, FilingMetadata
+
+if TYPE_CHECKING:
+    from chromadb import Collection
 
 logger = get_logger(__name__)
 
 FILINGS_CACHE_DIR = Path("data/filings")
 
+# Concurrent filing downloads; request starts are still spaced by the EDGAR limit
+INGEST_DOWNLOAD_WORKERS = int(os.getenv("INGEST_DOWNLOAD_WORKERS", "4"))
+# Capacity of each queue between stages, in filings
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "4"))
+# Chunks embedded together, across filings; the engine splits them into batches by
+# length within its token budget (EMBEDDING_BATCH_TOKENS)
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "1024"))
+# Chunks upserted together; writes are decoupled from embedding, so a slow upsert
+# does not hold up the next batch
+INGEST_UPSERT_BATCH_SIZE = int(os.getenv("INGEST_UPSERT_BATCH_SIZE", "2048"))
+
+# Seconds between checks of EDGAR for new filings of an ingested ticker; 0 disables
+FILINGS_REFRESH_INTERVAL_S = float(os.getenv("FILINGS_REFRESH_INTERVAL_S", "21600"))
+# Filings older than this many days are removed at refresh; 0 keeps them
+FILINGS_EXPIRE_AFTER_DAYS = int(os.getenv("FILINGS_EXPIRE_AFTER_DAYS", "0"))
+
+# Marks the end of a stage's input
+_DONE = object()
+# Seconds a stage blocked on a queue waits before checking for an aborted pipeline
+_QUEUE_POLL_S = 0.5
+
+
+class _PipelineAborted(Exception):
+    """Raised in a stage blocked on a queue once another stage has failed."""
+
+
+# One ingestion per ticker at a time: concurrent requests wait for it instead of
+# seeing a half-filled collection and ingesting the same filings again
+_ingest_locks: dict[str, threading.Lock] = {}
+_ingest_locks_guard = threading.Lock()
+
+
+def _ingest_lock(ticker: str) -> threading.Lock:
+    with _ingest_locks_guard:
+        return _ingest_locks.setdefault(ticker.upper(), threading.Lock())
+
 
 def _get_cache_path(metadata: FilingMetadata) -> Path:
     """Get the cache file path for a filing."""
@@ -29,14 +106,6 @@ def _get_cache_path(metadata: FilingMetadata) -> Path:
     return ticker_dir / f"{metadata.accession_number}.html"
 
 
-def _load_cached_filing(metadata: FilingMetadata) -> Optional[str]:
-    """Load a filing from cache if it exists."""
-    cache_path = _get_cache_path(metadata)
-    if cache_path.exists():
-        return cache_path.read_text(encoding="utf-8")
-    return None
-
-
 def _save_filing_to_cache(metadata: FilingMetadata, content: str) -> None:
     """Save a filing to cache."""
     cache_path = _get_cache_path(metadata)
@@ -56,37 +125,110 @@ def _delete_cached_filing(metadata: FilingMetadata) -> None:
             logger.debug(f"Removed empty directory: {ticker_dir}")
 
 
+class StageStats:
+    """Throughput and input queue depth of one ingestion stage."""
+
+    def __init__(self, name: str, unit: str = "filings"):
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.busy_ms = 0.0
+        self.max_queue_depth = 0
+        self._first_start: Optional[float] = None
+        self._last_end: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, start: float, items: int = 1) -> None:
+        """Record work that began at start (perf_counter) and ends now."""
+        end = time.perf_counter()
+        with self._lock:
+            self.items += items
+            self.busy_ms += (end - start) * 1000
+            if self._first_start is None or start < self._first_start:
+                self._first_start = start
+            self._last_end = end
+
+    def observe_queue(self, depth: int) -> None:
+        """Record the depth of the stage's input queue after an item was queued."""
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def to_dict(self) -> dict:
+        active_s = (
+            self._last_end - self._first_start if self._first_start is not None else 0
+        )
+        return {
+            self.unit: self.items,
+            "busy_ms": round(self.busy_ms, 2),
+            "active_ms": round(active_s * 1000, 2),
+            f"{self.unit}_per_s": round(self.items / active_s, 2) if active_s else None,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
 def ensure_filings_ingested(ticker: str, years: int = 2) -> bool:
     """
     Ensure filings are ingested for a ticker.
 
     Returns True if ingestion was performed, False if filings already existed.
     """
-    if collection_exists(ticker):
-        stats = get_collection_stats(ticker)
-        if stats.get("document_count", 0) > 0:
-            logger.info(f"Filings already ingested for {ticker}: {stats}")
+    lock = _ingest_lock(ticker)
+    if not lock.acquire(blocking=False):
+        # a background refresh only adds to a collection that is already ingested
+        if _is_refreshing(ticker):
+            logger.info(f"Filings of {ticker} are being refreshed, not waiting")
             return False
+        lock.acquire()
 
-    logger.info(f"Ingesting filings for {ticker}...")
-    result = ingest_ticker_filings(ticker, years=years)
-    return True
+    try:
+        stats = get_collection_stats(ticker)
+        if stats.get("document_count", 0) == 0:
+            logger.info(f"Ingesting filings for {ticker}...")
+            result = ingest_ticker_filings(ticker, years=years)
+            return True
+        logger.info(f"Filings already ingested for {ticker}: {stats}")
+    finally:
+        lock.release()
+
+    # new filings are picked up in the background, off the request path
+    schedule_refresh(ticker, years=years)
+    return False
 
 
 def _get_ingested_accession_numbers(ticker: str) -> set[str]:
-    """Get set of already-ingested accession numbers."""
-    if not collection_exists(ticker):
-        return set()
+    """
+    Get set of already-ingested accession numbers.
 
-    collection = get_or_create_collection(ticker)
+    Read from the manifest; a collection ingested before manifests existed is
+    scanned once to build it.
+    """
+    accession_numbers = ingested_accession_numbers(ticker)
+    if accession_numbers:
+        return accession_numbers
+
+    collection = get_collection(ticker)
+    if collection is None:
+        return set()
 
     results = collection.get(include=["metadatas"])
-    accession_numbers = set()
+    filings: dict[str, tuple[FilingMetadata, int]] = {}
     for meta in results.get("metadatas", []):
         if meta and "accession_number" in meta:
-            accession_numbers.add(meta["accession_number"])
+            filing, chunks = filings.get(meta["accession_number"], (None, 0))
+            if filing is None:
+                filing = FilingMetadata(
+                    ticker=ticker.upper(),
+                    filing_type=meta.get("filing_type", ""),
+                    filing_date=meta.get("filing_date", ""),
+                    accession_number=meta["accession_number"],
+                    url="",
+                )
+            filings[meta["accession_number"]] = (filing, chunks + 1)
 
-    return accession_numbers
+    if filings:
+        # the embedding model of these chunks is unknown
+        record_filings(ticker, filings.values())
+    return set(filings)
 
 
 def ingest_ticker_filings(
@@ -109,7 +251,14 @@ def ingest_ticker_filings(
     Returns:
         Dict with ingestion statistics
     """
-    stats = {"ingested": 0, "skipped": 0, "errors": 0, "chunks_created": 0}
+    stats = {
+        "ingested": 0,
+        "skipped": 0,
+        "errors": 0,
+        "chunks_created": 0,
+        "duplicate_chunks": 0,
+        "filings": {},  # per ingested filing: chunks, duplicates, embed chunks/s
+    }
 
     logger.info(
         f"Starting ingestion for {ticker} ({years} years, types: {filing_types})"
@@ -130,54 +279,429 @@ def ingest_ticker_filings(
         if datetime.strptime(f.filing_date, "%Y-%m-%d") >= cutoff_date
     ]
 
-    ingested = _get_ingested_accession_numbers(ticker) if not force else set()
+    if force or not get_collection_stats(ticker)["document_count"]:
+        # nothing to skip: an empty collection means the manifest is out of date
+        reset_manifest(ticker)
+        ingested = set()
+    else:
+        ingested = _get_ingested_accession_numbers(ticker)
+    mark_checked(ticker)
 
     collection = get_or_create_collection(ticker)
 
+    pending = []
     for filing in filings:
         if filing.accession_number in ingested:
             logger.debug(f"Skipping already-ingested filing: {filing.accession_number}")
             stats["skipped"] += 1
-            continue
+        else:
+            pending.append(filing)
 
-        try:
-            raw_html = _load_cached_filing(filing)
+    if pending:
+        _run_pipeline(ticker, pending, collection, stats, keep_html)
 
-            if raw_html is None:
-                raw_html = download_filing(filing)
-                if raw_html:
-                    _save_filing_to_cache(filing, raw_html)
+    logger.info(f"Ingestion complete for {ticker}: {stats}")
+    return stats
 
-            if raw_html is None:
-                logger.error(f"Failed to get filing content: {filing.accession_number}")
-                stats["errors"] += 1
-                continue
 
-            sections = parse_filing(raw_html, filing.filing_type)
+def _fetch_filing_to_cache(filing: FilingMetadata) -> Optional[Path]:
+    """Download a filing into the cache unless it is already there."""
+    cache_path = _get_cache_path(filing)
+    if not cache_path.exists():
+        raw_html = download_filing(filing)
+        if not raw_html:
+            return None
+        _save_filing_to_cache(filing, raw_html)
+    return cache_path
+
+
+def _run_pipeline(
+    ticker: str,
+    filings: list[FilingMetadata],
+    collection: "Collection",
+    stats: dict,
+    keep_html: bool,
+) -> None:
+    """
+    Download, parse and embed filings in overlapping stages, updating stats.
 
-            chunks = chunk_filing(sections, filing)
+    Args:
+        ticker: Stock ticker symbol
+        filings: Filings to ingest
+        collection: Ticker's collection
+        stats: Ingestion statistics, updated in place (adds "stages" and "wall_ms")
+        keep_html: If True, retain HTML files after embedding
+
+    Raises:
+        Exception: The first unexpected error of a stage thread, after every stage
+            has stopped
+    """
+    start_time = time.perf_counter()
+    # fingerprints of the stored chunks, shared by the embed and upsert threads
+    index = (
+        ChunkIndex.from_entries(chunk_index_entries(ticker))
+        if CHUNK_DEDUP != "off"
+        else None
+    )
+    stages = {
+        "download": StageStats("download"),
+        "parse": StageStats("parse"),
+        "embed": StageStats("embed", unit="chunks"),
+        "upsert": StageStats("upsert", unit="chunks"),
+    }
+    parse_queue: queue.Queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    embed_queue: queue.Queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    upsert_queue: queue.Queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    stats_lock = threading.Lock()
+    # set when a stage fails, so the others stop instead of blocking on its queue
+    abort = threading.Event()
+    failures: list[BaseException] = []
+
+    def count_error() -> None:
+        with stats_lock:
+            stats["errors"] += 1
 
-            if chunks:
-                embed_chunks(chunks, collection)
-                stats["chunks_created"] += len(chunks)
-                stats["ingested"] += 1
-                logger.info(
-                    f"Ingested {filing.filing_type} ({filing.filing_date}): "
-                    f"{len(chunks)} chunks"
+    def put(q: queue.Queue, item) -> None:
+        while not abort.is_set():
+            try:
+                return q.put(item, timeout=_QUEUE_POLL_S)
+            except queue.Full:
+                pass
+        raise _PipelineAborted
+
+    def get(q: queue.Queue):
+        while not abort.is_set():
+            try:
+                return q.get(timeout=_QUEUE_POLL_S)
+            except queue.Empty:
+                pass
+        raise _PipelineAborted
+
+    def end(q: queue.Queue) -> None:
+        """Pass the end marker on, unless the pipeline was aborted."""
+        try:
+            put(q, _DONE)
+        except _PipelineAborted:
+            pass
+
+    def stage(worker, output: Optional[queue.Queue] = None):
+        """Thread target running a stage worker and ending its output queue."""
+
+        def run() -> None:
+            try:
+                worker()
+            except _PipelineAborted:
+                pass
+            except BaseException as e:
+                logger.error(
+                    f"{threading.current_thread().name} failed: {e}", exc_info=True
+                )
+                failures.append(e)
+                abort.set()
+            finally:
+                if output is not None:
+                    end(output)
+
+        return run
+
+    def download(filing: FilingMetadata) -> None:
+        if abort.is_set():
+            return
+        start = time.perf_counter()
+        try:
+            path = _fetch_filing_to_cache(filing)
+        except Exception as e:
+            logger.error(
+                f"Error downloading {filing.accession_number}: {e}", exc_info=True
+            )
+            path = None
+        if path is None:
+            logger.error(f"Failed to get filing content: {filing.accession_number}")
+            count_error()
+            return
+        stages["download"].record(start)
+        # parsers read the cached file; the HTML itself is not queued or pickled
+        put(parse_queue, (filing, path))
+        stages["parse"].observe_queue(parse_queue.qsize())
+
+    def parse_worker() -> None:
+        while (item := get(parse_queue)) is not _DONE:
+            filing, path = item
+            start = time.perf_counter()
+            try:
+                chunks = parse_filing_in_pool(path, filing)
+            except Exception as e:
+                logger.error(
+                    f"Error parsing {filing.accession_number}: {e}", exc_info=True
                 )
-                if not keep_html:
-                    _delete_cached_filing(filing)
-            else:
+                count_error()
+                continue
+            if not chunks:
                 logger.warning(
                     f"No chunks created from filing: {filing.accession_number}"
                 )
-                stats["errors"] += 1
+                count_error()
+                continue
+            stages["parse"].record(start)
+            put(embed_queue, (filing, chunks))
+            stages["embed"].observe_queue(embed_queue.qsize())
 
+    def embed_batch(batch: list[tuple[FilingMetadata, list[FilingChunk]]]) -> None:
+        start = time.perf_counter()
+        chunks = [chunk for _, filing_chunks in batch for chunk in filing_chunks]
+        try:
+            embedded = encode_chunks(chunks, collection, index=index)
         except Exception as e:
-            logger.error(
-                f"Error ingesting {filing.accession_number}: {e}", exc_info=True
+            logger.error(f"Error embedding {len(batch)} filings: {e}", exc_info=True)
+            for _ in batch:
+                count_error()
+            return
+        stages["embed"].record(start, items=len(chunks))
+        chunks_per_s = len(chunks) / max(time.perf_counter() - start, 1e-9)
+        put(upsert_queue, (batch, embedded, chunks_per_s))
+        stages["upsert"].observe_queue(upsert_queue.qsize())
+
+    def embed_worker() -> None:
+        batch: list[tuple[FilingMetadata, list[FilingChunk]]] = []
+        batch_chunks = 0
+        done = False
+        while not done:
+            item = get(embed_queue)
+            done = item is _DONE
+            if not done:
+                batch.append(item)
+                batch_chunks += len(item[1])
+            # embed once the batch is full, or when nothing else is ready yet
+            if batch and (
+                done or batch_chunks >= INGEST_EMBED_BATCH_SIZE or embed_queue.empty()
+            ):
+                embed_batch(batch)
+                batch, batch_chunks = [], 0
+
+    def upsert_batch(
+        groups: list[
+            tuple[list[tuple[FilingMetadata, list[FilingChunk]]], EmbeddedChunks, float]
+        ],
+    ) -> None:
+        start = time.perf_counter()
+        chunks = [chunk for _, embedded, _ in groups for chunk in embedded.chunks]
+        records = [record for _, embedded, _ in groups for record in embedded.records]
+        filings = [item for batch, _, _ in groups for item in batch]
+        stored: dict[str, int] = {}
+        duplicates: dict[str, int] = {}
+        for record in records:
+            counts = duplicates if record.duplicate else stored
+            counts[record.accession_number] = counts.get(record.accession_number, 0) + 1
+        try:
+            embeddings = np.concatenate(
+                [embedded.embeddings for _, embedded, _ in groups]
             )
-            stats["errors"] += 1
+            upsert_chunks(collection, chunks, embeddings, INGEST_UPSERT_BATCH_SIZE)
+            # a failed manifest write (a locked database, a full disk) fails the
+            # batch: its filings are ingested again on the next run
+            record_filings(
+                ticker,
+                [
+                    (filing, stored.get(filing.accession_number, 0))
+                    for filing, _ in filings
+                ],
+                embedding_model=get_embedding_engine().model_id,
+                chunks=records,
+            )
+            stages["upsert"].record(start, items=len(chunks))
+
+            for batch, _, chunks_per_s in groups:
+                for filing, filing_chunks in batch:
+                    duplicate_chunks = duplicates.get(filing.accession_number, 0)
+                    with stats_lock:
+                        stats["chunks_created"] += len(filing_chunks) - duplicate_chunks
+                        stats["duplicate_chunks"] += duplicate_chunks
+                        stats["ingested"] += 1
+                        stats["filings"][filing.accession_number] = {
+                            "chunks": len(filing_chunks),
+                            "duplicate_chunks": duplicate_chunks,
+                            "chunks_per_s": round(chunks_per_s, 1),
+                        }
+                    logger.info(
+                        f"Ingested {filing.filing_type} ({filing.filing_date}): "
+                        f"{len(filing_chunks)} chunks, {duplicate_chunks} duplicates "
+                        f"({duplicate_chunks / len(filing_chunks):.0%}), "
+                        f"embedded at {chunks_per_s:.0f} chunks/s"
+                    )
+                    if not keep_html:
+                        try:
+                            _delete_cached_filing(filing)
+                        except OSError as e:
+                            logger.warning(f"Could not delete cached filing: {e}")
+        except Exception as e:
+            logger.error(f"Error storing {len(filings)} filings: {e}", exc_info=True)
+            if index is not None:
+                # the chunks are not recorded: later filings must not point at them
+                index.discard(records)
+            for _ in filings:
+                count_error()
+        finally:
+            # the cached document count is stale once chunks are upserted
+            invalidate_collection(ticker)
+
+    def upsert_worker() -> None:
+        groups = []
+        group_chunks = 0
+        done = False
+        while not done:
+            item = get(upsert_queue)
+            done = item is _DONE
+            if not done:
+                groups.append(item)
+                group_chunks += len(item[1].chunks)
+            # write once enough chunks are embedded, or when the embedder is busy
+            if groups and (
+                done or group_chunks >= INGEST_UPSERT_BATCH_SIZE or upsert_queue.empty()
+            ):
+                upsert_batch(groups)
+                groups, group_chunks = [], 0
+
+    # one thread per parser process, each waiting on its filing's result; the end
+    # marker is passed on to the next parse thread
+    parsers = [
+        threading.Thread(
+            target=stage(parse_worker, parse_queue), name=f"ingest-parse-{ticker}-{i}"
+        )
+        for i in range(max(1, FILING_PARSE_WORKERS))
+    ]
+    embedder = threading.Thread(
+        target=stage(embed_worker, upsert_queue), name=f"ingest-embed-{ticker}"
+    )
+    upserter = threading.Thread(
+        target=stage(upsert_worker), name=f"ingest-upsert-{ticker}"
+    )
+    for parser in parsers:
+        parser.start()
+    embedder.start()
+    upserter.start()
+    try:
+        with ThreadPoolExecutor(
+            max_workers=INGEST_DOWNLOAD_WORKERS,
+            thread_name_prefix=f"ingest-download-{ticker}",
+        ) as pool:
+            list(pool.map(download, filings))
+    except _PipelineAborted:
+        pass
+    except BaseException:
+        abort.set()
+        raise
+    finally:
+        end(parse_queue)
+        for parser in parsers:
+            parser.join()
+        end(embed_queue)
+        embedder.join()
+        upserter.join()
+    if failures:
+        # the first failure, e.g. a bug in a stage, rather than the aborts it caused
+        raise failures[0]
+
+    stats["stages"] = {name: stage.to_dict() for name, stage in stages.items()}
+    stats["wall_ms"] = round((time.perf_counter() - start_time) * 1000, 2)
+
+
+def expire_filings(ticker: str, max_age_days: int) -> int:
+    """
+    Remove filings older than max_age_days from a ticker's collection and manifest.
 
-    logger.info(f"Ingestion complete for {ticker}: {stats}")
+    Returns:
+        Number of filings removed
+    """
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime("%Y-%m-%d")
+    expired = filings_before(ticker, cutoff)
+    collection = get_collection(ticker)
+    if not expired or collection is None:
+        return 0
+
+    # chunks handed over by filings removed earlier are only found in the manifest;
+    # collections ingested before it recorded chunks only by their metadata
+    ids = stored_chunk_ids(ticker, expired)
+    ids.update(
+        collection.get(where={"accession_number": {"$in": expired}}, include=[])["ids"]
+    )
+    # chunks that later filings' skipped duplicates point at stay
+    ids -= shared_chunk_ids(ticker, expired)
+    if ids:
+        collection.delete(ids=sorted(ids))
+    invalidate_collection(ticker)
+    remove_filings(ticker, expired)
+    logger.info(f"Expired {len(expired)} filings of {ticker} filed before {cutoff}")
+    return len(expired)
+
+
+def refresh_ticker_filings(ticker: str, years: int = 2) -> dict:
+    """
+    Ingest filings published since the ticker was last ingested, then expire
+    filings older than FILINGS_EXPIRE_AFTER_DAYS (if set).
+
+    Returns:
+        Dict with ingestion statistics, plus the number of expired filings
+    """
+    stats = ingest_ticker_filings(ticker, years=years)
+    stats["expired"] = (
+        expire_filings(ticker, FILINGS_EXPIRE_AFTER_DAYS)
+        if FILINGS_EXPIRE_AFTER_DAYS > 0
+        else 0
+    )
     return stats
+
+
+_refreshing: set[str] = set()
+_refreshing_lock = threading.Lock()
+
+
+def _is_refreshing(ticker: str) -> bool:
+    with _refreshing_lock:
+        return ticker.upper() in _refreshing
+
+
+def _run_refresh(ticker: str, years: int) -> None:
+    lock = _ingest_lock(ticker)
+    # the ticker is being ingested, which checks EDGAR itself: the next request
+    # schedules another refresh if it is still stale by then
+    if not lock.acquire(blocking=False):
+        logger.info(f"Skipping refresh of {ticker}: it is being ingested")
+        with _refreshing_lock:
+            _refreshing.discard(ticker.upper())
+        return
+
+    try:
+        stats = refresh_ticker_filings(ticker, years=years)
+        logger.info(f"Refreshed filings for {ticker}: {stats}")
+    except Exception as e:
+        logger.error(f"Filings refresh failed for {ticker}: {e}", exc_info=True)
+    finally:
+        lock.release()
+        with _refreshing_lock:
+            _refreshing.discard(ticker.upper())
+
+
+def schedule_refresh(ticker: str, years: int = 2) -> bool:
+    """
+    Start a background refresh of an ingested ticker if EDGAR was last checked
+    more than FILINGS_REFRESH_INTERVAL_S ago and no refresh is running.
+
+    Returns:
+        True if a refresh was started
+    """
+    if FILINGS_REFRESH_INTERVAL_S <= 0:
+        return False
+    if not is_stale(ticker, FILINGS_REFRESH_INTERVAL_S):
+        return False
+
+    key = ticker.upper()
+    with _refreshing_lock:
+        if key in _refreshing:
+            return False
+        _refreshing.add(key)
+    thread = threading.Thread(
+        target=_run_refresh, args=(ticker, years), name=f"filings-refresh-{key}"
+    )
+    thread.daemon = True
+    thread.start()
+    return True
@@ -0,0 +1,130 @@
+"""
+Process pool for parsing and chunking SEC filings.
+
+BeautifulSoup parsing of a multi-megabyte 10-K is pure-Python CPU work: on a
+request thread it holds the GIL and stalls every other request in the process.
+Filings are parsed in worker processes instead, and the raw HTML never crosses the
+process boundary: workers read the filing from its cache file and only the chunks
+are sent back.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional, Union
+
+from data.util.filing_chunker import chunk_filing
+from data.util.parse_sec_filing import parse_filing
+from models.agent import FilingChunk, FilingMetadata
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Parser processes; 0 parses on the calling thread instead
+FILING_PARSE_WORKERS = int(
+    os.getenv("FILING_PARSE_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+# Workers are spawned rather than forked: the server process runs threads (and
+# possibly torch), which a forked child would inherit in an inconsistent state
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the process-wide parse pool (None when FILING_PARSE_WORKERS is 0)."""
+    global _pool
+    if FILING_PARSE_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=FILING_PARSE_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(f"Started {FILING_PARSE_WORKERS} filing parser processes")
+    return _pool
+
+
+def _warm_worker() -> int:
+    import bs4  # noqa: F401
+
+    from data.util.filing_chunker import get_splitter
+
+    get_splitter()
+    return os.getpid()
+
+
+def start_parse_pool() -> int:
+    """
+    Start every parser process and import the parsing libraries in it, so the first
+    ingestion does not pay for spawning them.
+
+    Returns:
+        Number of parser processes started
+    """
+    pool = get_parse_pool()
+    if pool is None:
+        return 0
+    futures = [pool.submit(_warm_worker) for _ in range(FILING_PARSE_WORKERS)]
+    return len({future.result() for future in futures})
+
+
+def shutdown_parse_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_filing_file(
+    path: Union[str, Path], metadata: FilingMetadata
+) -> list[FilingChunk]:
+    """
+    Read, parse and chunk a cached filing (runs in a parser process).
+
+    Args:
+        path: Cached raw HTML of the filing
+        metadata: Filing metadata
+
+    Returns:
+        List of FilingChunk objects
+    """
+    raw_html = Path(path).read_text(encoding="utf-8")
+    sections = parse_filing(raw_html, metadata.filing_type)
+    return chunk_filing(sections, metadata)
+
+
+def parse_filing_in_pool(
+    path: Union[str, Path], metadata: FilingMetadata
+) -> list[FilingChunk]:
+    """
+    Parse and chunk a cached filing in the parse pool.
+
+    The calling thread waits on the result without holding the GIL, so other
+    requests in the process keep running while the filing is parsed.
+
+    Args:
+        path: Cached raw HTML of the filing
+        metadata: Filing metadata
+
+    Returns:
+        List of FilingChunk objects
+    """
+    pool = get_parse_pool()
+    if pool is None:
+        return parse_filing_file(path, metadata)
+    try:
+        return pool.submit(parse_filing_file, str(path), metadata).result()
+    except BrokenProcessPool:
+        # a parser process died (e.g. killed for memory); start a new pool next time
+        global _pool
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        raise
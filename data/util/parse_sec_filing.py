@@ -1,13 +1,22 @@
 """Parse SEC filing HTML into structured sections."""
 
+import os
 import re
+from functools import lru_cache
 from typing import Optional
-from bs4 import BeautifulSoup
 
 from util.logger import get_logger
 
 logger = get_logger(__name__)
 
+# HTML-to-text backend: "lxml" (libxml2 streaming parser) or "bs4" (BeautifulSoup
+# with html.parser); both produce the same text
+FILING_HTML_BACKEND = os.getenv("FILING_HTML_BACKEND", "lxml")
+
+# Elements whose content is not filing text. ix:header holds the hidden inline XBRL
+# facts (contexts, units, cover page data) of iXBRL filings.
+DROPPED_TAGS = ("script", "style", "meta", "link", "ix:header")
+
 SECTION_PATTERNS = {
     "10-K": {
         "business": r"item\s*1[.\s]+business",
@@ -34,15 +43,101 @@ def clean_text(text: str) -> str:
     return "\n".join(lines).strip()
 
 
-def extract_text_from_html(html: str) -> str:
-    """Extract plain text from HTML content."""
+def _extract_text_bs4(html: str) -> str:
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "html.parser")
 
-    for element in soup(["script", "style", "meta", "link"]):
+    for element in soup(list(DROPPED_TAGS)):
         element.decompose()
 
-    text = soup.get_text(separator="\n")
-    return clean_text(text)
+    return soup.get_text(separator="\n")
+
+
+class _TextCollector:
+    """
+    lxml parser target collecting text nodes, without building a tree.
+
+    Text is split at every tag and comment, like BeautifulSoup's strings, and text
+    inside dropped elements is skipped.
+    """
+
+    def __init__(self):
+        self.parts: list[str] = []
+        self._buffer: list[str] = []
+        self._skip_depth = 0
+
+    def _flush(self) -> None:
+        if self._buffer:
+            if not self._skip_depth:
+                self.parts.append("".join(self._buffer))
+            self._buffer = []
+
+    def start(self, tag, attrib) -> None:
+        self._flush()
+        if self._skip_depth or tag in DROPPED_TAGS:
+            self._skip_depth += 1
+
+    def end(self, tag) -> None:
+        self._flush()
+        if self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, data: str) -> None:
+        # libxml2 may deliver one text node in several pieces
+        self._buffer.append(data)
+
+    def comment(self, text) -> None:
+        self._flush()
+
+    def pi(self, target, data=None) -> None:
+        self._flush()
+
+    def close(self) -> str:
+        self._flush()
+        return "\n".join(self.parts)
+
+
+def _extract_text_lxml(html: str) -> str:
+    from lxml import etree
+
+    parser = etree.HTMLParser(target=_TextCollector(), huge_tree=True)
+    parser.feed(html)
+    return parser.close()
+
+
+HTML_BACKENDS = {
+    "bs4": _extract_text_bs4,
+    "lxml": _extract_text_lxml,
+}
+
+
+def extract_text_from_html(html: str, backend: Optional[str] = None) -> str:
+    """
+    Extract plain text from HTML content.
+
+    Args:
+        html: Raw HTML content
+        backend: "lxml" or "bs4" (default FILING_HTML_BACKEND)
+
+    Returns:
+        Cleaned text, one line per text node
+    """
+    backend = backend or FILING_HTML_BACKEND
+    if backend not in HTML_BACKENDS:
+        raise ValueError(
+            f"Unknown HTML backend {backend!r}, expected one of {list(HTML_BACKENDS)}"
+        )
+    return clean_text(HTML_BACKENDS[backend](html))
+
+
+@lru_cache(maxsize=8)
+def _compile_patterns(
+    patterns: tuple[tuple[str, str], ...],
+) -> tuple[tuple[str, re.Pattern], ...]:
+    return tuple(
+        (name, re.compile(pattern, re.IGNORECASE)) for name, pattern in patterns
+    )
 
 
 def find_section_boundaries(
@@ -51,19 +146,22 @@ def find_section_boundaries(
     """
     Find start/end positions of sections in text.
 
+    A section starts at the first match of its pattern and ends where the next
+    section starts. Each precompiled pattern stops at its first match, usually in
+    the table of contents near the top of the document.
+
     Returns dict mapping section name to (start, end) positions.
     """
+    # One alternation of all patterns would scan the text once, but it defeats
+    # the regex engine's literal prefix search and is slower than these searches
+    starts = {}
+    for name, regex in _compile_patterns(tuple(patterns.items())):
+        match = regex.search(text)
+        if match:
+            starts[name] = match.start()
+
+    section_starts = sorted((start, name) for name, start in starts.items())
     boundaries = {}
-    section_starts = []
-
-    for section_name, pattern in patterns.items():
-        matches = list(re.finditer(pattern, text, re.IGNORECASE))
-        if matches:
-            start = matches[0].start()
-            section_starts.append((start, section_name))
-
-    section_starts.sort(key=lambda x: x[0])
-
     for i, (start, name) in enumerate(section_starts):
         if i + 1 < len(section_starts):
             end = section_starts[i + 1][0]
@@ -74,52 +172,42 @@ def find_section_boundaries(
     return boundaries
 
 
-def parse_10k(raw_html: str) -> dict[str, str]:
-    """
-    Parse 10-K filing into sections.
-
-    Returns:
-        Dict mapping section names to extracted text
-    """
+def _parse_sections(raw_html: str, filing_type: str) -> dict[str, str]:
     text = extract_text_from_html(raw_html)
-    patterns = SECTION_PATTERNS["10-K"]
-    boundaries = find_section_boundaries(text, patterns)
+    boundaries = find_section_boundaries(text, SECTION_PATTERNS[filing_type])
 
-    sections = {}
-    for section_name, (start, end) in boundaries.items():
-        section_text = text[start:end]
-        if len(section_text) > 100:  # Skip very short sections
-            sections[section_name] = section_text
+    # lengths come from the spans: only kept sections are sliced out of the text
+    sections = {
+        section_name: text[start:end]
+        for section_name, (start, end) in boundaries.items()
+        if end - start > 100  # Skip very short sections
+    }
 
     if not sections:
-        logger.warning("Could not parse 10-K sections, using full text")
+        logger.warning(f"Could not parse {filing_type} sections, using full text")
         sections["full_document"] = text
 
     return sections
 
 
-def parse_10q(raw_html: str) -> dict[str, str]:
+def parse_10k(raw_html: str) -> dict[str, str]:
     """
-    Parse 10-Q filing into sections.
+    Parse 10-K filing into sections.
 
     Returns:
         Dict mapping section names to extracted text
     """
-    text = extract_text_from_html(raw_html)
-    patterns = SECTION_PATTERNS["10-Q"]
-    boundaries = find_section_boundaries(text, patterns)
+    return _parse_sections(raw_html, "10-K")
 
-    sections = {}
-    for section_name, (start, end) in boundaries.items():
-        section_text = text[start:end]
-        if len(section_text) > 100:
-            sections[section_name] = section_text
 
-    if not sections:
-        logger.warning("Could not parse 10-Q sections, using full text")
-        sections["full_document"] = text
+def parse_10q(raw_html: str) -> dict[str, str]:
+    """
+    Parse 10-Q filing into sections.
 
-    return sections
+    Returns:
+        Dict mapping section names to extracted text
+    """
+    return _parse_sections(raw_html, "10-Q")
 
 
 def parse_8k(raw_html: str) -> dict[str, str]:
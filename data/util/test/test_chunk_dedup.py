@@ -0,0 +1,42 @@
+from data.util.chunk_dedup import ChunkIndex, content_hash, hamming_distance, simhash
+
+BOILERPLATE = (
+    "This report contains forward-looking statements within the meaning of the "
+    "Private Securities Litigation Reform Act of 1995 that involve risks and "
+    "uncertainties. Forward-looking statements provide current expectations of "
+    "future events based on certain assumptions and include any statement that does "
+    "not directly relate to any historical or current fact. Actual results could "
+    "differ materially from those anticipated as a result of various factors, "
+    "including those described under Risk Factors in the quarterly report for the "
+    "period and in the company's other filings with the Securities and Exchange "
+    "Commission. The company assumes no obligation to revise or update any "
+    "forward-looking statements for any reason, except as required by law. Unless "
+    "otherwise stated, all information presented herein is based on the company's "
+    "fiscal calendar, and references to particular years, quarters, months or "
+    "periods refer to the company's fiscal years ended in September and the "
+    "associated quarters, months and periods of those fiscal years."
+)
+
+
+def test_exact_and_near_duplicates_match_stored_chunks():
+    index = ChunkIndex.from_entries(
+        [(content_hash(BOILERPLATE), simhash(BOILERPLATE), "0001_3")], max_distance=6
+    )
+
+    # case and whitespace do not change the content hash
+    assert content_hash(BOILERPLATE) == content_hash(f"  {BOILERPLATE.upper()}\n")
+    assert index.match(content_hash(BOILERPLATE.upper())) == "0001_3"
+
+    near = BOILERPLATE.replace("quarterly report", "annual report")
+    assert hamming_distance(simhash(near), simhash(BOILERPLATE)) <= 6
+    assert index.match(content_hash(near), simhash(near)) == "0001_3"
+
+    other = "Net sales increased 8% driven by higher services revenue and iPhone."
+    assert index.match(content_hash(other), simhash(other)) is None
+    # exact matching only, unless near duplicates are enabled
+    assert (
+        ChunkIndex.from_entries(
+            [(content_hash(BOILERPLATE), simhash(BOILERPLATE), "0001_3")]
+        ).match(content_hash(near), simhash(near))
+        is None
+    )
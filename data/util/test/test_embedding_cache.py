@@ -0,0 +1,23 @@
+import numpy as np
+
+from data.util import embedding_cache
+
+
+def test_cached_embeddings_survive_a_restart(
+    install_stub_engine, stub_store, monkeypatch
+):
+    engine = install_stub_engine(model_name="org/counting")
+    first = embedding_cache.encode_cached(["revenue", "risk", "revenue"])
+    assert engine.texts_encoded == 2
+
+    # a new process maps the same files
+    monkeypatch.setattr(embedding_cache, "_caches", {})
+    again = embedding_cache.encode_cached(["risk", "revenue", "guidance"])
+    assert engine.texts_encoded == 3
+    np.testing.assert_allclose(again[:2], first[[1, 0]], rtol=1e-3)
+    assert embedding_cache.get_embedding_cache().stats()["hits"] == 2
+
+    # another model has its own cache
+    other = install_stub_engine(model_name="org/other")
+    embedding_cache.encode_cached(["risk"])
+    assert other.texts_encoded == 1
@@ -0,0 +1,80 @@
+import pytest
+
+from data.util import filing_manifest
+from data.util.chunk_dedup import ChunkRecord
+from models.agent import FilingMetadata
+
+FIRST, SECOND = "0000320193-99-000000", "0000320193-99-000001"
+
+
+def _filing(accession_number: str) -> FilingMetadata:
+    return FilingMetadata(
+        ticker="AAPL",
+        filing_type="10-Q",
+        filing_date="2099-01-01",
+        accession_number=accession_number,
+        url="https://example.invalid/filing.htm",
+    )
+
+
+def _chunk(accession_number: str, i: int, stored_id: str = "") -> ChunkRecord:
+    chunk_id = f"{accession_number}-{i}"
+    return ChunkRecord(
+        chunk_id=chunk_id,
+        accession_number=accession_number,
+        content_hash=f"hash-{stored_id or chunk_id}",
+        stored_id=stored_id or chunk_id,
+        duplicate=bool(stored_id),
+    )
+
+
+def _owners() -> dict[str, str]:
+    """Stored chunk id -> accession number of the filing answering for it."""
+    return dict(
+        filing_manifest._execute(
+            "SELECT stored_id, accession_number FROM chunks "
+            "WHERE ticker = 'AAPL' AND owner = 1"
+        )
+    )
+
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    """The second filing duplicates both chunks of the first and stores a third."""
+    monkeypatch.setattr(filing_manifest, "MANIFEST_DIR", tmp_path)
+    monkeypatch.setattr(filing_manifest, "_connections", {})
+    stored = [_chunk(FIRST, 0), _chunk(FIRST, 1)]
+    filing_manifest.record_filings(
+        "AAPL",
+        [(_filing(FIRST), 2), (_filing(SECOND), 1)],
+        chunks=stored
+        + [_chunk(SECOND, i, stored_id=c.chunk_id) for i, c in enumerate(stored)]
+        + [_chunk(SECOND, 2)],
+    )
+    yield
+    filing_manifest.close_connections()
+
+
+def test_removed_filing_hands_its_duplicated_chunks_over(manifest):
+    filing_manifest.remove_filings("AAPL", [FIRST])
+
+    assert _owners() == {
+        f"{FIRST}-0": SECOND,
+        f"{FIRST}-1": SECOND,
+        f"{SECOND}-2": SECOND,
+    }
+    entries = filing_manifest.load_manifest("AAPL").filings
+    assert list(entries) == [SECOND]
+    assert entries[SECOND].chunks == 3 and entries[SECOND].duplicate_chunks == 0
+    assert filing_manifest.stored_chunk_ids("AAPL", [SECOND]) == set(_owners())
+
+
+def test_removing_the_new_owner_leaves_no_chunks(manifest):
+    filing_manifest.remove_filings("AAPL", [FIRST])
+    assert not filing_manifest.shared_chunk_ids("AAPL", [SECOND])
+
+    filing_manifest.remove_filings("AAPL", [SECOND])
+
+    assert not _owners()
+    assert not filing_manifest.load_manifest("AAPL").filings
+    assert not filing_manifest.chunk_index_entries("AAPL")
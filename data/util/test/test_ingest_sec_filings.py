@@ -0,0 +1,208 @@
+import sqlite3
+
+import pytest
+
+import data.util.ingest_sec_filings as ingest_sec_filings
+from data.util import filing_manifest, vector_store
+from models.agent import FilingMetadata
+
+
+def _filing(i: int, filing_date: str = "") -> FilingMetadata:
+    return FilingMetadata(
+        ticker="AAPL",
+        filing_type="10-Q",
+        filing_date=filing_date or f"2099-0{i + 1}-01",
+        accession_number=f"0000320193-99-00000{i}",
+        url=f"https://example.invalid/{i}.htm",
+    )
+
+
+def _download(filing: FilingMetadata):
+    if filing.accession_number.endswith("3"):
+        return None
+    paragraphs = "".join(
+        f"<p>Revenue grew in quarter {i} on services demand.</p>" for i in range(40)
+    )
+    return f"<html><body><h2>Item 2. Management's Discussion</h2>{paragraphs}</body></html>"
+
+
+@pytest.fixture
+def engine(stub_engine, stub_store, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_sec_filings, "FILINGS_CACHE_DIR", tmp_path / "filings")
+    monkeypatch.setattr(
+        ingest_sec_filings,
+        "fetch_filing_list",
+        lambda ticker, filing_types, limit: [_filing(i) for i in range(5)],
+    )
+    monkeypatch.setattr(ingest_sec_filings, "download_filing", _download)
+    return stub_engine
+
+
+def test_pipeline_ingests_filings_and_reports_stages(engine, tmp_path):
+    stats = ingest_sec_filings.ingest_ticker_filings("AAPL", years=100)
+
+    assert stats["ingested"] == 4 and stats["errors"] == 1
+    assert vector_store.get_collection_stats("AAPL")["document_count"] == (
+        stats["chunks_created"]
+    )
+    assert stats["stages"]["download"]["filings"] == 4
+    # every filing repeats the first one's text, which is embedded once
+    assert stats["duplicate_chunks"] == 3 * stats["chunks_created"]
+    assert engine.texts_encoded == stats["chunks_created"]
+    assert stats["stages"]["embed"]["chunks"] == (
+        stats["chunks_created"] + stats["duplicate_chunks"]
+    )
+    # duplicates are not written; the others are upserted in bulk after embedding
+    assert stats["stages"]["upsert"]["chunks"] == stats["chunks_created"]
+    assert len(stats["filings"]) == 4
+    assert all(f["chunks_per_s"] > 0 for f in stats["filings"].values())
+    assert not any((tmp_path / "filings").rglob("*.html"))
+
+    # a forced re-ingestion reads every vector from the embedding cache
+    encoded = engine.texts_encoded
+    stats = ingest_sec_filings.ingest_ticker_filings("AAPL", years=100, force=True)
+    assert stats["ingested"] == 4 and engine.texts_encoded == encoded
+
+
+def test_refresh_ingests_only_new_filings_and_expires_old_ones(engine, monkeypatch):
+    ingest_sec_filings.ingest_ticker_filings("AAPL", years=100)
+    old = _filing(7, filing_date="2001-01-01")
+    monkeypatch.setattr(
+        ingest_sec_filings,
+        "fetch_filing_list",
+        lambda ticker, filing_types, limit: [_filing(i) for i in range(7)] + [old],
+    )
+    monkeypatch.setattr(ingest_sec_filings, "FILINGS_EXPIRE_AFTER_DAYS", 365 * 10)
+    # a filing past the expiry age is still within the ingestion window
+    stats = ingest_sec_filings.refresh_ticker_filings("AAPL", years=100)
+
+    assert stats["ingested"] == 3 and stats["skipped"] == 4
+    assert stats["expired"] == 1
+    manifest = filing_manifest.load_manifest("AAPL")
+    assert old.accession_number not in manifest.filings
+    assert len(manifest.filings) == 6
+    assert not manifest.is_stale(60)
+    assert vector_store.get_collection_stats("AAPL")["document_count"] == sum(
+        entry.chunks for entry in manifest.filings.values()
+    )
+    assert {entry.embedding_model for entry in manifest.filings.values()} == {"stub"}
+
+
+def test_manifest_writes_are_transactional(tmp_path, monkeypatch):
+    monkeypatch.setattr(filing_manifest, "MANIFEST_DIR", tmp_path)
+    filing_manifest.record_filings("AAPL", [(_filing(0), 3)])
+
+    # the second row violates NOT NULL, so the whole batch is rolled back
+    broken = _filing(1).model_copy(update={"filing_date": None})
+    with pytest.raises(Exception):
+        filing_manifest.record_filings("AAPL", [(_filing(2), 3), (broken, 3)])
+
+    assert filing_manifest.ingested_accession_numbers("AAPL") == {
+        _filing(0).accession_number
+    }
+    assert filing_manifest.manifest_stats("AAPL") == {
+        "filings": 1,
+        "chunks": 3,
+        "latest_filing_date": _filing(0).filing_date,
+    }
+
+
+def test_expiring_a_filing_keeps_chunks_later_filings_duplicate(engine, monkeypatch):
+    first, second = _filing(0, filing_date="2001-01-01"), _filing(1)
+    monkeypatch.setattr(
+        ingest_sec_filings,
+        "fetch_filing_list",
+        lambda ticker, filing_types, limit: [first, second],
+    )
+    stats = ingest_sec_filings.ingest_ticker_filings("AAPL", years=100)
+    assert stats["duplicate_chunks"] == stats["chunks_created"]
+
+    assert ingest_sec_filings.expire_filings("AAPL", max_age_days=365) == 1
+
+    # the second filing's duplicates still resolve to stored chunks, now its own
+    manifest = filing_manifest.load_manifest("AAPL")
+    assert list(manifest.filings) == [second.accession_number]
+    entry = manifest.filings[second.accession_number]
+    assert entry.chunks == stats["chunks_created"] and entry.duplicate_chunks == 0
+    assert vector_store.get_collection_stats("AAPL")["document_count"] == entry.chunks
+    assert len(filing_manifest.chunk_index_entries("AAPL")) == entry.chunks
+
+
+def test_expiring_the_new_owner_of_handed_over_chunks_deletes_them(engine, monkeypatch):
+    first = _filing(0, filing_date="2001-01-01")
+    second = _filing(1, filing_date="2011-01-01")
+    monkeypatch.setattr(
+        ingest_sec_filings,
+        "fetch_filing_list",
+        lambda ticker, filing_types, limit: [first, second],
+    )
+    ingest_sec_filings.ingest_ticker_filings("AAPL", years=100)
+
+    # the collection metadata of the handed over chunks still names the first filing
+    assert ingest_sec_filings.expire_filings("AAPL", max_age_days=365 * 20) == 1
+    assert ingest_sec_filings.expire_filings("AAPL", max_age_days=365 * 10) == 1
+
+    assert not filing_manifest.load_manifest("AAPL").filings
+    assert vector_store.get_collection_stats("AAPL")["document_count"] == 0
+
+
+def test_failed_stage_stops_the_pipeline_and_raises(engine, monkeypatch):
+    monkeypatch.setattr(ingest_sec_filings, "INGEST_QUEUE_SIZE", 1)
+    monkeypatch.setattr(
+        ingest_sec_filings,
+        "fetch_filing_list",
+        lambda ticker, filing_types, limit: [_filing(i % 3) for i in range(20)],
+    )
+    # a malformed parse result breaks the embed thread, outside its error handling
+    monkeypatch.setattr(
+        ingest_sec_filings, "parse_filing_in_pool", lambda path, filing: 5
+    )
+
+    # the download and parse threads blocked on full queues are released
+    with pytest.raises(TypeError):
+        ingest_sec_filings.ingest_ticker_filings("AAPL", years=100)
+
+
+def test_failed_manifest_write_fails_the_batch(engine, monkeypatch):
+    monkeypatch.setattr(ingest_sec_filings, "INGEST_QUEUE_SIZE", 1)
+
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(ingest_sec_filings, "record_filings", locked)
+    stats = ingest_sec_filings.ingest_ticker_filings("AAPL", years=100)
+
+    # every downloaded filing is counted as failed, and none is recorded
+    assert stats["ingested"] == 0 and stats["errors"] == 5
+    assert not filing_manifest.ingested_accession_numbers("AAPL")
+
+
+def test_refresh_is_skipped_while_the_ticker_is_ingested(monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(
+        ingest_sec_filings,
+        "refresh_ticker_filings",
+        lambda ticker, years: refreshed.append(ticker) or {},
+    )
+    monkeypatch.setattr(ingest_sec_filings, "_refreshing", {"AAPL"})
+
+    with ingest_sec_filings._ingest_lock("AAPL"):
+        ingest_sec_filings._run_refresh("AAPL", years=2)
+    assert not refreshed and not ingest_sec_filings._refreshing
+
+    ingest_sec_filings._run_refresh("AAPL", years=2)
+    assert refreshed == ["AAPL"]
+    assert not ingest_sec_filings._ingest_lock("AAPL").locked()
+
+
+def test_request_does_not_wait_on_a_running_refresh(monkeypatch):
+    monkeypatch.setattr(ingest_sec_filings, "_refreshing", {"AAPL"})
+    monkeypatch.setattr(
+        ingest_sec_filings,
+        "get_collection_stats",
+        lambda ticker: pytest.fail("checked the collection under a refresh"),
+    )
+
+    # the refresh holds the ticker's lock while it runs
+    with ingest_sec_filings._ingest_lock("AAPL"):
+        assert not ingest_sec_filings.ensure_filings_ingested("AAPL")
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+import pytest
+
+from data.util.parse_sec_filing import extract_text_from_html, parse_filing
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.mark.parametrize("fixture", sorted(p.name for p in FIXTURES.glob("*.htm")))
+def test_lxml_backend_matches_beautifulsoup(fixture):
+    html = (FIXTURES / fixture).read_text(encoding="utf-8")
+
+    text = extract_text_from_html(html, backend="lxml")
+
+    assert text == extract_text_from_html(html, backend="bs4")
+    # scripts and the hidden inline XBRL header are not filing text
+    assert "document.write" not in text and "window.viewer" not in text
+    assert "0000320193" not in text
+
+
+def test_inline_xbrl_filing_is_split_into_sections():
+    html = (FIXTURES / "10k_inline_xbrl.htm").read_text(encoding="utf-8")
+
+    sections = parse_filing(html, "10-K")
+
+    assert list(sections) == ["business", "risk_factors", "mda", "financial_statements"]
+    assert "Net sales were $\n391,035\nmillion" in sections["risk_factors"]
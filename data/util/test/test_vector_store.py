@@ -0,0 +1,45 @@
+from data.util import filing_manifest, vector_store
+from models.agent import FilingMetadata
+
+
+def test_registry_opens_collection_once_until_invalidated(stub_engine, stub_store):
+    registry = stub_store
+    assert not vector_store.collection_exists("AAPL")
+    assert not filing_manifest.ingested_accession_numbers("AAPL")
+    assert vector_store.get_collection_stats("AAPL") == {
+        "exists": False,
+        "document_count": 0,
+    }
+
+    collection = vector_store.get_or_create_collection("AAPL")
+    collection.upsert(
+        ids=["a_0"],
+        embeddings=[[1.0, 0.0]],
+        documents=["text"],
+        metadatas=[{"filing_date": "2024-01-01"}],
+    )
+    filing = FilingMetadata(
+        ticker="AAPL",
+        filing_type="10-K",
+        filing_date="2024-01-01",
+        accession_number="0000320193-24-000001",
+        url="https://www.sec.gov/",
+    )
+    filing_manifest.record_filings("AAPL", [(filing, 1)], embedding_model="stub")
+    for _ in range(5):
+        vector_store.get_collection_stats("AAPL")
+        vector_store.get_collection("AAPL")
+    assert registry.opens == 1
+    # counts are cached until the ticker is invalidated
+    assert vector_store.get_collection_stats("AAPL")["document_count"] == 0
+
+    vector_store.invalidate_collection("AAPL")
+    stats = vector_store.get_collection_stats("AAPL")
+    assert stats["document_count"] == 1
+    assert stats["filing_count"] == 1
+    assert stats["latest_filing_date"] == "2024-01-01"
+    assert registry.opens == 2
+
+    assert vector_store.delete_collection("AAPL")
+    assert not vector_store.collection_exists("AAPL")
+    assert not filing_manifest.ingested_accession_numbers("AAPL")
@@ -1,67 +1,176 @@
+import os
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-import chromadb
-from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
-
-from agents.shared.embedding_models import EMBEDDING_MODELS
+from util.logger import get_logger
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
+# chromadb is imported on first use: it is slow to import and pulls in onnxruntime
+if TYPE_CHECKING:
+    import chromadb
+
+logger = get_logger(__name__)
+
+CHROMA_PATH = "data/chroma"
+
+# Cached collection handles and counts are re-read after this long, so ingestion or
+# deletion by another worker process is picked up
+COLLECTION_REGISTRY_TTL_S = float(os.getenv("COLLECTION_REGISTRY_TTL_S", "60"))
+
+
+def _collection_name(ticker: str) -> str:
+    return f"filings_{ticker.lower()}"
 
-def get_chroma_client() -> chromadb.PersistentClient:
-    return chromadb.PersistentClient(path="data/chroma")
 
+# Singleton client: PersistentClient is expensive to build and safe to share
+_client: Optional["chromadb.ClientAPI"] = None
+_client_lock = threading.Lock()
 
-def get_or_create_collection(ticker: str) -> chromadb.Collection:
-    client = get_chroma_client()
 
-    embedding_fn = SentenceTransformerEmbeddingFunction(
-        model_name=EMBEDDING_MODELS["hf_embed_fast"],
-        device="cpu",
-        normalize_embeddings=True,
-    )
+def get_chroma_client() -> "chromadb.ClientAPI":
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import chromadb
 
-    return client.get_or_create_collection(
-        name=f"filings_{ticker.lower()}",
-        embedding_function=embedding_fn,
-        metadata={"hnsw:space": "cosine"},
-    )
+                _client = chromadb.PersistentClient(path=CHROMA_PATH)
+    return _client
 
 
-def collection_exists(ticker: str) -> bool:
-    client = get_chroma_client()
-    collection_name = f"filings_{ticker.lower()}"
+class CollectionHandle:
+    """An open collection with its document count."""
 
-    try:
-        collections = client.list_collections()
-        return any(c.name == collection_name for c in collections)
-    except Exception:
-        return False
+    def __init__(self, collection: "chromadb.Collection"):
+        self.collection = collection
+        self.document_count = collection.count()
+        self.opened_at = time.monotonic()
 
 
-def get_collection_stats(ticker: str) -> dict:
-    if not collection_exists(ticker):
-        return {"exists": False, "document_count": 0}
+class CollectionRegistry:
+    """
+    Per-ticker collection handles, so a retrieval does not list and re-open the
+    collections on every search.
+
+    Missing collections are not cached: the next lookup checks the store again.
+    Ingestion and deletion invalidate the ticker's handle.
+
+    Args:
+        ttl_s: Seconds before a handle is re-opened
+    """
+
+    def __init__(self, ttl_s: float = COLLECTION_REGISTRY_TTL_S):
+        self.ttl_s = ttl_s
+        self._handles: dict[str, CollectionHandle] = {}
+        self._lock = threading.Lock()
+        self.opens = 0
+
+    def get(self, ticker: str, create: bool = False) -> Optional[CollectionHandle]:
+        """
+        Get the handle for a ticker's collection.
+
+        Args:
+            ticker: Stock ticker symbol
+            create: Create the collection if it does not exist
+
+        Returns:
+            The handle, or None if the collection does not exist and create is False
+        """
+        name = _collection_name(ticker)
+        handle = self._handles.get(name)
+        if handle is not None and time.monotonic() - handle.opened_at < self.ttl_s:
+            return handle
+
+        with self._lock:
+            handle = self._handles.get(name)
+            if handle is not None and time.monotonic() - handle.opened_at < self.ttl_s:
+                return handle
+            collection = self._open(name, create)
+            if collection is None:
+                self._handles.pop(name, None)
+                return None
+            handle = CollectionHandle(collection)
+            self._handles[name] = handle
+            self.opens += 1
+            return handle
+
+    def _open(self, name: str, create: bool) -> Optional["chromadb.Collection"]:
+        from data.util.embedding_function import EngineEmbeddingFunction
 
-    collection = get_or_create_collection(ticker)
-    count = collection.count()
+        client = get_chroma_client()
+        # query texts are embedded by the same model instance used for ingestion
+        embedding_fn = EngineEmbeddingFunction()
+        if create:
+            return client.get_or_create_collection(
+                name=name,
+                embedding_function=embedding_fn,
+                metadata={"hnsw:space": "cosine"},
+            )
+        try:
+            return client.get_collection(name=name, embedding_function=embedding_fn)
+        except Exception:
+            return None
 
-    results = collection.get(limit=1, include=["metadatas"])
-    latest_date = None
+    def invalidate(self, ticker: Optional[str] = None) -> None:
+        """Drop the handle of a ticker (or of every ticker) after it has changed."""
+        with self._lock:
+            if ticker is None:
+                self._handles.clear()
+            else:
+                self._handles.pop(_collection_name(ticker), None)
 
-    if results["metadatas"]:
-        latest_date = results["metadatas"][0].get("filing_date")
 
-    return {"exists": True, "document_count": count, "latest_filing_date": latest_date}
+_registry = CollectionRegistry()
+
+
+def get_or_create_collection(ticker: str) -> "chromadb.Collection":
+    return _registry.get(ticker, create=True).collection
+
+
+def get_collection(ticker: str) -> Optional["chromadb.Collection"]:
+    handle = _registry.get(ticker)
+    return handle.collection if handle else None
+
+
+def invalidate_collection(ticker: Optional[str] = None) -> None:
+    _registry.invalidate(ticker)
+
+
+def collection_exists(ticker: str) -> bool:
+    return _registry.get(ticker) is not None
+
+
+def get_collection_stats(ticker: str) -> dict:
+    handle = _registry.get(ticker)
+    if handle is None:
+        return {"exists": False, "document_count": 0}
+
+    from data.util.filing_manifest import manifest_stats
+
+    # filing counts and dates come from the manifest's index, not the chunks
+    stats = manifest_stats(ticker)
+    return {
+        "exists": True,
+        "document_count": handle.document_count,
+        "filing_count": stats["filings"],
+        "latest_filing_date": stats["latest_filing_date"],
+    }
 
 
 def delete_collection(ticker: str) -> bool:
+    from data.util.filing_manifest import reset_manifest
+
     client = get_chroma_client()
-    collection_name = f"filings_{ticker.lower()}"
 
     try:
-        client.delete_collection(collection_name)
+        client.delete_collection(_collection_name(ticker))
+        reset_manifest(ticker)
         return True
     except Exception:
         return False
+    finally:
+        _registry.invalidate(ticker)
@@ -1,3 +1,7 @@
+import threading
+import time
+from uuid import uuid4
+
 from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, StateGraph, START
 from langgraph.cache.memory import InMemoryCache
@@ -12,12 +16,15 @@ from agents.peer.agent import get_peer_sentiment
 from agents.aggregation.agent import get_aggregated_sentiment
 from agents.shared.token_config import get_token_config
 
-from models.metrics import RequestMetrics
+from models.metrics import MetricsAccumulator, RequestMetrics
 from models.state import EquityResearchState
 from agents.fundamentals.agent import get_fundamental_sentiment
 from agents.macro.agent import get_macro_sentiment
 from agents.technical.agent import get_technical_sentiment
 
+from util.artifact_store import artifact_store
+from util.cassettes import install_cassettes_from_env
+from util.critical_path import timed_node
 from util.valiation import validate_ticker
 from util.diagrams import draw_architecture
 from util.cache import (
@@ -30,13 +37,20 @@ from util.cache import (
 from util.formating import format_sentiment_output
 from util.logger import get_logger
 
-from subgraphs.filings_rag_subgraph import filings_rag_subgraph
+from subgraphs.filings_rag_subgraph import (
+    FILINGS_SUBGRAPH_NODES,
+    get_filings_rag_subgraph,
+)
 
 load_dotenv()
 logger = get_logger(__name__)
 
+# serve yfinance/FRED/EDGAR calls from recorded cassettes when CASSETTE_MODE is set
+install_cassettes_from_env()
+
 
 # graph nodes
+@timed_node("ticker_validation")
 def ticker_validation(state: EquityResearchState) -> dict:
     """Validation node to ensure we have a real ticker"""
     logger.info(f"Validating ticker: {state.ticker}")
@@ -61,6 +75,7 @@ def ticker_router(state: EquityResearchState):
         return END
 
 
+@timed_node("fundamental_research_agent")
 def fundamental_research_agent(state: EquityResearchState) -> dict:
     """LLM call to generate fundamental research sentiment"""
     logger.info(f"Starting fundamental research for {state.ticker}")
@@ -68,7 +83,8 @@ def fundamental_research_agent(state: EquityResearchState) -> dict:
         config = get_token_config(state.token_preset)
         fundamental_sentiment, agent_metrics = get_fundamental_sentiment(
             ticker=state.ticker,
-            cached_info=state.ticker_info,  # Pass cached yfinance info to avoid duplicate API call
+            # Pass cached yfinance info to avoid duplicate API call
+            cached_info=artifact_store.get(state.ticker_info_handle),
             token_config=config.fundamental,
         )
         logger.info(f"Completed fundamental research for {state.ticker}")
@@ -87,6 +103,7 @@ def fundamental_research_agent(state: EquityResearchState) -> dict:
         }
 
 
+@timed_node("technical_research_agent")
 def technical_research_agent(state: EquityResearchState) -> dict:
     """LLM call to generate technical research sentiment"""
     logger.info(f"Starting technical research for {state.ticker}")
@@ -112,6 +129,7 @@ def technical_research_agent(state: EquityResearchState) -> dict:
         }
 
 
+@timed_node("macro_research_agent")
 def macro_research_agent(state: EquityResearchState) -> dict:
     """LLM call to generate macro research sentiment"""
     logger.info("Starting macro research")
@@ -130,6 +148,7 @@ def macro_research_agent(state: EquityResearchState) -> dict:
         return {"macro_sentiment": "Analysis unavailable due to data retrieval error."}
 
 
+@timed_node("industry_research_agent")
 def industry_research_agent(state: EquityResearchState) -> dict:
     """LLM call to generate industry research sentiment"""
     logger.info(f"Starting industry research for {state.ticker}")
@@ -154,6 +173,7 @@ def industry_research_agent(state: EquityResearchState) -> dict:
         }
 
 
+@timed_node("peer_research_agent")
 def peer_research_agent(state: EquityResearchState) -> dict:
     """LLM call to generate peer research sentiment"""
     logger.info(f"Starting peer research for {state.business}")
@@ -175,6 +195,7 @@ def peer_research_agent(state: EquityResearchState) -> dict:
         return {"peer_sentiment": "Analysis unavailable due to data retrieval error."}
 
 
+@timed_node("headline_research_agent")
 def headline_research_agent(state: EquityResearchState) -> dict:
     """LLM call to generate headline research sentiment"""
     logger.info(f"Starting headline research for {state.business}")
@@ -200,6 +221,7 @@ def headline_research_agent(state: EquityResearchState) -> dict:
         }
 
 
+@timed_node("aggregator")
 def sentiment_aggregator(state: EquityResearchState) -> dict:
     """LLM call to aggregate research findings and synthesize sentiment"""
     iteration = state.revision_iteration_count + 1
@@ -234,6 +256,7 @@ def sentiment_aggregator(state: EquityResearchState) -> dict:
         }
 
 
+@timed_node("evaluator")
 def sentiment_evaluator(state: EquityResearchState) -> dict:
     """LLM call to evaluate sentiment aggregator output"""
     iteration = state.revision_iteration_count + 1
@@ -271,13 +294,18 @@ def sentiment_router(state: EquityResearchState):
         return "Noncompliant"
 
 
+@timed_node("filings_workflow")
 def run_filings_subgraph(state: EquityResearchState) -> dict:
     """Wrapper to run the filings subgraph and filter output to avoid state conflicts"""
-    result = filings_rag_subgraph.invoke(state)
+    # Start the subgraph from empty metrics so only its own records come back
+    result = get_filings_rag_subgraph().invoke(
+        state.model_copy(update={"metrics": state.metrics.fork()})
+    )
+    metrics = result.get("metrics")
     return {
         "filings_sentiment": result.get("filings_sentiment"),
         "filings_ingested": result.get("filings_ingested"),
-        "metrics": result.get("metrics"),
+        "metrics": metrics.materialize() if metrics is not None else None,
     }
 
 
@@ -374,19 +402,46 @@ graph_builder.add_conditional_edges(
     "evaluator", sentiment_router, {"Compliant": END, "Noncompliant": "aggregator"}
 )
 
+# node dependencies used for critical-path analysis (mirrors the edges above)
+RESEARCH_BRANCH_NODES = [
+    "filings_workflow",
+    "fundamental_research_agent",
+    "technical_research_agent",
+    "macro_research_agent",
+    "industry_research_agent",
+    "peer_research_agent",
+    "headline_research_agent",
+]
+NODE_DEPENDENCIES = {
+    **{node: ["ticker_validation"] for node in RESEARCH_BRANCH_NODES},
+    "aggregator": [*RESEARCH_BRANCH_NODES, "evaluator"],
+    "evaluator": ["aggregator"],
+}
+NESTED_NODES = {"filings_workflow": FILINGS_SUBGRAPH_NODES}
+
 # compile the graph workflow with node caching
 cache = InMemoryCache()
 
-graph_workflow = graph_builder.compile(cache=cache)
+# Compilation is deferred to first use (the API triggers it from its lifespan hook),
+# so importing this module stays cheap. graph_workflow and research_chain remain
+# importable as module attributes through __getattr__ below.
+_compile_lock = threading.Lock()
+_compiled: dict = {}
 
-# uncomment to regenerate architectural diagram
 
-# draw_architecture(graph_workflow)
+def get_graph_workflow():
+    """Compile the research graph (once) and return it."""
+    with _compile_lock:
+        if "graph_workflow" not in _compiled:
+            _compiled["graph_workflow"] = graph_builder.compile(cache=cache)
+            # uncomment to regenerate architectural diagram
+            # draw_architecture(_compiled["graph_workflow"])
+    return _compiled["graph_workflow"]
 
 
 def input(input_dict: dict) -> EquityResearchState:
     # Initialize metrics with request start time stored in state
-    metrics = RequestMetrics()
+    metrics = MetricsAccumulator(request_id=uuid4().hex, started_at=time.perf_counter())
     state = EquityResearchState(
         ticker=input_dict["ticker"],
         trade_duration=input_dict["trade_duration"],
@@ -401,13 +456,13 @@ def input(input_dict: dict) -> EquityResearchState:
         peer_sentiment="",
         headline_sentiment="",
         filings_sentiment="",
-        filings_context="",
+        filings_context_handle=None,
         combined_sentiment="",
         compliant=False,
         feedback=None,
         is_ticker_valid=False,
         revision_iteration_count=0,
-        ticker_info=None,  # Will be populated by ticker_validation node
+        ticker_info_handle=None,  # Will be populated by ticker_validation node
         filings_ingested=False,  # Will be populated by filings_ingestion node
         metrics=metrics,
     )
@@ -418,10 +473,28 @@ def output(state: dict | EquityResearchState) -> EquityResearchState:
     if isinstance(state, dict):
         state = EquityResearchState(**state)
 
+    # the request is done with its side artifacts
+    artifact_store.release(state.metrics.request_id)
+
     if not state.is_ticker_valid:
         raise HTTPException(status_code=400, detail=f"Ticker {state.ticker} is invalid")
     return state
 
 
-# pipeline to interface with the API
-research_chain = RunnableLambda(input) | graph_workflow | RunnableLambda(output)
+def get_research_chain():
+    """Pipeline to interface with the API, built around the compiled graph."""
+    workflow = get_graph_workflow()
+    with _compile_lock:
+        if "research_chain" not in _compiled:
+            _compiled["research_chain"] = (
+                RunnableLambda(input) | workflow | RunnableLambda(output)
+            )
+    return _compiled["research_chain"]
+
+
+def __getattr__(name: str):
+    if name == "graph_workflow":
+        return get_graph_workflow()
+    if name == "research_chain":
+        return get_research_chain()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
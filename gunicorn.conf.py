@@ -0,0 +1,49 @@
+"""
+Multi-worker launch mode: gunicorn -c gunicorn.conf.py main:app
+
+The application is preloaded in the parent (graphs, embedding models, tokenizer) and
+shared copy-on-write by the forked uvicorn workers. Set PREFORK_PRELOAD=false to load
+everything in each worker instead (e.g. to compare memory use, see
+scripts/measure_worker_memory.py).
+"""
+
+import os
+import tempfile
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = os.getenv("PREFORK_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+# research requests wait on several LLM calls, well beyond gunicorn's default 30s
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+graceful_timeout = 30
+
+
+def on_starting(server):
+    from util.prefork import PRELOAD_LOCK_ENV
+
+    # inherited by the workers, one of which claims the PRELOAD_TICKERS ingestion
+    os.environ[PRELOAD_LOCK_ENV] = os.path.join(
+        tempfile.gettempdir(), f"preload-tickers-{os.getpid()}.lock"
+    )
+
+    if preload_app:
+        from util.prefork import preload_application
+
+        preload_application()
+
+
+def post_fork(server, worker):
+    from util.prefork import reset_after_fork
+
+    reset_after_fork(workers)
+
+
+def on_exit(server):
+    from util.prefork import PRELOAD_LOCK_ENV
+
+    try:
+        os.remove(os.environ[PRELOAD_LOCK_ENV])
+    except (KeyError, FileNotFoundError):
+        pass
@@ -1,5 +1,6 @@
 import os
 import re
+import secrets
 import time
 import threading
 from contextlib import asynccontextmanager
@@ -10,21 +11,28 @@ os.environ["GRPC_VERBOSITY"] = "ERROR"
 os.environ["GLOG_minloglevel"] = "2"
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+from util.startup import BackgroundLoader, startup_report
+
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from graph import research_chain
+from fastapi.responses import JSONResponse
 from models.api import EquityResearchRequest
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from data.util.ingest_sec_filings import ingest_ticker_filings
+from util.critical_path import analyze_critical_path, critical_path_report
 from util.logger import get_logger
+from util.profiling import profiling_session
+from util.warmup import build_warmup
 
 logger = get_logger(__name__)
 
 TICKER_PATTERN = re.compile(r"^[A-Z0-9.\-]{1,10}$")
 
+# Profiling is only available when an admin token is configured
+PROFILING_ADMIN_TOKEN = os.environ.get("PROFILING_ADMIN_TOKEN")
+
 
 def sanitize_ticker(ticker: str) -> str:
     """Sanitize and validate stock ticker input."""
@@ -42,18 +50,61 @@ def sanitize_ticker(ticker: str) -> str:
     return sanitized
 
 
+def _load_graph():
+    """Import the graph module (agents, tools, providers) and compile the graphs."""
+    import graph
+
+    graph.get_research_chain()
+    return graph
+
+
+# The graph is loaded off the event loop so the health check answers immediately
+graph_loader = BackgroundLoader("graph", _load_graph)
+
+# Models, clients and caches are warmed in the background as well; /ready reports it
+warmup = build_warmup(graph_loader.get)
+warmup_loader = BackgroundLoader("warmup", warmup.run)
+
+
+def profiling_requested(request: Request) -> bool:
+    """Check whether the caller asked for profiling and is allowed to."""
+    flag = request.headers.get("X-Profile") or request.query_params.get("profile")
+    if not flag or flag.lower() not in ("1", "true", "yes"):
+        return False
+
+    token = request.headers.get("X-Admin-Token", "")
+    if not PROFILING_ADMIN_TOKEN or not secrets.compare_digest(
+        token, PROFILING_ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="Profiling requires admin access")
+
+    return True
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic
+    startup_report.mark("lifespan")
+    graph_loader.start()
+    warmup_loader.start()
+
+    from util.prefork import claim_preload_ingestion
+
     tickers_env = os.environ.get("PRELOAD_TICKERS")
     if tickers_env:
         tickers = tickers_env.replace(",", " ").split()
-        if tickers:
+        if tickers and not claim_preload_ingestion():
+            logger.info("PRELOAD_TICKERS ingestion runs in another worker")
+        elif tickers:
             logger.info(
                 f"Found PRELOAD_TICKERS env var. Preloading filings for: {tickers}"
             )
 
             def ingest_all():
+                from data.util.ingest_sec_filings import ingest_ticker_filings
+
+                # reuse the warmed embedding model and vector store
+                warmup_loader.get()
                 for ticker in tickers:
                     try:
                         logger.info(f"Starting background ingestion for {ticker}")
@@ -67,7 +118,13 @@ async def lifespan(app: FastAPI):
             thread.start()
 
     yield
-    # Shutdown logic (if any)
+    # Shutdown logic
+    from agents.shared.embedding_models import get_embedding_engine
+
+    from data.util.parse_pool import shutdown_parse_pool
+
+    get_embedding_engine().query_cache.save()
+    shutdown_parse_pool()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -81,11 +138,59 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def hold_during_synthetic_warmup(request: Request, call_next):
+    # the synthetic warmup request swaps process-wide clients (LLMs, vector store,
+    # embedding engine) for fakes; only the health checks are answered meanwhile
+    if (
+        "synthetic_request" in warmup.results
+        and not warmup.done
+        and request.url.path not in ("/", "/ready")
+    ):
+        await warmup_loader.aget()
+    return await call_next(request)
+
+
 @app.get("/")
 def ping():
     return {"message": "Running"}
 
 
+@app.get("/ready")
+def ready():
+    """Readiness: 200 once warmup has finished and its required steps succeeded."""
+    summary = warmup.summary()
+    if not summary["ready"]:
+        return JSONResponse(status_code=503, content=summary)
+    return summary
+
+
+@app.get("/metrics/startup")
+def startup_summary():
+    """Startup phase timings of this process."""
+    from agents.shared.embedding_models import get_embedding_engine
+
+    return {
+        **startup_report.summary(),
+        "graph_loaded": graph_loader.loaded,
+        "embedding_engine": get_embedding_engine().stats(),
+    }
+
+
+@app.get("/metrics/embeddings")
+def embedding_summary():
+    """Embedding model load/encode counters and query embedding cache hit rate."""
+    from agents.shared.embedding_models import get_embedding_engine
+
+    return get_embedding_engine().stats()
+
+
+@app.get("/metrics/critical-path")
+def critical_path_summary():
+    """Aggregate critical-path report across requests served by this process."""
+    return critical_path_report.summary()
+
+
 limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -96,18 +201,34 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 async def research_equity(request: Request, req: EquityResearchRequest):
     start_time = time.perf_counter()
     sanitized_ticker = sanitize_ticker(req.ticker)
-
-    res = await research_chain.ainvoke(
-        {
-            "ticker": sanitized_ticker,
-            "trade_duration": req.trade_duration,
-            "trade_direction": req.trade_direction,
-        }
-    )
+    # waits for warmup if the process has only just started
+    await warmup_loader.aget()
+    graph = await graph_loader.aget()
+
+    async with profiling_session(profiling_requested(request)) as profile:
+        res = await graph.research_chain.ainvoke(
+            {
+                "ticker": sanitized_ticker,
+                "trade_duration": req.trade_duration,
+                "trade_direction": req.trade_direction,
+            }
+        )
 
     total_latency_ms = (time.perf_counter() - start_time) * 1000
     res.metrics.total_latency_ms = total_latency_ms
 
+    critical_path = analyze_critical_path(
+        res.metrics, graph.NODE_DEPENDENCIES, nested=graph.NESTED_NODES
+    )
+    critical_path_report.record(critical_path)
+    metrics = res.metrics.to_response_dict()
+    metrics["critical_path"] = critical_path.to_response_dict()
+    if profile is not None:
+        metrics["profile"] = {
+            "session_id": profile.session_id,
+            "path": str(profile.output_dir),
+        }
+
     return {
         "ticker": res.ticker,
         "sentiment_analysis": {
@@ -120,7 +241,7 @@ async def research_equity(request: Request, req: EquityResearchRequest):
             "filings": res.filings_sentiment,
         },
         "combined_sentiment": res.combined_sentiment,
-        "metrics": res.metrics.to_response_dict(),
+        "metrics": metrics,
     }
 
 
@@ -1,6 +1,7 @@
 """Metrics models for observability tracking."""
 
-from typing import Dict, Optional
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from pydantic import BaseModel, Field
 
 
@@ -21,6 +22,32 @@ class AgentMetrics(BaseModel):
     model: Optional[str] = None
     cached: bool = False  # Whether result was served from cache
     budget_exceeded: bool = False  # Whether token budget was exceeded
+    # Breakdown of latency_ms by stage (e.g. embed/search/merge for retrieval)
+    stage_latency_ms: Dict[str, float] = Field(default_factory=dict)
+    # Prompt tokens avoided, e.g. by dropping near-duplicate retrieved context
+    tokens_saved: int = 0
+    # Tokens of packed prompt context, and the tokens the budget left for it
+    context_tokens: Optional[int] = None
+    context_token_budget: Optional[int] = None
+
+
+class NodeTiming(BaseModel):
+    """Start/end offsets of a single graph node run, relative to request start."""
+
+    node: str
+    iteration: int = 1  # Aggregator/evaluator loop iteration (1-based)
+    request_id: Optional[str] = None  # Request that actually executed the node
+    start_ms: float
+    end_ms: float
+
+    @property
+    def key(self) -> str:
+        """Unique key for this node run within a request."""
+        return f"{self.node}#{self.iteration}"
+
+    @property
+    def duration_ms(self) -> float:
+        return self.end_ms - self.start_ms
 
 
 class RequestMetrics(BaseModel):
@@ -46,6 +73,16 @@ class RequestMetrics(BaseModel):
     budget_exceeded: bool = Field(
         default=False, description="Whether the token budget was exceeded"
     )
+    request_id: Optional[str] = Field(
+        default=None, description="Identifier of the request these metrics belong to"
+    )
+    started_at: Optional[float] = Field(
+        default=None,
+        description="perf_counter() value at request start, used to offset node timings",
+    )
+    node_timings: Dict[str, NodeTiming] = Field(
+        default_factory=dict, description="Per-node start/end timings"
+    )
 
     def add_agent_metrics(self, metrics: AgentMetrics) -> None:
         """Add agent metrics and update totals."""
@@ -63,6 +100,10 @@ class RequestMetrics(BaseModel):
         if self.token_budget is not None and self.total_tokens > self.token_budget:
             self.budget_exceeded = True
 
+    def add_node_timing(self, timing: NodeTiming) -> None:
+        """Record the timing of a graph node run."""
+        self.node_timings[timing.key] = timing
+
     def is_within_budget(self) -> bool:
         """Check if current usage is within budget."""
         if self.token_budget is None:
@@ -86,6 +127,13 @@ class RequestMetrics(BaseModel):
         elif other.token_budget is not None:
             merged_budget = other.token_budget
 
+        request_id = self.request_id or other.request_id
+        # Prefer timings recorded by this request over ones replayed from cached node output
+        node_timings = dict(self.node_timings)
+        for key, timing in other.node_timings.items():
+            if key not in node_timings or timing.request_id == request_id:
+                node_timings[key] = timing
+
         merged = RequestMetrics(
             total_latency_ms=max(self.total_latency_ms, other.total_latency_ms),
             agent_metrics={**self.agent_metrics, **other.agent_metrics},
@@ -94,6 +142,11 @@ class RequestMetrics(BaseModel):
             total_tokens=self.total_tokens + other.total_tokens,
             token_budget=merged_budget,
             budget_exceeded=self.budget_exceeded or other.budget_exceeded,
+            request_id=request_id,
+            started_at=(
+                self.started_at if self.started_at is not None else other.started_at
+            ),
+            node_timings=node_timings,
         )
 
         # Re-check if merged total exceeds budget
@@ -125,6 +178,22 @@ class RequestMetrics(BaseModel):
                     "model": m.model,
                     "cached": m.cached,
                     "budget_exceeded": m.budget_exceeded,
+                    **(
+                        {"stage_latency_ms": m.stage_latency_ms}
+                        if m.stage_latency_ms
+                        else {}
+                    ),
+                    **({"tokens_saved": m.tokens_saved} if m.tokens_saved else {}),
+                    **(
+                        {
+                            "context_tokens": {
+                                "packed": m.context_tokens,
+                                "available": m.context_token_budget,
+                            }
+                        }
+                        if m.context_tokens is not None
+                        else {}
+                    ),
                 }
                 for name, m in self.agent_metrics.items()
             },
@@ -142,9 +211,290 @@ class RequestMetrics(BaseModel):
         return response
 
 
-def merge_metrics(left: RequestMetrics, right: RequestMetrics) -> RequestMetrics:
+class CriticalPathStep(BaseModel):
+    """A node run on the critical path of a request."""
+
+    node: str
+    iteration: int = 1
+    start_ms: float
+    end_ms: float
+    duration_ms: float
+    wait_ms: float = Field(
+        default=0.0,
+        description="Gap between the previous critical step ending and this step starting",
+    )
+    segments: List["CriticalPathStep"] = Field(
+        default_factory=list, description="Nested node runs (e.g. subgraph nodes)"
+    )
+
+
+class CriticalPathAnalysis(BaseModel):
+    """Critical path, slack and revision loop cost for a single request."""
+
+    request_id: Optional[str] = None
+    total_ms: float = 0.0
+    critical_path: List[CriticalPathStep] = Field(default_factory=list)
+    slack_ms: Dict[str, float] = Field(
+        default_factory=dict,
+        description="How much later each node run could have finished without delaying the request",
+    )
+    revision_loop_ms: float = Field(
+        default=0.0,
+        description="Wall time added by aggregator/evaluator revision iterations",
+    )
+    cached_nodes: List[str] = Field(
+        default_factory=list,
+        description="Nodes served from cache (timings belong to an earlier request)",
+    )
+
+    def to_response_dict(self) -> dict:
+        """Convert analysis to API response format."""
+
+        def step_dict(step: CriticalPathStep) -> dict:
+            data = {
+                "node": step.node,
+                "iteration": step.iteration,
+                "start_ms": round(step.start_ms, 2),
+                "end_ms": round(step.end_ms, 2),
+                "duration_ms": round(step.duration_ms, 2),
+                "wait_ms": round(step.wait_ms, 2),
+            }
+            if step.segments:
+                data["segments"] = [step_dict(s) for s in step.segments]
+            return data
+
+        return {
+            "total_ms": round(self.total_ms, 2),
+            "path": [step_dict(step) for step in self.critical_path],
+            "slack_ms": {name: round(v, 2) for name, v in self.slack_ms.items()},
+            "revision_loop_ms": round(self.revision_loop_ms, 2),
+            "revision_loop_share": (
+                round(self.revision_loop_ms / self.total_ms, 4)
+                if self.total_ms > 0
+                else 0.0
+            ),
+            "cached_nodes": self.cached_nodes,
+        }
+
+
+class _RecordLog:
+    """Append-only list of metric records shared by accumulators derived from one another."""
+
+    __slots__ = ("records", "lock")
+
+    def __init__(self, records: Optional[list] = None):
+        self.records: list = records or []
+        self.lock = threading.Lock()
+
+
+class MetricsAccumulator:
+    """
+    Request metrics shaped for the graph reducer.
+
+    Merging appends the other side's AgentMetrics/NodeTiming records to a shared
+    append-only log and adds its totals, rather than rebuilding a RequestMetrics and
+    copying every agent's metrics on each reduction. Each accumulator is an immutable
+    view of the first `size` records of its log; extending a view that is no longer
+    the tip of the log (two branches merged into the same base) copies the log first.
+    The per-agent and per-node dicts are only built when read, via materialize().
+    """
+
+    __slots__ = (
+        "request_id",
+        "started_at",
+        "token_budget",
+        "total_latency_ms",
+        "total_input_tokens",
+        "total_output_tokens",
+        "total_tokens",
+        "budget_exceeded",
+        "_log",
+        "_size",
+        "_views",
+    )
+
+    def __init__(
+        self,
+        request_id: Optional[str] = None,
+        started_at: Optional[float] = None,
+        token_budget: Optional[int] = None,
+        total_latency_ms: float = 0.0,
+        total_input_tokens: int = 0,
+        total_output_tokens: int = 0,
+        total_tokens: int = 0,
+        budget_exceeded: bool = False,
+        records: Iterable[Union[AgentMetrics, NodeTiming]] = (),
+    ):
+        self.request_id = request_id
+        self.started_at = started_at
+        self.token_budget = token_budget
+        self.total_latency_ms = total_latency_ms
+        self.total_input_tokens = total_input_tokens
+        self.total_output_tokens = total_output_tokens
+        self.total_tokens = total_tokens
+        self.budget_exceeded = budget_exceeded
+        self._log = _RecordLog(list(records))
+        self._size = len(self._log.records)
+        self._views: Optional[Tuple[dict, dict]] = None
+
+    @classmethod
+    def from_metrics(cls, metrics: RequestMetrics) -> "MetricsAccumulator":
+        """Wrap an existing RequestMetrics."""
+        return cls().merge(metrics)
+
+    @property
+    def records(self) -> list:
+        """Records visible to this accumulator, in merge order."""
+        return self._log.records[: self._size]
+
+    def fork(self) -> "MetricsAccumulator":
+        """Empty accumulator for the same request (e.g. for a subgraph invocation)."""
+        return MetricsAccumulator(
+            request_id=self.request_id,
+            started_at=self.started_at,
+            token_budget=self.token_budget,
+        )
+
+    def merge(
+        self, other: Union[RequestMetrics, "MetricsAccumulator"]
+    ) -> "MetricsAccumulator":
+        """Return a new accumulator with other's records and totals appended."""
+        if isinstance(other, MetricsAccumulator):
+            records = other.records
+        else:
+            records = [*other.agent_metrics.values(), *other.node_timings.values()]
+
+        merged = MetricsAccumulator.__new__(MetricsAccumulator)
+        merged.request_id = self.request_id or other.request_id
+        merged.started_at = (
+            self.started_at if self.started_at is not None else other.started_at
+        )
+        if self.token_budget is not None and other.token_budget is not None:
+            merged.token_budget = min(self.token_budget, other.token_budget)
+        else:
+            merged.token_budget = (
+                self.token_budget
+                if self.token_budget is not None
+                else other.token_budget
+            )
+        merged.total_latency_ms = max(self.total_latency_ms, other.total_latency_ms)
+        merged.total_input_tokens = self.total_input_tokens + other.total_input_tokens
+        merged.total_output_tokens = (
+            self.total_output_tokens + other.total_output_tokens
+        )
+        merged.total_tokens = self.total_tokens + other.total_tokens
+        merged.budget_exceeded = self.budget_exceeded or other.budget_exceeded
+        if (
+            merged.token_budget is not None
+            and merged.total_tokens > merged.token_budget
+        ):
+            merged.budget_exceeded = True
+        merged._views = None
+
+        log = self._log
+        with log.lock:
+            if len(log.records) != self._size:
+                # another merge already extended this base: diverge onto a copy
+                log = _RecordLog(log.records[: self._size])
+            log.records.extend(records)
+            merged._size = len(log.records)
+        merged._log = log
+        return merged
+
+    def _build_views(self) -> Tuple[dict, dict]:
+        if self._views is None:
+            agent_metrics: Dict[str, AgentMetrics] = {}
+            node_timings: Dict[str, NodeTiming] = {}
+            for record in self.records:
+                if isinstance(record, AgentMetrics):
+                    agent_metrics[record.agent_name] = record
+                elif (
+                    record.key not in node_timings
+                    or record.request_id == self.request_id
+                ):
+                    # prefer timings recorded by this request over cached replays
+                    node_timings[record.key] = record
+            self._views = (agent_metrics, node_timings)
+        return self._views
+
+    @property
+    def agent_metrics(self) -> Dict[str, AgentMetrics]:
+        return self._build_views()[0]
+
+    @property
+    def node_timings(self) -> Dict[str, NodeTiming]:
+        return self._build_views()[1]
+
+    def is_within_budget(self) -> bool:
+        """Check if current usage is within budget."""
+        if self.token_budget is None:
+            return True
+        return self.total_tokens <= self.token_budget
+
+    def remaining_budget(self) -> Optional[int]:
+        """Get remaining token budget (None if unlimited)."""
+        if self.token_budget is None:
+            return None
+        return max(0, self.token_budget - self.total_tokens)
+
+    def materialize(self) -> RequestMetrics:
+        """Build the equivalent RequestMetrics (records are shared, not copied)."""
+        agent_metrics, node_timings = self._build_views()
+        return RequestMetrics.model_construct(
+            total_latency_ms=self.total_latency_ms,
+            agent_metrics=dict(agent_metrics),
+            total_input_tokens=self.total_input_tokens,
+            total_output_tokens=self.total_output_tokens,
+            total_tokens=self.total_tokens,
+            token_budget=self.token_budget,
+            budget_exceeded=self.budget_exceeded,
+            request_id=self.request_id,
+            started_at=self.started_at,
+            node_timings=dict(node_timings),
+        )
+
+    def to_response_dict(self) -> dict:
+        """Convert metrics to API response format."""
+        return self.materialize().to_response_dict()
+
+    def _asdict(self) -> dict:
+        # constructor kwargs; lets LangGraph's serializer checkpoint and cache it
+        return {
+            "request_id": self.request_id,
+            "started_at": self.started_at,
+            "token_budget": self.token_budget,
+            "total_latency_ms": self.total_latency_ms,
+            "total_input_tokens": self.total_input_tokens,
+            "total_output_tokens": self.total_output_tokens,
+            "total_tokens": self.total_tokens,
+            "budget_exceeded": self.budget_exceeded,
+            "records": self.records,
+        }
+
+    def __reduce__(self):
+        return (_rebuild_accumulator, (self._asdict(),))
+
+    def __repr__(self) -> str:
+        return (
+            f"MetricsAccumulator(request_id={self.request_id!r}, "
+            f"records={self._size}, total_tokens={self.total_tokens})"
+        )
+
+
+def _rebuild_accumulator(kwargs: dict) -> MetricsAccumulator:
+    return MetricsAccumulator(**kwargs)
+
+
+def merge_metrics(
+    left: Optional[Union[MetricsAccumulator, RequestMetrics]],
+    right: Optional[Union[MetricsAccumulator, RequestMetrics]],
+) -> Optional[MetricsAccumulator]:
     """Reducer function for LangGraph to merge metrics from parallel nodes."""
+    if isinstance(left, RequestMetrics):
+        left = MetricsAccumulator.from_metrics(left)
     if left is None:
+        if isinstance(right, RequestMetrics):
+            return MetricsAccumulator.from_metrics(right)
         return right
     if right is None:
         return left
@@ -1,8 +1,8 @@
 from enum import Enum
-from typing import Annotated, Any, Dict, Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
-from models.metrics import RequestMetrics, merge_metrics
+from models.metrics import MetricsAccumulator, RequestMetrics, merge_metrics
 
 
 class TradeDuration(Enum):
@@ -19,6 +19,8 @@ class TradeDirection(Enum):
 class EquityResearchState(BaseModel):
     """State model for the equity research workflow."""
 
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     ticker: str
     trade_duration: TradeDuration
     trade_direction: TradeDirection
@@ -37,14 +39,24 @@ class EquityResearchState(BaseModel):
     feedback: Optional[str] = None
     is_ticker_valid: bool = False
     revision_iteration_count: int = 0
-    ticker_info: Optional[Dict[str, Any]] = None  # Cached yfinance ticker.info
+    # Handle to the cached yfinance ticker.info in util.artifact_store
+    ticker_info_handle: Optional[str] = None
     filings_ingested: bool = (
         False  # Whether SEC filings have been ingested to vector store
     )
     filings_search_queries: Optional[list[str]] = (
         None  # Dynamically generated search queries for SEC filings
     )
-    filings_context: Optional[str] = None  # Retrieved context from SEC filings
-    metrics: Annotated[RequestMetrics, merge_metrics] = Field(
-        default_factory=RequestMetrics
+    # Handle to the retrieved SEC filings context in util.artifact_store
+    filings_context_handle: Optional[str] = None
+    # Nodes return RequestMetrics deltas; the reducer folds them into an accumulator
+    metrics: Annotated[MetricsAccumulator, merge_metrics] = Field(
+        default_factory=MetricsAccumulator
     )
+
+    @field_validator("metrics", mode="before")
+    @classmethod
+    def _accumulate_metrics(cls, value):
+        if isinstance(value, RequestMetrics):
+            return MetricsAccumulator.from_metrics(value)
+        return value
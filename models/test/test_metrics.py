@@ -0,0 +1,73 @@
+import pickle
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from models.metrics import (
+    AgentMetrics,
+    MetricsAccumulator,
+    NodeTiming,
+    RequestMetrics,
+    TokenUsage,
+    merge_metrics,
+)
+
+
+def _delta(name, tokens=10, request_id="req", iteration=1):
+    delta = RequestMetrics()
+    delta.add_agent_metrics(
+        AgentMetrics(
+            agent_name=name,
+            latency_ms=1.0,
+            token_usage=TokenUsage(
+                input_tokens=tokens, output_tokens=0, total_tokens=tokens
+            ),
+        )
+    )
+    delta.add_node_timing(
+        NodeTiming(
+            node=name,
+            iteration=iteration,
+            request_id=request_id,
+            start_ms=0.0,
+            end_ms=1.0,
+        )
+    )
+    return delta
+
+
+def test_accumulator_matches_request_metrics_merge():
+    deltas = [_delta("a"), _delta("b", 20), _delta("a", 5, request_id="other")]
+    merged = RequestMetrics(request_id="req", started_at=0.0, token_budget=30)
+    accumulated = MetricsAccumulator(request_id="req", started_at=0.0, token_budget=30)
+    for delta in deltas:
+        merged = merged.merge(delta)
+        accumulated = merge_metrics(accumulated, delta)
+
+    assert accumulated.to_response_dict() == merged.to_response_dict()
+    assert accumulated.materialize().node_timings == merged.node_timings
+    assert accumulated.budget_exceeded
+
+
+def test_sibling_merges_do_not_see_each_other():
+    base = merge_metrics(MetricsAccumulator(request_id="req"), _delta("a"))
+    left = base.merge(_delta("b"))
+    right = base.merge(_delta("c"))
+
+    assert set(base.agent_metrics) == {"a"}
+    assert set(left.agent_metrics) == {"a", "b"}
+    assert set(right.agent_metrics) == {"a", "c"}
+    assert right.total_tokens == 20
+
+
+def test_accumulator_round_trips_through_serializers():
+    accumulated = merge_metrics(
+        MetricsAccumulator(request_id="req", started_at=1.0), _delta("a")
+    )
+    serde = JsonPlusSerializer()
+
+    for restored in (
+        pickle.loads(pickle.dumps(accumulated)),
+        serde.loads_typed(serde.dumps_typed(accumulated)),
+    ):
+        assert isinstance(restored, MetricsAccumulator)
+        assert restored.to_response_dict() == accumulated.to_response_dict()
@@ -0,0 +1,55 @@
+"""
+Exports the embedding models to ONNX with int8 dynamic quantization, for the "onnx"
+embedding backend (EMBEDDING_BACKEND=onnx).
+
+Writes <EMBEDDING_ONNX_DIR>/<model>/ with the float32 export and one quantized file
+per instruction set; the engine loads from there instead of the ONNX files
+published with the model (which not every model has). Needs
+`pip install optimum[onnxruntime]`.
+Usage: python scripts/export_onnx_embeddings.py [--model all-MiniLM-L6-v2]
+    [--quantization avx2 avx512_vnni]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.shared.embedding_models import (
+    EMBEDDING_MODELS,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_ONNX_QUANTIZATION,
+    ONNX_QUANTIZED_FILES,
+)
+
+
+def export(model_name: str, quantizations: list[str]) -> Path:
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+
+    output = Path(EMBEDDING_ONNX_DIR) / Path(model_name).name
+    # exports the float32 graph when the model does not publish one
+    model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+    model.save_pretrained(str(output))
+    for quantization in quantizations:
+        export_dynamic_quantized_onnx_model(model, quantization, str(output))
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--model", nargs="+", default=list(dict.fromkeys(EMBEDDING_MODELS.values()))
+    )
+    parser.add_argument(
+        "--quantization",
+        nargs="+",
+        choices=sorted(ONNX_QUANTIZED_FILES),
+        default=[EMBEDDING_ONNX_QUANTIZATION or "avx2"],
+    )
+    args = parser.parse_args()
+
+    for model_name in args.model:
+        output = export(model_name, args.quantization)
+        print(f"{model_name}: exported to {output}")
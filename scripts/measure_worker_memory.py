@@ -0,0 +1,142 @@
+"""
+Measures the memory of a multi-worker deployment with and without preloading.
+
+Starts gunicorn (gunicorn.conf.py) once per mode, waits until every worker has
+finished warmup, then reads /proc/<pid>/smaps_rollup of the master and its workers.
+PSS (proportional set size) splits shared pages between the processes sharing them,
+so the PSS total is the real memory cost of the deployment; USS is what each
+process holds privately. Linux only.
+Usage: python scripts/measure_worker_memory.py --workers 4 [--output memory.json]
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# smaps_rollup fields reported, in kB
+FIELDS = (
+    "Rss",
+    "Pss",
+    "Shared_Clean",
+    "Shared_Dirty",
+    "Private_Clean",
+    "Private_Dirty",
+)
+
+
+def read_smaps_rollup(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in FIELDS:
+                values[name] = int(rest.split()[0])
+    return {
+        "rss_mb": round(values["Rss"] / 1024, 1),
+        "pss_mb": round(values["Pss"] / 1024, 1),
+        "uss_mb": round((values["Private_Clean"] + values["Private_Dirty"]) / 1024, 1),
+        "shared_mb": round((values["Shared_Clean"] + values["Shared_Dirty"]) / 1024, 1),
+    }
+
+
+def child_pids(pid: int) -> list[int]:
+    children = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        children.extend(int(c) for c in (task / "children").read_text().split())
+    return children
+
+
+def warmup_done(port: int) -> bool:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=5) as r:
+            body = r.read()
+    except urllib.error.HTTPError as e:
+        # 503 while warming, or when a required step failed: done either way
+        body = e.read()
+    except OSError:
+        return False
+    return json.loads(body).get("done", False)
+
+
+def measure(mode: str, workers: int, port: int, timeout: float) -> dict:
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "BIND": f"127.0.0.1:{port}",
+        "PREFORK_PRELOAD": "true" if mode == "preload" else "false",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        # requests land on arbitrary workers: require every worker to answer "done"
+        consecutive = 0
+        while consecutive < workers * 3:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{mode}: workers not warmed up after {timeout}s")
+            if server.poll() is not None:
+                raise RuntimeError(f"{mode}: gunicorn exited with {server.returncode}")
+            consecutive = consecutive + 1 if warmup_done(port) else 0
+            time.sleep(0.2)
+
+        worker_pids = child_pids(server.pid)
+        processes = {"master": read_smaps_rollup(server.pid)}
+        for i, pid in enumerate(worker_pids):
+            processes[f"worker_{i}"] = read_smaps_rollup(pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    return {
+        "mode": mode,
+        "workers": len(worker_pids),
+        "total_pss_mb": round(sum(p["pss_mb"] for p in processes.values()), 1),
+        "total_rss_mb": round(sum(p["rss_mb"] for p in processes.values()), 1),
+        "processes": processes,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--timeout", type=float, default=600, help="Seconds to wait for warmup"
+    )
+    parser.add_argument("--output", type=Path, help="Also write the report here")
+    args = parser.parse_args()
+
+    results = [
+        measure(mode, args.workers, args.port, args.timeout)
+        for mode in ("no-preload", "preload")
+    ]
+    saved = results[0]["total_pss_mb"] - results[1]["total_pss_mb"]
+    report = {
+        "results": results,
+        "pss_saved_mb": round(saved, 1),
+        "pss_saved_pct": round(100 * saved / results[0]["total_pss_mb"], 1),
+    }
+
+    rendered = json.dumps(report, indent=2)
+    print(rendered)
+    if args.output:
+        args.output.write_text(rendered + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
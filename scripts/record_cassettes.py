@@ -0,0 +1,69 @@
+"""
+Records cassettes for every upstream data call the graph makes for the given tickers
+(yfinance, FRED and SEC EDGAR), so later runs can replay them offline.
+Usage: python scripts/record_cassettes.py AAPL MSFT [--dir data/cassettes]
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agents.fundamentals.tools import get_earnings_and_financial_health
+from agents.macro.tools import get_macro_data
+from agents.technical.tools import get_technical_analysis
+from data.util.fetch_sec_filings import download_filing, fetch_filing_list
+from models.metrics import RequestMetrics
+from util.artifact_store import artifact_store
+from util.cassettes import CASSETTE_DIR, cassette_session
+from util.valiation import validate_ticker
+
+# matches the defaults used by ingest_ticker_filings
+FILING_TYPES = ["10-K", "10-Q"]
+FILING_YEARS = 2
+
+
+class _State:
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.metrics = RequestMetrics()
+
+
+def record_ticker(ticker: str) -> None:
+    result = validate_ticker(ticker=ticker, state=_State(ticker))
+    if not result.get("is_ticker_valid"):
+        print(f"{ticker}: invalid ticker, skipping")
+        return
+
+    info = artifact_store.get(result["ticker_info_handle"])
+    get_earnings_and_financial_health(ticker, cached_info=info)
+    get_earnings_and_financial_health(ticker)
+    get_technical_analysis(ticker)
+
+    filings = fetch_filing_list(
+        ticker, filing_types=FILING_TYPES, limit=FILING_YEARS * 5
+    )
+    cutoff = datetime.now() - timedelta(days=FILING_YEARS * 365)
+    for filing in filings:
+        if datetime.strptime(filing.filing_date, "%Y-%m-%d") >= cutoff:
+            download_filing(filing)
+    print(f"{ticker}: recorded {len(filings)} filings")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record upstream data cassettes")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--dir", type=Path, default=CASSETTE_DIR)
+    args = parser.parse_args()
+
+    with cassette_session("record", args.dir) as library:
+        get_macro_data()
+        for ticker in args.tickers:
+            record_ticker(ticker.upper())
+        print(f"Cassettes: {library.stats()}")
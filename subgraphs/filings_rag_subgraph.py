@@ -1,3 +1,5 @@
+import threading
+
 from langgraph.graph import END, StateGraph, START
 from agents.filings.agents.query_builder import generate_search_queries
 from agents.filings.agents.retriever import get_filings_context
@@ -6,13 +8,24 @@ from agents.shared.token_config import get_token_config
 from data.util.ingest_sec_filings import ensure_filings_ingested
 from models.state import EquityResearchState
 from models.metrics import RequestMetrics
+from util.artifact_store import artifact_store
 from util.cache import create_cache_policy
+from util.critical_path import timed_node
 from util.formating import format_sentiment_output
 from util.logger import get_logger
 
 logger = get_logger(__name__)
 
+# subgraph node names, in execution order
+FILINGS_SUBGRAPH_NODES = [
+    "filings_ingestion",
+    "filings_query_builder",
+    "filings_retriever",
+    "filings_synthesis_agent",
+]
 
+
+@timed_node("filings_ingestion")
 def filings_rag_ingestion(state: EquityResearchState) -> dict:
     """Ingest SEC filings into vector store before research agents run"""
     logger.info(f"Starting SEC filings ingestion for {state.ticker}")
@@ -30,6 +43,7 @@ def filings_rag_ingestion(state: EquityResearchState) -> dict:
         return {"filings_ingested": False}
 
 
+@timed_node("filings_query_builder")
 def filings_rag_query_builder(state: EquityResearchState) -> dict:
     """Generate contextual search queries based on trade context"""
     logger.info(
@@ -56,6 +70,7 @@ def filings_rag_query_builder(state: EquityResearchState) -> dict:
         return {"filings_search_queries": None}
 
 
+@timed_node("filings_retriever")
 def filings_rag_retriever(state: EquityResearchState) -> dict:
     """Retrieve SEC filings context using dynamically generated queries"""
     logger.info(f"Starting filings retrieval for {state.ticker}")
@@ -67,26 +82,33 @@ def filings_rag_retriever(state: EquityResearchState) -> dict:
         metrics = RequestMetrics()
         metrics.add_agent_metrics(agent_metrics)
         logger.info(f"Completed filings retrieval for {state.ticker}")
+        context_handle = None
+        if filings_context is not None:
+            context_handle = artifact_store.put(
+                filings_context, scope=state.metrics.request_id, kind="filings_context"
+            )
         return {
-            "filings_context": filings_context,
+            "filings_context_handle": context_handle,
             "metrics": metrics,
         }
     except Exception as e:
         logger.error(f"Filings retrieval failed for {state.ticker}: {e}", exc_info=True)
         # We don't return filings_sentiment error here, we let the synthesis agent handle missing context
         return {
-            "filings_context": None,
+            "filings_context_handle": None,
         }
 
 
+@timed_node("filings_synthesis_agent")
 def filings_rag_synthesis_agent(state: EquityResearchState) -> dict:
     """LLM call to generate SEC filings research sentiment"""
     logger.info(f"Starting filings synthesis for {state.ticker}")
     try:
         config = get_token_config(state.token_preset)
+        filings_context = artifact_store.get(state.filings_context_handle)
         filings_sentiment, agent_metrics = generate_filings_sentiment(
             ticker=state.ticker,
-            context=state.filings_context,
+            context=filings_context,
             token_config=config.filings_synthesis,
         )
         metrics = RequestMetrics()
@@ -100,7 +122,7 @@ def filings_rag_synthesis_agent(state: EquityResearchState) -> dict:
             }
         else:
             msg = "No SEC filings available for analysis."
-            if state.filings_context is None:
+            if filings_context is None:
                 msg = "No SEC filings context retrieved."
 
             return {
@@ -125,11 +147,9 @@ filings_rag_builder.add_node(
     cache_policy=create_cache_policy(ttl=86400),
 )
 
-filings_rag_builder.add_node(
-    "filings_retriever",
-    filings_rag_retriever,
-    cache_policy=create_cache_policy(ttl=86400),
-)
+# not cached: the context handle it returns is released with the request, and
+# retrieval is a local vector search
+filings_rag_builder.add_node("filings_retriever", filings_rag_retriever)
 
 filings_rag_builder.add_node(
     "filings_synthesis_agent",
@@ -143,4 +163,21 @@ filings_rag_builder.add_edge("filings_query_builder", "filings_retriever")
 filings_rag_builder.add_edge("filings_retriever", "filings_synthesis_agent")
 filings_rag_builder.add_edge("filings_synthesis_agent", END)
 
-filings_rag_subgraph = filings_rag_builder.compile()
+_compile_lock = threading.Lock()
+_compiled_subgraph = None
+
+
+def get_filings_rag_subgraph():
+    """Compile the filings subgraph on first use."""
+    global _compiled_subgraph
+    with _compile_lock:
+        if _compiled_subgraph is None:
+            _compiled_subgraph = filings_rag_builder.compile()
+    return _compiled_subgraph
+
+
+def __getattr__(name: str):
+    # compiled lazily, see get_filings_rag_subgraph
+    if name == "filings_rag_subgraph":
+        return get_filings_rag_subgraph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
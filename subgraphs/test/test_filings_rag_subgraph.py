@@ -0,0 +1,44 @@
+from data.util import parse_pool
+from util.offline import OfflineSettings, offline_environment
+
+
+def test_synthesis_gets_the_filings_context_on_a_repeat_request(monkeypatch):
+    import graph
+    import subgraphs.filings_rag_subgraph as filings_rag_subgraph
+
+    monkeypatch.setattr(parse_pool, "FILING_PARSE_WORKERS", 0)
+    contexts = []
+    generate = filings_rag_subgraph.generate_filings_sentiment
+
+    def spy(**kwargs):
+        contexts.append(kwargs["context"])
+        return generate(**kwargs)
+
+    monkeypatch.setattr(filings_rag_subgraph, "generate_filings_sentiment", spy)
+    settings = OfflineSettings(
+        tickers=["AAPL"],
+        distribution="fixed",
+        llm_latency_ms=0,
+        data_latency_ms=0,
+        embed_latency_ms=0,
+        filing_paragraphs=2,
+    )
+    try:
+        with offline_environment(settings):
+            chain = graph.get_research_chain()
+            # the second request misses the filings workflow's cache (its key
+            # includes the direction) and runs after the first one's artifacts
+            # were released
+            for direction in ("long", "short"):
+                chain.invoke(
+                    {
+                        "ticker": "AAPL",
+                        "trade_duration": "swing_trade",
+                        "trade_direction": direction,
+                    }
+                )
+    finally:
+        graph.cache.clear()
+
+    assert len(contexts) == 2
+    assert all(context for context in contexts)
@@ -0,0 +1,122 @@
+"""
+Per-request side store for bulky artifacts referenced from graph state by handle.
+
+LangGraph validates and copies the state on every superstep (and again when the
+filings subgraph is invoked), so large values such as yfinance's ticker.info dict or
+the retrieved filings context are kept here and the state carries a short handle.
+Artifacts are grouped by request scope and released when the request completes; a
+TTL sweep reclaims scopes of requests that never reached the end of the graph.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import uuid4
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Backstop lifetime for artifacts of requests that failed before release (seconds)
+ARTIFACT_TTL_SECONDS = float(os.getenv("ARTIFACT_TTL_SECONDS", "900"))
+
+# Minimum interval between opportunistic sweeps (seconds)
+SWEEP_INTERVAL_SECONDS = 60.0
+
+
+class ArtifactStore:
+    """Thread-safe, process-local artifact store with request scopes and a TTL."""
+
+    def __init__(self, ttl: float = ARTIFACT_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # handle -> (scope, expires_at, value)
+        self._items: Dict[str, Tuple[Optional[str], float, Any]] = {}
+        self._scopes: Dict[str, set[str]] = {}
+        self._last_sweep = time.monotonic()
+
+    def put(
+        self, value: Any, scope: Optional[str] = None, kind: str = "artifact"
+    ) -> str:
+        """
+        Store an artifact.
+
+        Args:
+            value: The artifact
+            scope: Request scope the artifact belongs to (released together)
+            kind: Label used as the handle prefix, for readable state dumps
+
+        Returns:
+            Handle to reference the artifact from graph state
+        """
+        handle = f"{kind}:{uuid4().hex}"
+        now = time.monotonic()
+        with self._lock:
+            self._items[handle] = (scope, now + self.ttl, value)
+            if scope is not None:
+                self._scopes.setdefault(scope, set()).add(handle)
+        if now - self._last_sweep > SWEEP_INTERVAL_SECONDS:
+            self.sweep()
+        return handle
+
+    def get(self, handle: Optional[str], default: Any = None) -> Any:
+        """
+        Resolve a handle.
+
+        Returns:
+            The artifact, or default if the handle is empty, released or expired
+        """
+        if not handle:
+            return default
+        with self._lock:
+            item = self._items.get(handle)
+        if item is None or item[1] < time.monotonic():
+            logger.debug(f"Artifact {handle} is no longer available")
+            return default
+        return item[2]
+
+    def release(self, scope: Optional[str]) -> int:
+        """
+        Drop every artifact of a request scope.
+
+        Returns:
+            Number of artifacts released
+        """
+        if scope is None:
+            return 0
+        with self._lock:
+            handles = self._scopes.pop(scope, set())
+            for handle in handles:
+                self._items.pop(handle, None)
+        return len(handles)
+
+    def sweep(self) -> int:
+        """
+        Drop expired artifacts.
+
+        Returns:
+            Number of artifacts removed
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._last_sweep = now
+            expired = [h for h, (_, expires, _) in self._items.items() if expires < now]
+            for handle in expired:
+                scope = self._items.pop(handle)[0]
+                handles = self._scopes.get(scope)
+                if handles is not None:
+                    handles.discard(handle)
+                    if not handles:
+                        del self._scopes[scope]
+        if expired:
+            logger.info(f"Swept {len(expired)} expired artifacts")
+        return len(expired)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+
+# Process-wide store shared by graph nodes
+artifact_store = ArtifactStore()
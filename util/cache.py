@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Any, Dict, Optional
 from langgraph.types import CachePolicy
 
+from util.artifact_store import artifact_store
 from util.logger import get_logger
 
 logger = get_logger(__name__)
@@ -167,10 +168,10 @@ def create_fundamentals_cache_policy() -> CachePolicy:
     def key_func(x):
         if isinstance(x, dict):
             ticker = x.get("ticker", "default")
-            ticker_info = x.get("ticker_info")
+            ticker_info = artifact_store.get(x.get("ticker_info_handle"))
         else:
             ticker = x.ticker
-            ticker_info = x.ticker_info
+            ticker_info = artifact_store.get(x.ticker_info_handle)
 
         # Include earnings status in key - causes cache miss when status changes
         earnings_flag = (
@@ -181,9 +182,9 @@ def create_fundamentals_cache_policy() -> CachePolicy:
     def ttl_func(x):
         """Dynamic TTL based on earnings proximity."""
         if isinstance(x, dict):
-            ticker_info = x.get("ticker_info")
+            ticker_info = artifact_store.get(x.get("ticker_info_handle"))
         else:
-            ticker_info = x.ticker_info
+            ticker_info = artifact_store.get(x.ticker_info_handle)
 
         return get_fundamentals_ttl(ticker_info)
 
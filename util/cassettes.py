@@ -0,0 +1,336 @@
+"""
+Record/replay cassettes for upstream data providers (yfinance, FRED, SEC EDGAR).
+
+In record mode every upstream call is executed for real and its result stored as a
+compressed cassette. In replay mode results are served from cassettes without any
+network access, optionally with simulated latency. Cassettes are pickles, so only
+replay cassettes you recorded yourself.
+
+Configured by environment:
+    CASSETTE_MODE     off (default), record or replay
+    CASSETTE_DIR      cassette directory (default data/cassettes)
+    CASSETTE_LATENCY  replay delay: 0 (default), "recorded", or a fixed number of ms
+"""
+
+import functools
+import gzip
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off").lower()
+CASSETTE_DIR = Path(os.getenv("CASSETTE_DIR", "data/cassettes"))
+CASSETTE_LATENCY = os.getenv("CASSETTE_LATENCY", "0")
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when no cassette was recorded for a call."""
+
+
+class CassetteLibrary:
+    """
+    Directory of recorded upstream responses, one gzip-compressed pickle per call.
+
+    Args:
+        directory: Directory holding the cassettes
+        mode: "record" to call through and store results, "replay" to serve them
+        latency: Replay delay: "0", "recorded" (sleep for the recorded duration)
+                 or a fixed number of milliseconds
+    """
+
+    def __init__(self, directory: Path, mode: str, latency: str = "0"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unsupported cassette mode {mode!r}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.latency = str(latency).strip().lower()
+        if self.latency != "recorded":
+            float(self.latency)  # fail fast on a malformed setting
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        # raw pickles, so every replay hands out a fresh copy callers may mutate
+        self._loaded: dict[Path, Optional[bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, namespace: str, key: str) -> Path:
+        digest = hashlib.sha1(f"{namespace}|{key}".encode()).hexdigest()
+        return self.directory / namespace / f"{digest}.pkl.gz"
+
+    def _load(self, path: Path) -> Optional[dict]:
+        with self._lock:
+            if path not in self._loaded:
+                self._loaded[path] = (
+                    gzip.decompress(path.read_bytes()) if path.exists() else None
+                )
+            raw = self._loaded[path]
+        return pickle.loads(raw) if raw is not None else None
+
+    def _save(self, path: Path, entry: dict) -> None:
+        raw = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(gzip.compress(raw))
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._loaded[path] = raw
+
+    def _simulate_latency(self, recorded_s: float) -> None:
+        if self.latency == "recorded":
+            delay_s = recorded_s
+        else:
+            delay_s = float(self.latency) / 1000
+        if delay_s > 0:
+            time.sleep(delay_s)
+
+    def call(self, namespace: str, key: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Serve a call from its cassette (replay) or execute and store it (record).
+
+        Args:
+            namespace: Provider namespace, used as the cassette subdirectory
+            key: Stable description of the call within the namespace
+            fn: The real upstream call
+
+        Returns:
+            The (recorded) result of fn(*args, **kwargs)
+
+        Raises:
+            CassetteMissError: In replay mode, if the call was never recorded
+        """
+        path = self._path(namespace, key)
+        if self.mode == "replay":
+            entry = self._load(path)
+            if entry is None:
+                with self._lock:
+                    self.misses += 1
+                raise CassetteMissError(
+                    f"No cassette for {namespace} call {key!r} in {self.directory}; "
+                    "record it with CASSETTE_MODE=record"
+                )
+            with self._lock:
+                self.hits += 1
+            self._simulate_latency(entry["duration_s"])
+            return entry["result"]
+
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        duration_s = time.perf_counter() - start
+        self._save(
+            path,
+            {
+                "namespace": namespace,
+                "key": key,
+                "result": result,
+                "duration_s": duration_s,
+                "recorded_at": time.time(),
+            },
+        )
+        with self._lock:
+            self.recorded += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "directory": str(self.directory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
+
+
+class CassetteTicker:
+    """
+    yfinance.Ticker replacement routing every data accessor through cassettes.
+
+    Properties (info, balance_sheet, ...) are keyed by ticker and name, methods
+    (history, ...) additionally by their arguments. The real Ticker is only built
+    when a call has to go upstream.
+    """
+
+    library: CassetteLibrary
+    real_class: type
+
+    def __init__(self, ticker: str, session=None):
+        self.ticker = ticker
+        self._session = session
+        self._real = None
+
+    def _real_ticker(self):
+        if self._real is None:
+            self._real = self.real_class(self.ticker, session=self._session)
+        return self._real
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        symbol = self.ticker.upper()
+        attribute = inspect.getattr_static(self.real_class, name, None)
+        if isinstance(attribute, property):
+            return self.library.call(
+                "yfinance",
+                f"{symbol}|{name}",
+                lambda: getattr(self._real_ticker(), name),
+            )
+        if callable(attribute):
+
+            def method(*args, **kwargs):
+                key = f"{symbol}|{name}|{args!r}|{sorted(kwargs.items())!r}"
+                return self.library.call(
+                    "yfinance",
+                    key,
+                    lambda: getattr(self._real_ticker(), name)(*args, **kwargs),
+                )
+
+            return method
+        return getattr(self._real_ticker(), name)
+
+
+def cassette_ticker_class(library: CassetteLibrary, real_class: type) -> type:
+    """Build a CassetteTicker class bound to a library and the real Ticker class."""
+    return type(
+        "CassetteTicker",
+        (CassetteTicker,),
+        {"library": library, "real_class": real_class},
+    )
+
+
+def _data_reader(library: CassetteLibrary, original: Callable) -> Callable:
+    @functools.wraps(original)
+    def data_reader(name, data_source=None, start=None, end=None, **kwargs):
+        import pandas as pd
+
+        # key on the window length rather than the dates, which move with the clock
+        window_days = None
+        if start is not None and end is not None:
+            window_days = (pd.Timestamp(end) - pd.Timestamp(start)).days
+        return library.call(
+            "pandas_datareader",
+            f"{name}|{data_source}|{window_days}",
+            original,
+            name,
+            data_source,
+            start,
+            end,
+            **kwargs,
+        )
+
+    return data_reader
+
+
+def _patches(library: CassetteLibrary) -> list[tuple[Any, str, Any]]:
+    """(target, attribute, replacement) triples installing the library."""
+    import pandas_datareader
+    import yfinance
+    from sec_edgar_api import EdgarClient
+
+    import data.util.fetch_sec_filings as fetch_sec_filings
+
+    get_submissions = EdgarClient.get_submissions
+    download_filing = fetch_sec_filings.SECFetcher.download_filing
+    ticker_cik_map = getattr(
+        fetch_sec_filings._get_ticker_cik_map,
+        "__wrapped__",
+        fetch_sec_filings._get_ticker_cik_map,
+    )
+
+    def submissions(client, cik, *args, **kwargs):
+        return library.call(
+            "edgar_submissions", str(cik), get_submissions, client, cik, *args, **kwargs
+        )
+
+    def filing(fetcher, metadata):
+        return library.call(
+            "edgar_filings", metadata.url, download_filing, fetcher, metadata
+        )
+
+    patches = [
+        (yfinance, "Ticker", cassette_ticker_class(library, yfinance.Ticker)),
+        (
+            pandas_datareader,
+            "DataReader",
+            _data_reader(library, pandas_datareader.DataReader),
+        ),
+        (EdgarClient, "get_submissions", submissions),
+        (fetch_sec_filings.SECFetcher, "download_filing", filing),
+        (
+            fetch_sec_filings,
+            "_get_ticker_cik_map",
+            functools.lru_cache(maxsize=1)(
+                lambda: library.call("edgar_ticker_map", "all", ticker_cik_map)
+            ),
+        ),
+    ]
+    if library.mode == "replay":
+        # nothing reaches SEC servers, so their rate limit does not apply
+        patches.append((fetch_sec_filings.SECFetcher, "_rate_limit", lambda self: None))
+    return patches
+
+
+@contextmanager
+def cassette_session(
+    mode: str = CASSETTE_MODE,
+    directory: Path = CASSETTE_DIR,
+    latency: str = CASSETTE_LATENCY,
+) -> Iterator[Optional[CassetteLibrary]]:
+    """
+    Route upstream data calls through cassettes for the duration of the block.
+
+    Yields:
+        The active CassetteLibrary, or None when mode is "off"
+    """
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"CASSETTE_MODE must be one of {CASSETTE_MODES}, got {mode!r}")
+    if mode == "off":
+        yield None
+        return
+
+    library = CassetteLibrary(directory, mode, latency)
+    originals = []
+    try:
+        for target, attribute, replacement in _patches(library):
+            originals.append((target, attribute, getattr(target, attribute)))
+            setattr(target, attribute, replacement)
+        logger.info(f"Cassettes enabled ({mode}) from {library.directory}")
+        yield library
+    finally:
+        for target, attribute, original in reversed(originals):
+            setattr(target, attribute, original)
+        logger.info(f"Cassettes disabled: {library.stats()}")
+
+
+_installed: Optional[CassetteLibrary] = None
+
+
+def install_cassettes_from_env() -> Optional[CassetteLibrary]:
+    """
+    Enable cassettes process-wide if CASSETTE_MODE asks for it (idempotent).
+
+    Returns:
+        The installed CassetteLibrary, or None when cassettes are off
+    """
+    global _installed
+    # read at call time so settings loaded from .env after import are honoured
+    mode = os.getenv("CASSETTE_MODE", CASSETTE_MODE).lower()
+    if _installed is None and mode != "off":
+        session = cassette_session(
+            mode,
+            Path(os.getenv("CASSETTE_DIR", CASSETTE_DIR)),
+            os.getenv("CASSETTE_LATENCY", CASSETTE_LATENCY),
+        )
+        _installed = session.__enter__()
+    return _installed
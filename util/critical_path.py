@@ -0,0 +1,275 @@
+"""Node timing capture and critical-path analysis for graph runs."""
+
+import functools
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from models.metrics import (
+    CriticalPathAnalysis,
+    CriticalPathStep,
+    NodeTiming,
+    RequestMetrics,
+)
+from util.logger import get_logger
+from util.profiling import profile_node
+
+logger = get_logger(__name__)
+
+
+def timed_node(name: str) -> Callable:
+    """
+    Decorator recording a node's start/end offsets relative to request start.
+
+    The timing is attached to the node's returned metrics, so it flows through
+    the metrics reducer like any other agent metric. Nodes whose state carries
+    no request start (e.g. graphs invoked directly from LangSmith) are left untouched.
+    When a profiling session is active the node run is also profiled.
+
+    Args:
+        name: Graph node name to record the timing under
+    """
+
+    def decorator(fn: Callable[..., dict]) -> Callable[..., dict]:
+        @functools.wraps(fn)
+        def wrapper(state, *args, **kwargs) -> dict:
+            iteration = state.revision_iteration_count + 1
+            with profile_node(f"{name}#{iteration}"):
+                start = time.perf_counter()
+                result = fn(state, *args, **kwargs)
+                end = time.perf_counter()
+
+            request_metrics = getattr(state, "metrics", None)
+            if request_metrics is None or request_metrics.started_at is None:
+                return result
+
+            timing = NodeTiming(
+                node=name,
+                iteration=iteration,
+                request_id=request_metrics.request_id,
+                start_ms=(start - request_metrics.started_at) * 1000,
+                end_ms=(end - request_metrics.started_at) * 1000,
+            )
+            result = dict(result or {})
+            metrics = result.get("metrics") or RequestMetrics()
+            metrics.add_node_timing(timing)
+            result["metrics"] = metrics
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _predecessors(
+    timing: NodeTiming,
+    timings: List[NodeTiming],
+    dependencies: Dict[str, List[str]],
+) -> List[NodeTiming]:
+    """Node runs that timing depends on and that finished before it started."""
+    upstream = dependencies.get(timing.node, [])
+    return [t for t in timings if t.node in upstream and t.end_ms <= timing.start_ms]
+
+
+def _successor(
+    timing: NodeTiming,
+    timings: List[NodeTiming],
+    dependencies: Dict[str, List[str]],
+) -> Optional[NodeTiming]:
+    """Earliest node run that depends on timing and started after it finished."""
+    downstream = [
+        t
+        for t in timings
+        if timing.node in dependencies.get(t.node, []) and t.start_ms >= timing.end_ms
+    ]
+    return min(downstream, key=lambda t: t.start_ms) if downstream else None
+
+
+def _slack_label(timing: NodeTiming) -> str:
+    return timing.node if timing.iteration == 1 else timing.key
+
+
+def analyze_critical_path(
+    metrics: RequestMetrics,
+    dependencies: Dict[str, List[str]],
+    nested: Optional[Dict[str, List[str]]] = None,
+) -> CriticalPathAnalysis:
+    """
+    Derive the critical path of a request from its recorded node timings.
+
+    Args:
+        metrics: Request metrics carrying node timings
+        dependencies: Map of node name to the node names it waits on
+        nested: Map of a node to the nodes it runs internally (e.g. a subgraph),
+                used to break that node down when it is on the critical path
+
+    Returns:
+        CriticalPathAnalysis for the request
+    """
+    nested = nested or {}
+    nested_nodes = {child for children in nested.values() for child in children}
+
+    live = []
+    cached = []
+    for timing in metrics.node_timings.values():
+        if timing.request_id == metrics.request_id:
+            live.append(timing)
+        else:
+            cached.append(timing.key)
+
+    top_level = [t for t in live if t.node not in nested_nodes]
+    analysis = CriticalPathAnalysis(
+        request_id=metrics.request_id, cached_nodes=sorted(cached)
+    )
+    if not top_level:
+        return analysis
+
+    last = max(top_level, key=lambda t: t.end_ms)
+    analysis.total_ms = metrics.total_latency_ms or last.end_ms
+
+    # walk backwards from the last node, always following the latest-finishing dependency
+    path = [last]
+    predecessors = _predecessors(last, top_level, dependencies)
+    while predecessors:
+        current = max(predecessors, key=lambda t: t.end_ms)
+        path.append(current)
+        predecessors = _predecessors(current, top_level, dependencies)
+    path.reverse()
+
+    previous_end = 0.0
+    for timing in path:
+        step = CriticalPathStep(
+            node=timing.node,
+            iteration=timing.iteration,
+            start_ms=timing.start_ms,
+            end_ms=timing.end_ms,
+            duration_ms=timing.duration_ms,
+            wait_ms=max(0.0, timing.start_ms - previous_end),
+        )
+        child_start = timing.start_ms
+        children = sorted(
+            (t for t in live if t.node in nested.get(timing.node, [])),
+            key=lambda t: t.start_ms,
+        )
+        for child in children:
+            step.segments.append(
+                CriticalPathStep(
+                    node=child.node,
+                    iteration=child.iteration,
+                    start_ms=child.start_ms,
+                    end_ms=child.end_ms,
+                    duration_ms=child.duration_ms,
+                    wait_ms=max(0.0, child.start_ms - child_start),
+                )
+            )
+            child_start = child.end_ms
+        analysis.critical_path.append(step)
+        previous_end = timing.end_ms
+
+    on_path = {t.key for t in path}
+    for timing in sorted(top_level, key=lambda t: t.start_ms):
+        if timing.key in on_path:
+            analysis.slack_ms[_slack_label(timing)] = 0.0
+            continue
+        successor = _successor(timing, top_level, dependencies)
+        if successor is None:
+            ready_ms = last.end_ms
+        else:
+            ready_ms = max(
+                t.end_ms for t in _predecessors(successor, top_level, dependencies)
+            )
+        analysis.slack_ms[_slack_label(timing)] = max(0.0, ready_ms - timing.end_ms)
+
+    # time spent after the first pass through the revision loop completed
+    revisions = [t for t in top_level if t.iteration > 1]
+    if revisions:
+        loop_nodes = {t.node for t in revisions}
+        first_pass_end = max(
+            t.end_ms for t in top_level if t.node in loop_nodes and t.iteration == 1
+        )
+        analysis.revision_loop_ms = max(t.end_ms for t in revisions) - first_pass_end
+
+    return analysis
+
+
+class CriticalPathReport:
+    """Thread-safe aggregate of critical-path analyses across requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._total_ms = 0.0
+        self._revision_loop_ms = 0.0
+        self._critical_counts: Dict[str, int] = defaultdict(int)
+        # running (sum, count) pairs so the report stays constant-size
+        self._durations: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+        self._slack: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+
+    def record(self, analysis: CriticalPathAnalysis) -> None:
+        """Add a request's analysis to the report."""
+        if not analysis.critical_path:
+            return
+
+        with self._lock:
+            self._requests += 1
+            self._total_ms += analysis.total_ms
+            self._revision_loop_ms += analysis.revision_loop_ms
+            for node in {step.node for step in analysis.critical_path}:
+                self._critical_counts[node] += 1
+            for step in analysis.critical_path:
+                totals = self._durations[step.node]
+                totals[0] += step.duration_ms
+                totals[1] += 1
+            for label, slack in analysis.slack_ms.items():
+                totals = self._slack[label.split("#")[0]]
+                totals[0] += slack
+                totals[1] += 1
+
+    def summary(self) -> dict:
+        """Summarize which nodes bound latency most often, most critical first."""
+        with self._lock:
+            requests = self._requests
+            if requests == 0:
+                return {"requests": 0, "nodes": {}}
+
+            nodes = {}
+            for node in set(self._slack) | set(self._critical_counts):
+                duration_sum, duration_count = self._durations.get(node, (0.0, 0))
+                slack_sum, slack_count = self._slack.get(node, (0.0, 0))
+                nodes[node] = {
+                    "critical_share": round(self._critical_counts[node] / requests, 4),
+                    "mean_critical_duration_ms": (
+                        round(duration_sum / duration_count, 2)
+                        if duration_count
+                        else None
+                    ),
+                    "mean_slack_ms": (
+                        round(slack_sum / slack_count, 2) if slack_count else None
+                    ),
+                }
+
+            return {
+                "requests": requests,
+                "mean_total_ms": round(self._total_ms / requests, 2),
+                "mean_revision_loop_ms": round(self._revision_loop_ms / requests, 2),
+                "revision_loop_share": (
+                    round(self._revision_loop_ms / self._total_ms, 4)
+                    if self._total_ms > 0
+                    else 0.0
+                ),
+                "nodes": dict(
+                    sorted(
+                        nodes.items(),
+                        key=lambda item: (
+                            item[1]["critical_share"],
+                            item[1]["mean_critical_duration_ms"] or 0.0,
+                        ),
+                        reverse=True,
+                    )
+                ),
+            }
+
+
+# Process-wide report served by the API
+critical_path_report = CriticalPathReport()
@@ -0,0 +1,58 @@
+"""
+Deferred imports for heavy third-party modules.
+
+Modules such as yfinance or pandas_datareader take hundreds of milliseconds to import
+and are only needed once a request runs. lazy_import returns a proxy that imports the
+real module on first attribute access, so module-level aliases (and patch targets like
+"agents.technical.tools.yf.Ticker") keep working without paying the import at startup.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule:
+    """Proxy for a module that is imported on first attribute access."""
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self) -> ModuleType:
+        module = self._module
+        if module is None:
+            # import under a lock so parallel graph nodes never see a half-initialised module
+            with self._lock:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute: str, value) -> None:
+        setattr(self._load(), attribute, value)
+
+    def __delattr__(self, attribute: str) -> None:
+        delattr(self._load(), attribute)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Import a module on first use.
+
+    Args:
+        name: Absolute module name, e.g. "yfinance"
+
+    Returns:
+        Proxy forwarding attribute access to the module once imported
+    """
+    return LazyModule(name)
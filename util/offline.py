@@ -0,0 +1,637 @@
+"""
+Deterministic stand-ins for the LLMs and external data providers used by the graph.
+
+Every fake draws its latency from a LatencyModel so the benchmark can reproduce
+realistic (or pathological) provider behaviour without network access or token spend.
+offline_environment patches them in; the graph benchmark and the synthetic warmup
+request both run the graph inside it.
+"""
+
+import hashlib
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import typing
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Type
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+from pydantic_core import PydanticUndefined
+
+from agents.shared.embedding_models import EmbeddingEngine
+from models.agent import FilingMetadata
+from util.cassettes import cassette_session
+
+# Matches all-MiniLM-L6-v2 so collections look like production ones
+FAKE_EMBEDDING_DIMS = 384
+
+DISTRIBUTIONS = ("fixed", "lognormal", "exponential")
+
+
+def _seed(*parts: Any) -> int:
+    """Stable seed derived from arbitrary values (hash() is salted per process)."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class LatencyModel(BaseModel):
+    """Latency distribution sampled by the fakes (all values in milliseconds)."""
+
+    median_ms: float = 0.0
+    distribution: str = "lognormal"
+    sigma: float = 0.4  # lognormal shape; ignored by other distributions
+    seed: int = 0
+
+    model_config = ConfigDict(frozen=True)
+
+    def sampler(self, name: str) -> "LatencySampler":
+        return LatencySampler(self, name)
+
+
+class LatencySampler:
+    """Thread-safe, seeded sampler for a LatencyModel."""
+
+    def __init__(self, model: LatencyModel, name: str):
+        if model.distribution not in DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution {model.distribution!r}, expected one of {DISTRIBUTIONS}"
+            )
+        self.model = model
+        self._rng = random.Random(_seed(model.seed, name))
+        self._lock = threading.Lock()
+
+    def sample_ms(self) -> float:
+        median = self.model.median_ms
+        if median <= 0:
+            return 0.0
+        with self._lock:
+            if self.model.distribution == "fixed":
+                return median
+            if self.model.distribution == "exponential":
+                # median of an exponential distribution is mean * ln 2
+                return self._rng.expovariate(np.log(2) / median)
+            return self._rng.lognormvariate(np.log(median), self.model.sigma)
+
+    def sleep(self) -> None:
+        delay_ms = self.sample_ms()
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+
+def _fake_value(annotation: Any, name: str, rng: random.Random, false_rate: float):
+    """Build a plausible value for a pydantic field annotation."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is typing.Union:
+        non_null = [a for a in args if a is not type(None)]
+        return _fake_value(non_null[0], name, rng, false_rate) if non_null else None
+    if origin is typing.Literal:
+        return rng.choice(args)
+    if origin in (list, List):
+        return [_fake_value(args[0], name, rng, false_rate) for _ in range(3)]
+    if origin in (dict, Dict):
+        return {}
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return fake_structured_output(annotation, rng, false_rate)
+        if issubclass(annotation, Enum):
+            return rng.choice(list(annotation))
+        if issubclass(annotation, bool):
+            return rng.random() >= false_rate
+        if issubclass(annotation, int):
+            return rng.randint(1, 10)
+        if issubclass(annotation, float):
+            return round(rng.random(), 3)
+        if issubclass(annotation, str):
+            return f"benchmark {name.replace('_', ' ')} {rng.randint(1, 999)}"
+    return None
+
+
+def fake_structured_output(
+    schema: Type[BaseModel],
+    rng: Optional[random.Random] = None,
+    false_rate: float = 0.0,
+) -> BaseModel:
+    """
+    Instantiate schema with plausible values for every required field.
+
+    Args:
+        schema: Pydantic output schema requested by the agent
+        rng: Random source (seeded from the schema name if omitted)
+        false_rate: Probability that boolean fields are False (e.g. to make
+                    the evaluator reject and exercise the revision loop)
+
+    Returns:
+        Instance of schema
+    """
+    rng = rng or random.Random(_seed(schema.__name__))
+    values = {}
+    for name, field in schema.model_fields.items():
+        if field.default is not PydanticUndefined or field.default_factory:
+            continue
+        values[name] = _fake_value(field.annotation, name, rng, false_rate)
+    return schema(**values)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model returning schema-valid responses after a sampled delay.
+
+    Supports the subset of the chat model API the agents use: invoke, bind_tools
+    (the first call requests the first bound tool, the follow-up returns text) and
+    with_structured_output(include_raw=True). Usage metadata is estimated from the
+    prompt and response sizes so token metrics flow through the graph unchanged.
+    """
+
+    model_name: str = "fake"
+    latency: LatencyModel = Field(default_factory=LatencyModel)
+    tickers: List[str] = Field(default_factory=list)
+    false_rate: float = 0.0
+
+    _sampler: LatencySampler = PrivateAttr()
+    _rng: random.Random = PrivateAttr()
+    _rng_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _calls: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._sampler = self.latency.sampler(self.model_name)
+        self._rng = random.Random(_seed(self.latency.seed, self.model_name, "outputs"))
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def get_num_tokens(self, text: str) -> int:
+        return _estimate_tokens(text)
+
+    def _ticker_in(self, text: str) -> str:
+        for ticker in self.tickers:
+            if re.search(rf"\b{re.escape(ticker)}\b", text):
+                return ticker
+        return self.tickers[0] if self.tickers else "FAKE"
+
+    def _tool_call(self, tool: dict, prompt: str) -> dict:
+        parameters = tool["function"].get("parameters", {})
+        args = {}
+        for name in parameters.get("required", []):
+            args[name] = self._ticker_in(prompt) if name == "ticker" else "benchmark"
+        with self._rng_lock:
+            call_id = f"call_{self._rng.getrandbits(32):08x}"
+        return {"name": tool["function"]["name"], "args": args, "id": call_id}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._sampler.sleep()
+        with self._rng_lock:
+            self._calls += 1
+
+        prompt = "\n".join(str(m.content) for m in messages)
+        tools = kwargs.get("tools") or []
+        has_tool_result = any(isinstance(m, ToolMessage) for m in messages)
+
+        tool_calls = []
+        if tools and not has_tool_result:
+            tool_calls = [self._tool_call(tools[0], prompt)]
+            content = ""
+        else:
+            content = kwargs.get("content") or "Benchmark analysis: outlook NEUTRAL."
+
+        input_tokens = _estimate_tokens(prompt)
+        output_tokens = _estimate_tokens(content) + 20 * len(tool_calls)
+        message = AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def with_structured_output(self, schema, *, include_raw: bool = False, **kwargs):
+        def respond(model_input):
+            with self._rng_lock:
+                parsed = fake_structured_output(schema, self._rng, self.false_rate)
+            raw = self.invoke(model_input, content=parsed.model_dump_json())
+            if include_raw:
+                return {"raw": raw, "parsed": parsed, "parsing_error": None}
+            return parsed
+
+        return RunnableLambda(respond)
+
+
+class FakeTicker:
+    """
+    Stand-in for yfinance.Ticker backed by deterministic synthetic data.
+
+    Each property access that would be an HTTP round trip in yfinance sleeps for
+    one latency sample.
+    """
+
+    latency_sampler: Optional[LatencySampler] = None
+
+    def __init__(self, ticker: str, session=None):
+        self.ticker = ticker.upper()
+        self._seed = _seed("ticker", self.ticker)
+
+    def _fetch(self) -> np.random.Generator:
+        if self.latency_sampler is not None:
+            self.latency_sampler.sleep()
+        return np.random.default_rng(self._seed)
+
+    @property
+    def info(self) -> dict:
+        rng = self._fetch()
+        price = float(rng.uniform(20, 500))
+        shares = float(rng.uniform(1e8, 1e10))
+        return {
+            "symbol": self.ticker,
+            "longName": f"{self.ticker} Holdings Inc.",
+            "sector": "Technology",
+            "industry": "Software - Infrastructure",
+            "currentPrice": round(price, 2),
+            "marketCap": round(price * shares),
+            "sharesOutstanding": round(shares),
+            "trailingPE": round(float(rng.uniform(8, 60)), 2),
+            "forwardPE": round(float(rng.uniform(8, 50)), 2),
+            "priceToBook": round(float(rng.uniform(1, 20)), 2),
+            "returnOnEquity": round(float(rng.uniform(-0.1, 0.5)), 4),
+            "profitMargins": round(float(rng.uniform(-0.05, 0.4)), 4),
+            "debtToEquity": round(float(rng.uniform(0, 200)), 2),
+            "beta": round(float(rng.uniform(0.5, 2.0)), 2),
+            "targetMeanPrice": round(price * 1.1, 2),
+            "targetHighPrice": round(price * 1.4, 2),
+            "targetLowPrice": round(price * 0.8, 2),
+        }
+
+    def history(self, period: str = "1y", interval: str = "1d", **kwargs):
+        rng = self._fetch()
+        index = pd.bdate_range(end=datetime.now().date(), periods=300)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, len(index))))
+        spread = close * rng.uniform(0.002, 0.02, len(index))
+        return pd.DataFrame(
+            {
+                "Open": close + rng.normal(0, 0.5, len(index)),
+                "High": close + spread,
+                "Low": close - spread,
+                "Close": close,
+                "Volume": rng.integers(1_000_000, 50_000_000, len(index)),
+            },
+            index=index,
+        )
+
+    def _statement(self, rows: List[str], periods: int, days: int) -> pd.DataFrame:
+        rng = self._fetch()
+        columns = pd.DatetimeIndex(
+            [datetime.now() - timedelta(days=days * (i + 1)) for i in range(periods)]
+        ).normalize()
+        return pd.DataFrame(
+            rng.uniform(1e8, 1e11, (len(rows), periods)), index=rows, columns=columns
+        )
+
+    @property
+    def income_stmt(self):
+        from agents.fundamentals.tools import INCOME_METRICS
+
+        return self._statement(INCOME_METRICS, 4, 365)
+
+    @property
+    def quarterly_income_stmt(self):
+        from agents.fundamentals.tools import INCOME_METRICS
+
+        return self._statement(INCOME_METRICS, 5, 91)
+
+    @property
+    def balance_sheet(self):
+        from agents.fundamentals.tools import BALANCE_SHEET_METRICS
+
+        return self._statement(BALANCE_SHEET_METRICS, 4, 365)
+
+    @property
+    def quarterly_balance_sheet(self):
+        from agents.fundamentals.tools import BALANCE_SHEET_METRICS
+
+        return self._statement(BALANCE_SHEET_METRICS, 5, 91)
+
+    @property
+    def cashflow(self):
+        from agents.fundamentals.tools import CASH_FLOW_METRICS
+
+        return self._statement(CASH_FLOW_METRICS, 4, 365)
+
+    @property
+    def quarterly_cashflow(self):
+        from agents.fundamentals.tools import CASH_FLOW_METRICS
+
+        return self._statement(CASH_FLOW_METRICS, 5, 91)
+
+
+class FakeDataReader:
+    """Callable stand-in for pandas_datareader.DataReader serving monthly FRED series."""
+
+    def __init__(self, latency: LatencyModel):
+        self._sampler = latency.sampler("fred")
+
+    def __call__(self, name, data_source=None, start=None, end=None, **kwargs):
+        self._sampler.sleep()
+        end = pd.Timestamp(end or datetime.now())
+        start = pd.Timestamp(start or end - timedelta(days=365))
+        index = pd.date_range(start=start, end=end, freq="MS")
+        rng = np.random.default_rng(_seed("fred", name))
+        base = rng.uniform(1, 300)
+        values = base + np.cumsum(rng.normal(0, base * 0.005, len(index)))
+        return pd.DataFrame({name: values}, index=index)
+
+
+_FILING_SECTIONS = {
+    "10-K": [
+        "Item 1. Business",
+        "Item 1A. Risk Factors",
+        "Item 7. Management's Discussion and Analysis",
+        "Item 8. Financial Statements and Supplementary Data",
+    ],
+    "10-Q": [
+        "Part I. Financial Information",
+        "Item 1A. Risk Factors",
+        "Item 2. Management's Discussion and Analysis",
+    ],
+}
+
+_FILING_VOCABULARY = (
+    "revenue growth margin liquidity competition supply chain regulatory risk "
+    "customers demand pricing guidance outlook debt covenant cash flow capital "
+    "expenditure inventory segment subscription cloud services litigation tax "
+    "currency interest rates headcount restructuring acquisition integration"
+).split()
+
+
+class FakeSECFetcher:
+    """Drop-in for SECFetcher serving synthetic 10-K/10-Q filings."""
+
+    def __init__(self, latency: LatencyModel, paragraphs_per_section: int = 40):
+        self._sampler = latency.sampler("edgar")
+        self.paragraphs_per_section = paragraphs_per_section
+
+    def fetch_filing_list(
+        self,
+        ticker: str,
+        filing_types: list[str] = ["10-K", "10-Q"],
+        limit: int = 10,
+    ) -> list[FilingMetadata]:
+        self._sampler.sleep()
+        ticker = ticker.upper()
+        cik = str(_seed("cik", ticker) % 10**10).zfill(10)
+        filings = []
+        for i in range(8):
+            form = "10-K" if i % 4 == 0 else "10-Q"
+            if form not in filing_types or len(filings) >= limit:
+                continue
+            filed = datetime.now() - timedelta(days=30 + 91 * i)
+            accession = f"{cik}-{filed:%y}-{i:06d}"
+            filings.append(
+                FilingMetadata(
+                    ticker=ticker,
+                    filing_type=form,
+                    filing_date=filed.strftime("%Y-%m-%d"),
+                    accession_number=accession,
+                    url=f"https://example.invalid/{ticker}/{accession}.htm",
+                )
+            )
+        return filings
+
+    def download_filing(self, metadata: FilingMetadata) -> Optional[str]:
+        self._sampler.sleep()
+        rng = random.Random(_seed("filing", metadata.accession_number))
+        body = [f"<html><head><title>{metadata.ticker} {metadata.filing_type}</title>"]
+        body.append("<style>p { margin: 0 }</style></head><body>")
+        for heading in _FILING_SECTIONS.get(metadata.filing_type, ["Item 1.01"]):
+            body.append(f"<h2>{heading}</h2>")
+            for _ in range(self.paragraphs_per_section):
+                words = rng.choices(_FILING_VOCABULARY, k=rng.randint(40, 90))
+                body.append(f"<p>{metadata.ticker} {' '.join(words)}.</p>")
+        body.append("</body></html>")
+        return "\n".join(body)
+
+
+def _hashed_embedding(text: str) -> list[float]:
+    """Bag-of-words feature hashing: deterministic and roughly similarity preserving."""
+    vector = np.zeros(FAKE_EMBEDDING_DIMS, dtype=np.float32)
+    for token in re.findall(r"\w+", text.lower()):
+        vector[_seed("token", token) % FAKE_EMBEDDING_DIMS] += 1.0
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
+
+
+class FakeSentenceTransformer:
+    """Stands in for the SentenceTransformer loaded by EmbeddingEngine."""
+
+    def __init__(self, latency: LatencyModel):
+        self._sampler = latency.sampler("embeddings")
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return FAKE_EMBEDDING_DIMS
+
+    def encode(self, sentences: list[str], **kwargs) -> np.ndarray:
+        self._sampler.sleep()
+        return np.asarray(
+            [_hashed_embedding(text) for text in sentences], dtype=np.float32
+        )
+
+
+class FakeEmbeddingEngine(EmbeddingEngine):
+    """
+    EmbeddingEngine over FakeSentenceTransformer, serving both ingestion and Chroma
+    query embedding like the real engine.
+    """
+
+    def __init__(self, latency: LatencyModel):
+        super().__init__(model_name="benchmark_hashing")
+        self._latency = latency
+
+    def _load(self) -> FakeSentenceTransformer:
+        self.load_ms = 0.0
+        return FakeSentenceTransformer(self._latency)
+
+
+class OfflineSettings(BaseModel):
+    """Latencies and data of the fakes installed by offline_environment."""
+
+    tickers: List[str] = ["AAPL", "MSFT", "NVDA", "AMZN"]
+    distribution: str = "lognormal"
+    sigma: float = 0.4
+    seed: int = 0
+    llm_latency_ms: float = 200.0
+    data_latency_ms: float = 50.0
+    embed_latency_ms: float = 5.0
+    revision_rate: float = 0.0  # probability the evaluator rejects a draft
+    filing_paragraphs: int = 40  # paragraphs per section in synthetic filings
+    real_embeddings: bool = False  # use the sentence-transformers model
+    cassettes: Optional[Path] = None  # replay yfinance/FRED/EDGAR from here
+    cassette_latency: str = "0"
+
+
+@contextmanager
+def offline_environment(settings: OfflineSettings) -> Iterator[tuple]:
+    """
+    Patch every external dependency of the graph with fakes.
+
+    yfinance and pandas_datareader are patched at the library level (the tools look
+    them up through the module at call time). The LLM factories are imported by name
+    into each agent module, so every module holding a reference is patched.
+
+    With settings.cassettes, yfinance, FRED and EDGAR are replayed from recorded cassettes
+    instead of being faked.
+
+    Yields:
+        The fake chat models handed out (filled lazily), for call accounting,
+        and the cassette library (None when not replaying)
+    """
+    import chromadb
+    import pandas_datareader
+    import yfinance
+
+    from agents.shared import embedding_models, llm_models
+    import data.util.embedding_cache as embedding_cache
+    import data.util.fetch_sec_filings as fetch_sec_filings
+    import data.util.filing_manifest as filing_manifest
+    import data.util.ingest_sec_filings as ingest_sec_filings
+    import data.util.vector_store as vector_store
+    import graph  # noqa: F401 - imports every agent module
+
+    def latency(median_ms: float, name: str) -> LatencyModel:
+        return LatencyModel(
+            median_ms=median_ms,
+            distribution=settings.distribution,
+            sigma=settings.sigma,
+            seed=settings.seed + sum(map(ord, name)),
+        )
+
+    models: dict[tuple, FakeChatModel] = {}
+    models_lock = threading.Lock()
+
+    def fake_llm(model: str, *fake_args, **fake_kwargs) -> FakeChatModel:
+        # one fake per factory call signature, mirroring the lru_cache in llm_models
+        key = (model, fake_args, tuple(sorted(fake_kwargs.items())))
+        with models_lock:
+            if key not in models:
+                models[key] = FakeChatModel(
+                    model_name=model,
+                    latency=latency(settings.llm_latency_ms, model),
+                    tickers=settings.tickers,
+                    false_rate=settings.revision_rate,
+                )
+            return models[key]
+
+    with ExitStack() as stack:
+        # removed on exit, after the patches pointing into it are undone
+        workdir = Path(
+            stack.enter_context(
+                tempfile.TemporaryDirectory(
+                    prefix="graph-benchmark-", ignore_cleanup_errors=True
+                )
+            )
+        )
+        # the manifest connection opened in it is dropped before it is removed
+        stack.callback(filing_manifest.close_connections)
+        stack.enter_context(
+            patch.object(
+                FakeTicker,
+                "latency_sampler",
+                latency(settings.data_latency_ms, "yfinance").sampler("yfinance"),
+            )
+        )
+        factories = {
+            "get_openai_llm": llm_models.get_openai_llm,
+            "get_google_llm": llm_models.get_google_llm,
+        }
+        for module in list(sys.modules.values()):
+            # module __dict__ rather than getattr, which would trigger lazy module
+            # __getattr__ hooks (transformers imports submodules that way)
+            namespace = getattr(module, "__dict__", {})
+            for name, original in factories.items():
+                if namespace.get(name) is original:
+                    stack.enter_context(patch.object(module, name, fake_llm))
+
+        if settings.cassettes:
+            cassettes = stack.enter_context(
+                cassette_session(
+                    "replay", settings.cassettes, settings.cassette_latency
+                )
+            )
+            # a fresh fetcher, so no client built before the patches is reused
+            stack.enter_context(patch.object(fetch_sec_filings, "_fetcher", None))
+        else:
+            cassettes = None
+            stack.enter_context(patch.object(yfinance, "Ticker", FakeTicker))
+            stack.enter_context(
+                patch.object(
+                    pandas_datareader,
+                    "DataReader",
+                    FakeDataReader(latency(settings.data_latency_ms, "fred")),
+                )
+            )
+            stack.enter_context(
+                patch.object(
+                    fetch_sec_filings,
+                    "_fetcher",
+                    FakeSECFetcher(
+                        latency(settings.data_latency_ms, "edgar"),
+                        paragraphs_per_section=settings.filing_paragraphs,
+                    ),
+                )
+            )
+
+        # isolated vector store, caches and manifests so runs never touch data/
+        stack.enter_context(
+            patch.object(ingest_sec_filings, "FILINGS_CACHE_DIR", workdir / "filings")
+        )
+        stack.enter_context(
+            patch.object(filing_manifest, "MANIFEST_DIR", workdir / "manifests")
+        )
+        stack.enter_context(
+            patch.object(
+                embedding_cache, "EMBEDDING_CACHE_DIR", str(workdir / "embeddings")
+            )
+        )
+        if not settings.real_embeddings:
+            # ingestion and Chroma query embedding both resolve the shared engine
+            fake_engine = FakeEmbeddingEngine(
+                latency(settings.embed_latency_ms, "embed")
+            )
+            stack.enter_context(patch.object(embedding_models, "_engine", fake_engine))
+
+        # created once: concurrent PersistentClient construction on a fresh path races
+        chroma_client = chromadb.PersistentClient(path=str(workdir / "chroma"))
+        stack.enter_context(patch.object(vector_store, "_client", chroma_client))
+        # fresh handles, so none opened on the real store leak into the run (or back)
+        stack.enter_context(
+            patch.object(vector_store, "_registry", vector_store.CollectionRegistry())
+        )
+
+        yield models, cassettes
@@ -0,0 +1,134 @@
+"""
+Pre-fork support: load read-only state in the parent, rebuild worker-local state in
+each forked worker.
+
+With gunicorn's preload_app the parent imports the application, loads the compiled
+graphs, embedding models and tokenizer, then forks. Workers share those pages
+copy-on-write instead of each loading their own copy. Anything holding sockets,
+threads or locks (HTTP pools, the Chroma client, the SEC fetcher) is created after
+the fork, and reset here in case the parent created it.
+"""
+
+import fcntl
+import gc
+import os
+import sys
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Set by the gunicorn master to a lock file the workers contend for, so one-off work
+# such as the PRELOAD_TICKERS ingestion runs in a single worker
+PRELOAD_LOCK_ENV = "PREFORK_PRELOAD_LOCK"
+
+# lock files held until the process exits
+_held_locks = []
+
+
+def preload_application() -> None:
+    """
+    Load the shareable parts of the application in the parent process.
+
+    Only loads data: no inference is run, so torch does not start its thread pool
+    before the fork, and no network clients or background threads are created.
+    """
+    import main
+    from util.startup import startup_report
+
+    # resolves the graph loader in the parent, so workers start with it loaded
+    main.graph_loader.get()
+
+    with startup_report.phase("preload.embedding_model"):
+        try:
+            from agents.shared.embedding_models import get_embedding_engine
+
+            engine = get_embedding_engine()
+            if engine.backend == "onnx":
+                # ONNX Runtime sessions start their thread pool on creation, and
+                # threads do not survive a fork: each worker loads its own
+                logger.info("Not preloading the ONNX embedding model")
+            else:
+                # loads the weights only: encoding would start torch's thread pool
+                engine.model
+        except Exception as e:
+            # workers retry during warmup and report it through /ready
+            logger.warning(f"Could not preload the embedding model: {e}")
+
+    with startup_report.phase("preload.tokenizer"):
+        from agents.shared.llm_models import LLM_MODELS
+        from agents.shared.tokenization import load_static_prompts, pretokenize_prompts
+
+        prompts = load_static_prompts()
+        for model in LLM_MODELS.values():
+            pretokenize_prompts(prompts, model)
+
+    # Move everything loaded so far out of the collector's generations: collections
+    # in the workers would otherwise write to (and so copy) every shared page.
+    gc.freeze()
+    logger.info("Preloaded application state for forked workers")
+
+
+def reset_after_fork(workers: int = 1) -> None:
+    """
+    Rebuild worker-local state in a freshly forked worker.
+
+    Args:
+        workers: Number of workers sharing the machine, used to split torch threads
+    """
+    from agents.shared.llm_models import get_google_llm, get_openai_llm
+
+    # LLM clients own HTTP connection pools that must not be shared across processes
+    get_openai_llm.cache_clear()
+    get_google_llm.cache_clear()
+
+    fetch_sec_filings = sys.modules.get("data.util.fetch_sec_filings")
+    if fetch_sec_filings is not None:
+        fetch_sec_filings._fetcher = None
+
+    # parser processes belong to the parent; workers start their own on first use
+    parse_pool = sys.modules.get("data.util.parse_pool")
+    if parse_pool is not None:
+        parse_pool._pool = None
+
+    # SQLite connections must not cross a fork
+    filing_manifest = sys.modules.get("data.util.filing_manifest")
+    if filing_manifest is not None:
+        filing_manifest.close_connections()
+
+    # the Chroma client holds SQLite connections, which must not cross a fork
+    vector_store = sys.modules.get("data.util.vector_store")
+    if vector_store is not None:
+        vector_store._client = None
+        vector_store.invalidate_collection()
+
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // max(1, workers)))
+
+    logger.info(f"Worker {os.getpid()} reset worker-local state after fork")
+
+
+def claim_preload_ingestion() -> bool:
+    """
+    Claim the PRELOAD_TICKERS ingestion for this worker.
+
+    The claim is a non-blocking lock on the file named by PREFORK_PRELOAD_LOCK, held
+    until the worker exits: a worker started to replace it claims it again, and the
+    manifest makes that second run incremental.
+
+    Returns:
+        True if this process should run the ingestion (always without gunicorn)
+    """
+    path = os.environ.get(PRELOAD_LOCK_ENV)
+    if not path:
+        return True
+
+    lock_file = open(path, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return False
+    _held_locks.append(lock_file)
+    return True
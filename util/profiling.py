@@ -0,0 +1,275 @@
+"""Opt-in per-request profiling of graph nodes (wall, CPU, stack samples, allocations).
+
+Profiling is switched on per request by activating a ProfileSession. Nodes wrapped
+with timed_node look up the active session through a context variable, so when no
+session is active the only cost is a single ContextVar lookup per node.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, Optional
+from uuid import uuid4
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_OUTPUT_DIR = Path(os.getenv("PROFILE_OUTPUT_DIR", "data/profiles"))
+
+# Stack sampling interval in seconds
+DEFAULT_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+# Allocation sites reported per node. Only the allocating frame is traced, which
+# keeps snapshot comparison cheap enough to run at every node boundary.
+TOP_ALLOCATIONS = 20
+
+# Leaf frames of threads parked in a pool or lock, skipped when sampling
+_IDLE_FRAMES = {("threading", "wait"), ("queue", "get"), ("thread", "_worker")}
+
+# Bucket for samples taken outside any node (graph scheduling, state validation, reducers)
+GRAPH_BUCKET = "(graph)"
+
+# Keep the profiler's own bookkeeping out of allocation reports
+_IGNORED_ALLOCATION_FILES = {tracemalloc.__file__, __file__}
+
+_active_session: ContextVar[Optional["ProfileSession"]] = ContextVar(
+    "profile_session", default=None
+)
+
+# tracemalloc is process-wide, so it is reference counted across concurrent sessions
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users = max(0, _tracemalloc_users - 1)
+        if _tracemalloc_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+@functools.lru_cache(maxsize=4096)
+def _module_name(filename: str) -> str:
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def _is_idle(frame) -> bool:
+    return (
+        _module_name(frame.f_code.co_filename),
+        frame.f_code.co_name,
+    ) in _IDLE_FRAMES
+
+
+def _fold_stack(frame) -> str:
+    """Render a frame's stack root-first in collapsed (flamegraph) format."""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(
+            f"{_module_name(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+        )
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def _top_allocations(before, after) -> list[dict]:
+    """Allocation sites that grew the most between two snapshots."""
+    allocations = []
+    for stat in after.compare_to(before, "lineno"):
+        frame = stat.traceback[0]
+        if frame.filename in _IGNORED_ALLOCATION_FILES:
+            continue
+        allocations.append(
+            {
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size_diff_kb": round(stat.size_diff / 1024, 2),
+                "count_diff": stat.count_diff,
+            }
+        )
+        if len(allocations) == TOP_ALLOCATIONS:
+            break
+    return allocations
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stacks of threads currently running profiled nodes."""
+
+    def __init__(self, session: "ProfileSession", interval: float):
+        super().__init__(name=f"profiler-{session.session_id[:8]}", daemon=True)
+        self._session = session
+        self._interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_ident = threading.get_ident()
+        watched = self._session.watched_threads
+        while not self._stop_event.wait(self._interval):
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own_ident or _is_idle(frame):
+                    continue
+                bucket = watched.get(ident)
+                if bucket is None:
+                    # Only attribute unwatched threads that are executing graph code
+                    if ident not in self._session.graph_threads:
+                        continue
+                    bucket = GRAPH_BUCKET
+                self._session.samples[bucket][_fold_stack(frame)] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join(timeout=1.0)
+
+
+class ProfileSession:
+    """
+    Profiling state for a single request.
+
+    Collects per node: wall time, thread CPU time, stack samples (collapsed format,
+    loadable by flamegraph.pl or speedscope) and the top allocation sites.
+    Allocation tracking uses tracemalloc, which is process-wide: nodes running in
+    parallel will see each other's allocations.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path = PROFILE_OUTPUT_DIR,
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ):
+        self.session_id = uuid4().hex
+        self.output_dir = Path(output_dir) / self.session_id
+        self.watched_threads: Dict[int, str] = {}
+        self.graph_threads: set[int] = set()
+        self.samples: Dict[str, Counter] = defaultdict(Counter)
+        self.nodes: Dict[str, dict] = {}
+        self._snapshots: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._sampler = _StackSampler(self, sample_interval)
+        self._started = time.perf_counter()
+
+    def start(self) -> "ProfileSession":
+        _start_tracemalloc()
+        self._sampler.start()
+        return self
+
+    @contextmanager
+    def node(self, key: str) -> Iterator[None]:
+        """Profile a node run executing on the current thread."""
+        ident = threading.get_ident()
+        previous = self.watched_threads.get(ident)
+        self.watched_threads[ident] = key
+        self.graph_threads.add(ident)
+        before = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            cpu_ms = (time.thread_time() - cpu_start) * 1000
+            wall_ms = (time.perf_counter() - wall_start) * 1000
+            if previous is None:
+                self.watched_threads.pop(ident, None)
+            else:
+                self.watched_threads[ident] = previous
+
+            after = (
+                tracemalloc.take_snapshot()
+                if before is not None and tracemalloc.is_tracing()
+                else None
+            )
+            with self._lock:
+                self.nodes[key] = {
+                    "wall_ms": round(wall_ms, 2),
+                    "cpu_ms": round(cpu_ms, 2),
+                }
+                if after is not None:
+                    # Comparing snapshots is slow, so it is deferred to close()
+                    self._snapshots[key] = (before, after)
+
+    def close(self) -> Path:
+        """Stop sampling and write results to the session output directory."""
+        self._sampler.stop()
+        _stop_tracemalloc()
+
+        for key, (before, after) in self._snapshots.items():
+            self.nodes[key]["top_allocations"] = _top_allocations(before, after)
+        self._snapshots.clear()
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summary = {
+            "session_id": self.session_id,
+            "wall_ms": round((time.perf_counter() - self._started) * 1000, 2),
+            "sample_interval_ms": round(self._sampler._interval * 1000, 2),
+            "nodes": {},
+        }
+        for bucket in sorted(set(self.nodes) | set(self.samples)):
+            samples = self.samples.get(bucket, Counter())
+            if samples:
+                folded_path = self.output_dir / f"{bucket}.folded"
+                folded_path.write_text(
+                    "".join(f"{stack} {count}\n" for stack, count in samples.items()),
+                    encoding="utf-8",
+                )
+            summary["nodes"][bucket] = {
+                **self.nodes.get(bucket, {}),
+                "samples": sum(samples.values()),
+            }
+
+        (self.output_dir / "summary.json").write_text(
+            json.dumps(summary, indent=2), encoding="utf-8"
+        )
+        logger.info(f"Wrote profile {self.session_id} to {self.output_dir}")
+        return self.output_dir
+
+
+@asynccontextmanager
+async def profiling_session(
+    enabled: bool,
+) -> AsyncIterator[Optional[ProfileSession]]:
+    """
+    Activate a profiling session for the duration of the block.
+
+    Yields None (and costs nothing) when profiling is not enabled. The results are
+    written on a worker thread, so other requests on the event loop are not stalled.
+    """
+    if not enabled:
+        yield None
+        return
+
+    session = ProfileSession().start()
+    token = _active_session.set(session)
+    try:
+        yield session
+    finally:
+        _active_session.reset(token)
+        try:
+            await asyncio.to_thread(session.close)
+        except Exception as e:
+            logger.error(f"Failed to write profile {session.session_id}: {e}")
+
+
+def profile_node(key: str):
+    """Context manager profiling a node run if a session is active, else a no-op."""
+    session = _active_session.get()
+    if session is None:
+        return nullcontext()
+    return session.node(key)
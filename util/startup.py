@@ -0,0 +1,115 @@
+"""
+Startup timing and background loading of expensive application components.
+
+The API answers its health check as soon as the process is up, while the research
+graph (and everything it imports) is loaded on a background thread started from the
+lifespan hook. Every phase is recorded in the startup report.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Generic, Iterator, Optional, TypeVar
+
+from util.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Reference point for startup timings: the first import of this module
+PROCESS_START = time.perf_counter()
+
+
+class StartupReport:
+    """Durations of named startup phases, relative to PROCESS_START."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases: Dict[str, dict] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a startup phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.phases[name] = {
+                    "start_ms": round((start - PROCESS_START) * 1000, 2),
+                    "duration_ms": round((end - start) * 1000, 2),
+                }
+            logger.info(f"Startup phase {name} took {(end - start) * 1000:.0f}ms")
+
+    def mark(self, name: str) -> None:
+        """Record an instant (zero-duration phase), e.g. "serving"."""
+        with self.phase(name):
+            pass
+
+    def summary(self) -> dict:
+        with self._lock:
+            phases = dict(self.phases)
+        return {
+            "uptime_ms": round((time.perf_counter() - PROCESS_START) * 1000, 2),
+            "phases": phases,
+        }
+
+
+startup_report = StartupReport()
+
+
+class BackgroundLoader(Generic[T]):
+    """
+    Runs a loader function once on a daemon thread and hands out its result.
+
+    Args:
+        name: Phase name used in the startup report
+        load: Function producing the component
+    """
+
+    def __init__(self, name: str, load: Callable[[], T]):
+        self.name = name
+        self._load = load
+        self._future: Future = Future()
+        self._started = False
+        self._lock = threading.Lock()
+
+    def start(self) -> "BackgroundLoader[T]":
+        """Start loading in the background (idempotent)."""
+        with self._lock:
+            if self._started:
+                return self
+            self._started = True
+        thread = threading.Thread(
+            target=self._run, name=f"load-{self.name}", daemon=True
+        )
+        thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            with startup_report.phase(self.name):
+                result = self._load()
+        except BaseException as e:
+            logger.error(f"Loading {self.name} failed: {e}", exc_info=True)
+            self._future.set_exception(e)
+        else:
+            self._future.set_result(result)
+
+    @property
+    def loaded(self) -> bool:
+        return self._future.done() and self._future.exception() is None
+
+    def get(self, timeout: Optional[float] = None) -> T:
+        """Block until loaded (starting the load if needed) and return the result."""
+        self.start()
+        return self._future.result(timeout=timeout)
+
+    async def aget(self) -> T:
+        """Await the result without blocking the event loop."""
+        self.start()
+        return await asyncio.wrap_future(self._future)
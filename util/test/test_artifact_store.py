@@ -0,0 +1,30 @@
+from util.artifact_store import ArtifactStore
+
+
+class TestArtifactStore:
+    def test_put_and_get(self):
+        store = ArtifactStore()
+        handle = store.put({"longName": "Apple"}, scope="req", kind="ticker_info")
+        assert handle.startswith("ticker_info:")
+        assert store.get(handle) == {"longName": "Apple"}
+
+    def test_missing_handle_returns_default(self):
+        store = ArtifactStore()
+        assert store.get(None) is None
+        assert store.get("ticker_info:unknown", default={}) == {}
+
+    def test_release_drops_only_that_scope(self):
+        store = ArtifactStore()
+        first = store.put("a", scope="req-1")
+        second = store.put("b", scope="req-2")
+        assert store.release("req-1") == 1
+        assert store.get(first) is None
+        assert store.get(second) == "b"
+
+    def test_sweep_removes_expired(self):
+        store = ArtifactStore(ttl=-1)
+        handle = store.put("stale", scope="req")
+        assert store.get(handle) is None
+        assert store.sweep() == 1
+        assert len(store) == 0
+        assert store.release("req") == 0
@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+from util.cassettes import CassetteLibrary, CassetteMissError, cassette_ticker_class
+
+
+class RealTicker:
+    """Minimal stand-in for yfinance.Ticker counting upstream calls."""
+
+    calls = 0
+
+    def __init__(self, ticker, session=None):
+        self.ticker = ticker
+
+    @property
+    def info(self):
+        RealTicker.calls += 1
+        return {"longName": f"{self.ticker} Inc."}
+
+    def history(self, period="1y", interval="1d"):
+        RealTicker.calls += 1
+        return pd.DataFrame({"Close": [1.0, 2.0]})
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    RealTicker.calls = 0
+
+
+class TestCassetteLibrary:
+    def test_replays_recorded_call(self, tmp_path):
+        recorder = CassetteLibrary(tmp_path, "record")
+        assert recorder.call("ns", "key", lambda x: {"value": x}, 1) == {"value": 1}
+
+        player = CassetteLibrary(tmp_path, "replay")
+        result = player.call("ns", "key", pytest.fail)
+        assert result == {"value": 1}
+        assert player.stats()["hits"] == 1
+
+    def test_replay_returns_independent_copies(self, tmp_path):
+        CassetteLibrary(tmp_path, "record").call("ns", "key", lambda: {"a": []})
+        player = CassetteLibrary(tmp_path, "replay")
+        player.call("ns", "key", pytest.fail)["a"].append(1)
+        assert player.call("ns", "key", pytest.fail) == {"a": []}
+
+    def test_replay_miss_raises(self, tmp_path):
+        player = CassetteLibrary(tmp_path, "replay")
+        with pytest.raises(CassetteMissError):
+            player.call("ns", "missing", pytest.fail)
+        assert player.stats()["misses"] == 1
+
+    def test_rejects_bad_latency(self, tmp_path):
+        with pytest.raises(ValueError):
+            CassetteLibrary(tmp_path, "replay", latency="fast")
+
+
+class TestCassetteTicker:
+    def test_properties_and_methods_round_trip(self, tmp_path):
+        Recording = cassette_ticker_class(
+            CassetteLibrary(tmp_path, "record"), RealTicker
+        )
+        recorded = Recording("aapl")
+        assert recorded.info == {"longName": "aapl Inc."}
+        recorded.history(period="1y")
+        assert RealTicker.calls == 2
+
+        Replaying = cassette_ticker_class(
+            CassetteLibrary(tmp_path, "replay"), RealTicker
+        )
+        replayed = Replaying("AAPL")
+        assert replayed.info == {"longName": "aapl Inc."}
+        pd.testing.assert_frame_equal(
+            replayed.history(period="1y"), pd.DataFrame({"Close": [1.0, 2.0]})
+        )
+        assert RealTicker.calls == 2
+
+    def test_method_arguments_are_part_of_key(self, tmp_path):
+        Recording = cassette_ticker_class(
+            CassetteLibrary(tmp_path, "record"), RealTicker
+        )
+        Recording("AAPL").history(period="1y")
+
+        Replaying = cassette_ticker_class(
+            CassetteLibrary(tmp_path, "replay"), RealTicker
+        )
+        with pytest.raises(CassetteMissError):
+            Replaying("AAPL").history(period="5y")
@@ -0,0 +1,145 @@
+import pytest
+
+from models.metrics import NodeTiming, RequestMetrics
+from util.critical_path import (
+    CriticalPathReport,
+    analyze_critical_path,
+    timed_node,
+)
+
+DEPENDENCIES = {
+    "fast_branch": ["validation"],
+    "slow_branch": ["validation"],
+    "aggregator": ["fast_branch", "slow_branch", "evaluator"],
+    "evaluator": ["aggregator"],
+}
+
+
+def _metrics(*timings: NodeTiming) -> RequestMetrics:
+    metrics = RequestMetrics(request_id="req", started_at=0.0)
+    for timing in timings:
+        metrics.add_node_timing(timing)
+    return metrics
+
+
+def _timing(node, start, end, iteration=1, request_id="req"):
+    return NodeTiming(
+        node=node,
+        iteration=iteration,
+        request_id=request_id,
+        start_ms=start,
+        end_ms=end,
+    )
+
+
+class TestAnalyzeCriticalPath:
+    @pytest.fixture
+    def metrics(self):
+        return _metrics(
+            _timing("validation", 0, 10),
+            _timing("fast_branch", 11, 50),
+            _timing("slow_branch", 11, 200),
+            _timing("aggregator", 201, 300),
+            _timing("evaluator", 301, 350),
+            _timing("aggregator", 351, 400, iteration=2),
+            _timing("evaluator", 401, 420, iteration=2),
+        )
+
+    def test_follows_slowest_branch(self, metrics):
+        analysis = analyze_critical_path(metrics, DEPENDENCIES)
+        path = [(step.node, step.iteration) for step in analysis.critical_path]
+        assert path == [
+            ("validation", 1),
+            ("slow_branch", 1),
+            ("aggregator", 1),
+            ("evaluator", 1),
+            ("aggregator", 2),
+            ("evaluator", 2),
+        ]
+
+    def test_branch_slack(self, metrics):
+        analysis = analyze_critical_path(metrics, DEPENDENCIES)
+        assert analysis.slack_ms["fast_branch"] == 150
+        assert analysis.slack_ms["slow_branch"] == 0
+
+    def test_revision_loop_cost(self, metrics):
+        analysis = analyze_critical_path(metrics, DEPENDENCIES)
+        assert analysis.revision_loop_ms == 70
+        assert analysis.total_ms == 420
+
+    def test_cached_nodes_are_excluded(self):
+        metrics = _metrics(
+            _timing("validation", 0, 10),
+            _timing("fast_branch", 11, 50),
+            _timing("slow_branch", 5000, 9000, request_id="earlier"),
+            _timing("aggregator", 51, 100),
+            _timing("evaluator", 101, 120),
+        )
+        analysis = analyze_critical_path(metrics, DEPENDENCIES)
+        assert analysis.cached_nodes == ["slow_branch#1"]
+        assert [s.node for s in analysis.critical_path][1] == "fast_branch"
+
+    def test_nested_segments(self):
+        metrics = _metrics(
+            _timing("validation", 0, 10),
+            _timing("slow_branch", 11, 200),
+            _timing("inner_a", 12, 80),
+            _timing("inner_b", 81, 199),
+            _timing("aggregator", 201, 300),
+            _timing("evaluator", 301, 350),
+        )
+        analysis = analyze_critical_path(
+            metrics, DEPENDENCIES, nested={"slow_branch": ["inner_a", "inner_b"]}
+        )
+        branch = analysis.critical_path[1]
+        assert [s.node for s in branch.segments] == ["inner_a", "inner_b"]
+        assert "inner_a" not in analysis.slack_ms
+
+    def test_empty_metrics(self):
+        analysis = analyze_critical_path(RequestMetrics(), DEPENDENCIES)
+        assert analysis.critical_path == []
+
+
+class TestTimedNode:
+    def test_records_timing_on_returned_metrics(self):
+        class State:
+            metrics = RequestMetrics(request_id="req", started_at=0.0)
+            revision_iteration_count = 1
+
+        @timed_node("aggregator")
+        def node(state):
+            return {"combined_sentiment": "ok"}
+
+        result = node(State())
+        timing = result["metrics"].node_timings["aggregator#2"]
+        assert timing.request_id == "req"
+        assert timing.end_ms >= timing.start_ms
+
+    def test_skips_without_request_start(self):
+        class State:
+            metrics = RequestMetrics()
+            revision_iteration_count = 0
+
+        @timed_node("aggregator")
+        def node(state):
+            return {"combined_sentiment": "ok"}
+
+        assert "metrics" not in node(State())
+
+
+class TestCriticalPathReport:
+    def test_summary_ranks_nodes(self):
+        report = CriticalPathReport()
+        metrics = _metrics(
+            _timing("validation", 0, 10),
+            _timing("fast_branch", 11, 50),
+            _timing("slow_branch", 11, 200),
+            _timing("aggregator", 201, 300),
+            _timing("evaluator", 301, 350),
+        )
+        report.record(analyze_critical_path(metrics, DEPENDENCIES))
+        summary = report.summary()
+        assert summary["requests"] == 1
+        assert summary["nodes"]["slow_branch"]["critical_share"] == 1.0
+        assert summary["nodes"]["fast_branch"]["critical_share"] == 0.0
+        assert summary["nodes"]["fast_branch"]["mean_slack_ms"] == 150
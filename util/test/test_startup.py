@@ -0,0 +1,96 @@
+import asyncio
+import sys
+
+import pytest
+
+from util.lazy_imports import lazy_import
+from util.startup import BackgroundLoader, startup_report
+from util.warmup import Warmup
+
+
+def test_lazy_import_defers_until_attribute_access():
+    sys.modules.pop("colorsys", None)
+    colorsys = lazy_import("colorsys")
+    assert "colorsys" not in sys.modules
+
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+
+
+def test_background_loader_runs_once_and_records_phase():
+    calls = []
+
+    def load():
+        calls.append(1)
+        return "component"
+
+    loader = BackgroundLoader("test_component", load).start()
+    assert loader.get(timeout=5) == "component"
+    assert asyncio.run(loader.aget()) == "component"
+    assert loader.loaded
+    assert calls == [1]
+    assert "test_component" in startup_report.summary()["phases"]
+
+
+def test_background_loader_propagates_failure():
+    def load():
+        raise RuntimeError("boom")
+
+    loader = BackgroundLoader("failing_component", load)
+    with pytest.raises(RuntimeError):
+        loader.get(timeout=5)
+    assert not loader.loaded
+
+
+def test_warmup_ready_only_when_required_steps_succeed():
+    def fail():
+        raise RuntimeError("no api key")
+
+    warmup = Warmup()
+    warmup.add("model", lambda: {"dimensions": 3})
+    warmup.add("clients", fail, required=False)
+    assert not warmup.ready
+
+    warmup.run()
+    summary = warmup.summary()
+    assert warmup.ready
+    assert summary["steps"]["model"]["detail"] == {"dimensions": 3}
+    assert summary["steps"]["clients"]["status"] == "failed"
+
+    warmup.add("vector_store", fail)
+    warmup.run()
+    assert not warmup.ready
+
+
+def test_reset_after_fork_drops_llm_clients(monkeypatch):
+    from agents.shared.llm_models import get_openai_llm
+    from util.prefork import reset_after_fork
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    get_openai_llm("gpt-4o-mini", 0.0)
+    assert get_openai_llm.cache_info().currsize == 1
+
+    reset_after_fork(workers=2)
+    assert get_openai_llm.cache_info().currsize == 0
+
+
+def test_only_one_worker_claims_preload_ingestion(tmp_path, monkeypatch):
+    from util import prefork
+
+    monkeypatch.setattr(prefork, "_held_locks", [])
+    monkeypatch.setenv(prefork.PRELOAD_LOCK_ENV, str(tmp_path / "preload.lock"))
+
+    # each claim opens the lock file again, as a separate worker would
+    assert prefork.claim_preload_ingestion()
+    assert not prefork.claim_preload_ingestion()
+
+    prefork._held_locks.pop().close()
+    assert prefork.claim_preload_ingestion()
+    prefork._held_locks.pop().close()
+
+
+def test_preload_ingestion_is_claimed_without_gunicorn(monkeypatch):
+    from util.prefork import PRELOAD_LOCK_ENV, claim_preload_ingestion
+
+    monkeypatch.delenv(PRELOAD_LOCK_ENV, raising=False)
+    assert claim_preload_ingestion()
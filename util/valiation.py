@@ -1,8 +1,10 @@
-import yfinance as yf
-
+from util.artifact_store import artifact_store
+from util.lazy_imports import lazy_import
 from util.logger import get_logger
 from models.state import EquityResearchState
 
+yf = lazy_import("yfinance")
+
 logger = get_logger(__name__)
 
 
@@ -17,12 +19,15 @@ def validate_ticker(ticker: str, state: EquityResearchState) -> dict:
         if is_ticker:
             industry = info.get("industry")
             business = info.get("longName")
-            # Cache the full info dict to avoid duplicate yfinance API calls
+            # Cache the full info dict to avoid duplicate yfinance API calls,
+            # outside the state so it is not copied through every superstep
             return {
                 "is_ticker_valid": True,
                 "industry": industry,
                 "business": business,
-                "ticker_info": info,
+                "ticker_info_handle": artifact_store.put(
+                    info, scope=state.metrics.request_id, kind="ticker_info"
+                ),
             }
         else:
             return {"is_ticker_valid": False}
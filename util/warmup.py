@@ -0,0 +1,214 @@
+"""
+Startup warmup: load models, open clients and prime caches before reporting ready.
+
+Each step is timed in the startup report. The process is ready once every step has
+run and all required steps succeeded; optional steps (LLM clients need API keys, the
+tokenizer downloads its vocabulary) only degrade the first requests when they fail.
+
+Configured by environment:
+    WARMUP_SYNTHETIC_REQUEST  run one request end to end against offline fakes
+                              (default false) to exercise every node once
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from util.logger import get_logger
+from util.startup import startup_report
+
+logger = get_logger(__name__)
+
+WARMUP_SYNTHETIC_REQUEST = os.getenv("WARMUP_SYNTHETIC_REQUEST", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+class Warmup:
+    """Ordered warmup steps with per-step status for the readiness endpoint."""
+
+    def __init__(self):
+        self._steps: List[Tuple[str, Callable[[], Any], bool]] = []
+        self._lock = threading.Lock()
+        self.results: Dict[str, dict] = {}
+        self.done = False
+
+    def add(self, name: str, step: Callable[[], Any], required: bool = True) -> None:
+        """
+        Register a warmup step.
+
+        Args:
+            name: Step name, reported as warmup.<name> in the startup report
+            step: Callable doing the work; its return value is reported as detail
+            required: Whether the process may report ready if this step fails
+        """
+        self._steps.append((name, step, required))
+        self.results[name] = {"status": "pending", "required": required}
+
+    def run(self) -> "Warmup":
+        """Run every step in order; failures are recorded, not raised."""
+        for name, step, required in self._steps:
+            with self._lock:
+                self.results[name]["status"] = "running"
+            result: Dict[str, Any] = {"required": required}
+            start = time.perf_counter()
+            try:
+                with startup_report.phase(f"warmup.{name}"):
+                    detail = step()
+                result["status"] = "ok"
+                if detail is not None:
+                    result["detail"] = detail
+            except Exception as e:
+                level = logger.error if required else logger.warning
+                level(f"Warmup step {name} failed: {e}", exc_info=required)
+                result["status"] = "failed"
+                result["error"] = str(e)
+            result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            with self._lock:
+                self.results[name] = result
+        self.done = True
+        return self
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return self.done and all(
+                r["status"] == "ok" for r in self.results.values() if r["required"]
+            )
+
+    def summary(self) -> dict:
+        with self._lock:
+            steps = {name: dict(result) for name, result in self.results.items()}
+        return {"ready": self.ready, "done": self.done, "steps": steps}
+
+
+def warm_embedding_model() -> dict:
+    """Load the sentence-transformer used for ingestion and for queries."""
+    from agents.shared.embedding_models import get_embedding_engine
+
+    from agents.filings.agents.query_builder import _get_default_queries
+    from agents.filings.agents.retriever import DEFAULT_SEARCH_TOPICS
+    from models.state import TradeDirection
+
+    engine = get_embedding_engine()
+    dimensions = len(engine.embed_query("warmup"))
+    # fallback queries are searched verbatim, so their embeddings can be cached now
+    queries = DEFAULT_SEARCH_TOPICS + [
+        query
+        for direction in TradeDirection
+        for query in _get_default_queries(direction)
+    ]
+    engine.encode_queries(queries)
+    return {
+        "dimensions": dimensions,
+        "load_ms": engine.load_ms,
+        "cached_queries": len(engine.query_cache),
+    }
+
+
+def warm_vector_store() -> dict:
+    """Open the Chroma client and touch its storage."""
+    from data.util.vector_store import get_chroma_client
+
+    client = get_chroma_client()
+    client.heartbeat()
+    return {"collections": client.count_collections()}
+
+
+def warm_llm_clients() -> dict:
+    """Create the cached LLM clients of the default token preset."""
+    from agents.shared.llm_models import prewarm_llm_clients
+    from agents.shared.token_config import DEFAULT_TOKEN_CONFIG
+
+    return {"clients": prewarm_llm_clients(DEFAULT_TOKEN_CONFIG)}
+
+
+def warm_tokenizer() -> dict:
+    """Load the tokenizers and pre-tokenize the static agent prompts."""
+    from agents.shared.llm_models import LLM_MODELS
+    from agents.shared.tokenization import load_static_prompts, pretokenize_prompts
+
+    prompts = load_static_prompts()
+    counts = {
+        model: pretokenize_prompts(prompts, model) for model in LLM_MODELS.values()
+    }
+    if not any(counts.values()):
+        raise RuntimeError("no tokenizer could be loaded")
+    return {"prompts": max(counts.values())}
+
+
+def warm_parse_pool() -> dict:
+    """Spawn the filing parser processes."""
+    from data.util.parse_pool import start_parse_pool
+
+    return {"workers": start_parse_pool()}
+
+
+def warm_synthetic_request(graph_module, ticker: str = "AAPL") -> dict:
+    """
+    Run one request through the graph with every external dependency faked.
+
+    The node cache is cleared afterwards so no fake result is ever served.
+    """
+    from util.offline import OfflineSettings, offline_environment
+
+    settings = OfflineSettings(
+        tickers=[ticker],
+        distribution="fixed",
+        llm_latency_ms=0,
+        data_latency_ms=0,
+        embed_latency_ms=0,
+        filing_paragraphs=2,
+    )
+    try:
+        with offline_environment(settings) as (models, _):
+            result = graph_module.get_research_chain().invoke(
+                {
+                    "ticker": ticker,
+                    "trade_duration": "swing_trade",
+                    "trade_direction": "long",
+                }
+            )
+    finally:
+        graph_module.cache.clear()
+    return {
+        "valid": result.is_ticker_valid,
+        "llm_calls": sum(model.calls for model in models.values()),
+    }
+
+
+def build_warmup(
+    load_graph: Callable[[], Any], synthetic: Optional[bool] = None
+) -> Warmup:
+    """
+    Warmup plan of the API process.
+
+    Args:
+        load_graph: Returns the loaded graph module (blocking until it is)
+        synthetic: Whether to run a synthetic request (default WARMUP_SYNTHETIC_REQUEST)
+
+    Returns:
+        The Warmup, not yet run
+    """
+    synthetic = WARMUP_SYNTHETIC_REQUEST if synthetic is None else synthetic
+
+    def warm_graph() -> None:
+        load_graph()
+
+    warmup = Warmup()
+    warmup.add("graph", warm_graph)
+    warmup.add("embedding_model", warm_embedding_model)
+    warmup.add("vector_store", warm_vector_store)
+    warmup.add("llm_clients", warm_llm_clients, required=False)
+    warmup.add("tokenizer", warm_tokenizer, required=False)
+    warmup.add("parse_pool", warm_parse_pool, required=False)
+    if synthetic:
+        warmup.add(
+            "synthetic_request",
+            lambda: warm_synthetic_request(load_graph()),
+            required=False,
+        )
+    return warmup